@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark de l'analyse des pages produits
+Compare html.parser (arbre complet), lxml (arbre complet) et lxml (arbre partiel) sur des pages
+enregistrées: fichiers .html d'un dossier passé en argument, ou corps HTML du cache HTTP.
+Sans page enregistrée, une page produit synthétique est utilisée.
+
+Usage: python3 benchmarks/bench_html_parsing.py [dossier_de_pages] [--repeat N]
+"""
+
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bs4 import BeautifulSoup
+
+import html_parser
+from http_cache import CACHE_DIR
+
+# Configuration
+REPEAT = 5
+MAX_PAGES = 200
+
+
+def load_saved_pages(directory=None):
+    """Charge les pages HTML d'un dossier, ou celles du cache HTTP"""
+    pages = []
+    if directory:
+        for filename in sorted(os.listdir(directory)):
+            if filename.lower().endswith(('.html', '.htm')):
+                with open(os.path.join(directory, filename), 'r', encoding='utf-8', errors='replace') as f:
+                    pages.append(f.read())
+        return pages[:MAX_PAGES]
+
+    index_path = os.path.join(CACHE_DIR, 'index.sqlite')
+    if not os.path.exists(index_path):
+        return pages
+    db = sqlite3.connect(index_path)
+    try:
+        rows = db.execute("SELECT key, headers FROM entries").fetchall()
+    finally:
+        db.close()
+    for key, headers in rows:
+        if 'text/html' not in headers.lower():
+            continue
+        with open(os.path.join(CACHE_DIR, key[:2], key), 'rb') as f:
+            pages.append(f.read().decode('utf-8', errors='replace'))
+        if len(pages) >= MAX_PAGES:
+            break
+    return pages
+
+
+def synthetic_page():
+    """Page produit représentative: en-tête, menus, fiche produit, recommandations, pied de page"""
+    menu = ''.join(f'<li class="menu-item"><a href="/collections/c{i}">Collection {i}</a></li>' for i in range(80))
+    related = ''.join(
+        f'<div class="card"><a href="/products/p{i}"><img src="/img/p{i}.jpg" alt="p{i}"></a>'
+        f'<span class="card-price">{100 + i} €</span><p>Lorem ipsum dolor sit amet {i}</p></div>'
+        for i in range(60)
+    )
+    footer = ''.join(f'<p class="legal">Mention légale numéro {i}, consectetur adipiscing elit.</p>' for i in range(100))
+    scripts = ''.join(f'<script>window.analytics_{i} = {{"id": {i}, "enabled": true}};</script>' for i in range(30))
+    return (
+        '<html><head><title>Montre Test</title><meta name="description" content="Une montre">'
+        f'{scripts}</head><body><header><nav><ul>{menu}</ul></nav></header>'
+        '<nav class="breadcrumb"><a href="/">Accueil</a><a href="/collections/montres">Montres</a></nav>'
+        '<div class="product-single"><h1 class="product-title">Montre Test Automatique</h1>'
+        '<span class="product-price">1 250,00 €</span>'
+        '<div class="product-description"><p>Boîtier acier.</p><p>Mouvement automatique.</p></div>'
+        '<img class="product-gallery" src="/img/main.jpg"><img class="product-gallery" src="/img/alt.jpg"></div>'
+        f'<section class="related">{related}</section><footer>{footer}</footer></body></html>'
+    )
+
+
+def bench(label, parse, pages, repeat):
+    """Analyse toutes les pages `repeat` fois et affiche le meilleur temps par page"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            parse(page)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    per_page = best / len(pages) * 1000
+    print(f"  {label:<28} {per_page:8.2f} ms/page  ({len(pages) / best:7.1f} pages/s)")
+    return per_page
+
+
+def main():
+    args = sys.argv[1:]
+    repeat = REPEAT
+    if '--repeat' in args:
+        position = args.index('--repeat')
+        repeat = int(args[position + 1])
+        del args[position:position + 2]
+
+    pages = load_saved_pages(args[0] if args else None)
+    source = f"{len(pages)} pages enregistrées"
+    if not pages:
+        pages = [synthetic_page()] * 20
+        source = "page synthétique (aucune page enregistrée trouvée)"
+
+    print(f"⏱️  Analyse HTML: {source}, meilleur de {repeat} passes\n")
+    baseline = bench("html.parser, arbre complet", lambda page: BeautifulSoup(page, 'html.parser'), pages, repeat)
+    if html_parser.PARSER != 'lxml':
+        print("\n⚠️  lxml n'est pas installé: seul html.parser est mesuré")
+        return
+    full = bench("lxml, arbre complet", html_parser.parse, pages, repeat)
+    partial = bench("lxml, arbre partiel", html_parser.parse_product_page, pages, repeat)
+    print(f"\n📈 lxml complet: x{baseline / full:.1f}, lxml partiel: x{baseline / partial:.1f} "
+          f"par rapport à html.parser")
+
+
+if __name__ == "__main__":
+    main()
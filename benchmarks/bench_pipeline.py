@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de bout en bout des scripts du catalogue, sans accès réseau
+Chaque étape tourne dans un processus séparé, dans un dossier de travail temporaire, contre une
+origine HTTP locale (benchmarks/local_origin.py):
+- import_from_json_file: export JSON de N produits dont les images sont servies par l'origine
+- import_products_from_24s: API products.json d'une boutique Shopify
+- import_watches_from_temps_merveilles: crawl HTML (collections paginées, pages produits)
+- clean_invalid_products, limit_products_to_1100: catalogue synthétique de --catalog-size produits
+
+Pour chaque étape: débit (produits/s), durée p50/p95 sur les répétitions, latence p50/p95 des
+requêtes HTTP, pic de mémoire (RSS) et, pour les importeurs, l'étape dominante (réseau, analyse
+ou disque) selon leur résumé de métriques (import_metrics.py). Les résultats sont comparés à une référence enregistrée
+(benchmarks/baseline.json): le script échoue si une étape est plus lente ou plus gourmande que
+la référence au-delà de la tolérance.
+
+Usage: python3 benchmarks/bench_pipeline.py [--products N] [--catalog-size N] [--repeat N]
+       [--stages a,b] [--latency MS] [--replay DOSSIER_CACHE] [--tolerance 0.25]
+       [--baseline FICHIER] [--save-baseline]
+"""
+
+import functools
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from local_origin import LocalOrigin, synthetic_product
+
+# Configuration
+PRODUCTS = 500              # Produits servis par chaque origine
+CATALOG_SIZE = 5000         # Taille du catalogue nettoyé/limité
+REPEAT = 3
+TOLERANCE = 0.25            # Régression au-delà de +25% (durée p50, pic RSS)
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+INVALID_RATE = 0.05         # Part de produits invalides injectés dans le catalogue à nettoyer
+
+STAGES = (
+    'import_from_json_file',
+    'import_products_from_24s',
+    'import_watches_from_temps_merveilles',
+    'clean_invalid_products',
+    'limit_products_to_1100',
+)
+IMPORT_STAGES = STAGES[:3]
+
+
+def percentile(values, fraction):
+    """Percentile au rang le plus proche (0 si aucune valeur)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))]
+
+
+# Préparation des dossiers de travail
+
+def prepare_workdir(stage, options, shop_url):
+    """Dossier de travail d'une exécution: catalogue de départ, index d'images, export JSON"""
+    workdir = tempfile.mkdtemp(prefix=f"bench_{stage}_")
+    os.makedirs(os.path.join(workdir, 'src', 'lib'))
+    os.makedirs(os.path.join(workdir, 'public', 'images', 'products'))
+    with open(os.path.join(workdir, 'src', 'lib', 'placeholder-images.json'), 'w', encoding='utf-8') as f:
+        json.dump({'placeholderImages': []}, f)
+
+    catalog_path = os.path.join(workdir, 'new_products.json')
+    if stage in IMPORT_STAGES:
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            f.write('[]')
+    else:
+        write_dirty_catalog(catalog_path, options['catalog_size'])
+
+    if stage == 'import_from_json_file':
+        products = []
+        for index in range(options['products']):
+            product = synthetic_product(index, shop_url)
+            product['price'] = product['variants'][0]['price']
+            products.append(product)
+        with open(os.path.join(workdir, 'export.json'), 'w', encoding='utf-8') as f:
+            json.dump({'products': products}, f, ensure_ascii=False)
+    return workdir
+
+
+def write_dirty_catalog(path, count):
+    """Catalogue synthétique dont une partie des produits porte un nom de navigation (invalide)"""
+    from synthetic_catalog import generate_batch
+    products = generate_batch(seed=1, batch_index=0, start=0, size=count)
+    step = max(int(1 / INVALID_RATE), 1)
+    for index in range(0, count, step):
+        products[index]['name'] = products[index]['name_fr'] = 'Accueil'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(products, f, ensure_ascii=False, indent=2)
+
+
+# Exécution d'une étape (processus enfant)
+
+def run_stage(stage, workdir, shop_url, html_url, result_path):
+    """Exécute une étape dans le dossier de travail et écrit ses mesures dans result_path"""
+    os.chdir(workdir)
+    import http_client
+
+    latencies = []
+    request = http_client.HttpClient.request
+
+    def timed_request(self, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            return request(self, method, url, **kwargs)
+        finally:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    http_client.HttpClient.request = timed_request
+
+    argv = [f"{stage}.py"]
+    if stage in IMPORT_STAGES:
+        argv += ['--no-cache', '--fresh', '--metrics', 'metrics.json']
+    if stage == 'import_from_json_file':
+        argv.insert(1, 'export.json')
+
+    module = __import__(stage)
+    if stage == 'import_products_from_24s':
+        module.SOURCE_SITE = shop_url
+    elif stage == 'import_watches_from_temps_merveilles':
+        import crawl_frontier
+        module.SOURCE_SITE = html_url
+        # L'origine locale n'a pas besoin de la limitation de débit par hôte
+        module.CrawlFrontier = functools.partial(crawl_frontier.CrawlFrontier, rate_per_host=1e6, burst=1000)
+
+    with open('new_products.json', 'r', encoding='utf-8') as f:
+        before = len(json.load(f))
+    sys.argv = argv
+    start = time.perf_counter()
+    with open('stage.log', 'w', encoding='utf-8') as log:
+        stdout = sys.stdout
+        sys.stdout = log
+        try:
+            module.main()
+        finally:
+            sys.stdout = stdout
+    seconds = time.perf_counter() - start
+    with open('new_products.json', 'r', encoding='utf-8') as f:
+        after = len(json.load(f))
+    bound = None
+    if os.path.exists('metrics.json'):
+        with open('metrics.json', 'r', encoding='utf-8') as f:
+            bound = json.load(f)['bound']
+
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'seconds': seconds,
+            # Produits importés, ou produits parcourus par le nettoyage/la limitation
+            'items': after if stage in IMPORT_STAGES else before,
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'request_ms': latencies,
+            'bound': bound,
+        }, f)
+
+
+def run_repeated(stage, options, shop_url, html_url):
+    runs = []
+    for _ in range(options['repeat']):
+        workdir = prepare_workdir(stage, options, shop_url)
+        result_path = os.path.join(workdir, 'result.json')
+        try:
+            subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--run-stage', stage, workdir,
+                 shop_url, html_url, result_path],
+                check=True)
+            with open(result_path, 'r', encoding='utf-8') as f:
+                runs.append(json.load(f))
+        except subprocess.CalledProcessError:
+            print(f"❌ {stage}: échec (journal: {os.path.join(workdir, 'stage.log')})")
+            raise
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    durations = [run['seconds'] for run in runs]
+    latencies = [ms for run in runs for ms in run['request_ms']]
+    p50 = percentile(durations, 0.5)
+    items = max(run['items'] for run in runs)
+    return {
+        'items': items,
+        'seconds_p50': p50,
+        'seconds_p95': percentile(durations, 0.95),
+        'throughput': items / p50 if p50 else 0.0,
+        'requests': len(latencies) // len(runs),
+        'request_ms_p50': percentile(latencies, 0.5),
+        'request_ms_p95': percentile(latencies, 0.95),
+        'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+        # Étape dominante selon les métriques des importeurs (import_metrics.py)
+        'bound': runs[-1]['bound'],
+    }
+
+
+# Rapport et comparaison à la référence
+
+def print_report(results):
+    print(f"\n{'Étape':<38} {'produits':>8} {'prod/s':>9} {'p50 (s)':>8} {'p95 (s)':>8} "
+          f"{'req':>6} {'req p50':>8} {'req p95':>8} {'RSS Mo':>7}  limité par")
+    for stage, r in results.items():
+        print(f"{stage:<38} {r['items']:>8} {r['throughput']:>9.1f} {r['seconds_p50']:>8.2f} "
+              f"{r['seconds_p95']:>8.2f} {r['requests']:>6} {r['request_ms_p50']:>6.1f}ms "
+              f"{r['request_ms_p95']:>6.1f}ms {r['peak_rss_mb']:>7.1f}  {r.get('bound') or '-'}")
+
+
+def compare(results, baseline, tolerance):
+    """Retourne la liste des régressions par rapport à la référence"""
+    regressions = []
+    for stage, result in results.items():
+        reference = baseline.get('stages', {}).get(stage)
+        if not reference:
+            continue
+        for metric, label in (('seconds_p50', 'durée p50'), ('peak_rss_mb', 'pic RSS')):
+            limit = reference[metric] * (1 + tolerance)
+            if result[metric] > limit:
+                regressions.append(f"{stage}: {label} {result[metric]:.2f} > {reference[metric]:.2f} "
+                                   f"(+{(result[metric] / reference[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def _option(args, name, default, cast=int):
+    if name not in args:
+        return default
+    position = args.index(name)
+    value = cast(args[position + 1])
+    del args[position:position + 2]
+    return value
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ['--run-stage']:
+        run_stage(*args[1:6])
+        return
+
+    options = {
+        'products': _option(args, '--products', PRODUCTS),
+        'catalog_size': _option(args, '--catalog-size', CATALOG_SIZE),
+        'repeat': _option(args, '--repeat', REPEAT),
+    }
+    stages = _option(args, '--stages', ','.join(STAGES), str).split(',')
+    latency = _option(args, '--latency', 0.0, float) / 1000
+    replay = _option(args, '--replay', None, str)
+    tolerance = _option(args, '--tolerance', TOLERANCE, float)
+    baseline_path = _option(args, '--baseline', BASELINE_FILE, str)
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        print(f"❌ Étapes inconnues: {', '.join(unknown)} (disponibles: {', '.join(STAGES)})")
+        sys.exit(1)
+
+    print(f"⏱️  Benchmark du pipeline: {options['products']} produits par origine, catalogue de "
+          f"{options['catalog_size']} produits, {options['repeat']} répétitions\n")
+    results = {}
+    with LocalOrigin('shopify', options['products'], latency=latency, replay=replay) as shop, \
+            LocalOrigin('html', options['products'], latency=latency) as html_site:
+        for stage in stages:
+            print(f"  ▶ {stage}...")
+            results[stage] = run_repeated(stage, options, shop.url, html_site.url)
+    print_report(results)
+
+    if '--save-baseline' in args:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump({'options': options, 'stages': results}, f, indent=2)
+            f.write('\n')
+        print(f"\n💾 Référence enregistrée dans {baseline_path}")
+        return
+
+    if not os.path.exists(baseline_path):
+        print(f"\nℹ️  Pas de référence ({baseline_path}): --save-baseline pour l'enregistrer")
+        return
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('options') != options:
+        print(f"\n⚠️  Référence mesurée avec d'autres options ({baseline.get('options')}): comparaison indicative")
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} régressions au-delà de {tolerance * 100:.0f}%:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        sys.exit(1)
+    print(f"\n✅ Aucune régression par rapport à {os.path.relpath(baseline_path, ROOT)} "
+          f"(tolérance {tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Origine HTTP locale pour les benchmarks, sans accès réseau
+Remplace les sites sources des importeurs:
+- mode 'shopify': API products.json paginée (limit/page), comme une boutique Shopify
+- mode 'html': pages de collection paginées et pages produits (JSON-LD, Open Graph), sans API
+Les deux modes servent des images (/images/...) de taille fixe et de contenu propre à chaque URL.
+
+Les réponses sont synthétiques et déterministes, ou rejouées depuis un cache HTTP enregistré
+par une vraie importation (dossier .http_cache): les URLs absolues des corps rejoués sont
+réécrites vers l'origine locale, et les images absentes de l'enregistrement sont synthétisées.
+
+Usage: python3 benchmarks/local_origin.py [shopify|html] [--port N] [--products N] [--replay DOSSIER]
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Configuration
+DEFAULT_PRODUCTS = 1000
+IMAGE_BYTES = 40 * 1024       # Taille des images synthétiques
+IMAGES_PER_PRODUCT = 2
+LISTING_PAGE_SIZE = 24        # Produits par page de collection (mode html)
+SHOPIFY_MAX_LIMIT = 250
+
+# Titres et types variés pour que le classement catégorie/genre des importeurs soit exercé
+PRODUCT_KINDS = (
+    ('Chemise Oxford Homme', 'chemises', 'homme'),
+    ('Robe Midi Femme', 'robes', 'femme'),
+    ('Pantalon Chino Homme', 'pantalons', 'homme'),
+    ('Veste en Laine Femme', 'vestes', 'femme'),
+    ('Montre Automatique Homme', 'montres', 'homme'),
+    ('Sac en Cuir Femme', 'sacs', 'femme'),
+    ('Écharpe Cachemire', 'accessoires', ''),
+    ('Pull Col Roulé Homme', 'pulls', 'homme'),
+)
+
+ABSOLUTE_URL_RE = re.compile(rb'(?:https?:)?//(?:[a-z0-9-]+\.)+[a-z]{2,}(?::\d+)?/', re.I)
+
+
+def synthetic_product(index, base_url):
+    """Produit Shopify (format products.json) déterministe"""
+    title, product_type, gender = PRODUCT_KINDS[index % len(PRODUCT_KINDS)]
+    price = 40 + (index * 37) % 900
+    return {
+        'id': 100000 + index,
+        'title': f"{title} {index + 1}",
+        'handle': f"produit-{index + 1}",
+        'body_html': f"<p>{title} en matière premium, pièce numéro {index + 1}.</p><p>Livraison offerte.</p>",
+        'product_type': product_type,
+        'vendor': 'Maison Test',
+        'tags': ', '.join(tag for tag in (gender, product_type) if tag),
+        'variants': [{'price': f"{price}.00", 'compare_at_price': f"{price * 13 // 10}.00" if index % 3 == 0 else None}],
+        'images': [{'src': f"{base_url}/images/produit-{index + 1}-{k + 1}.jpg"} for k in range(IMAGES_PER_PRODUCT)],
+    }
+
+
+def synthetic_image(path, size=IMAGE_BYTES):
+    """Octets d'image propres à une URL (les images ne sont pas dédoublonnées entre elles)"""
+    seed = hashlib.sha256(path.encode('utf-8')).digest()
+    return (b'\xff\xd8\xff\xe0' + seed * (size // len(seed) + 1))[:size]
+
+
+def product_page(product, base_url):
+    """Page produit HTML avec JSON-LD et Open Graph, entourée d'un gabarit de boutique réaliste"""
+    price = product['variants'][0]['price']
+    images = [image['src'] for image in product['images']]
+    ld = {
+        '@context': 'https://schema.org', '@type': 'Product', 'name': product['title'],
+        'description': re.sub(r'<[^>]+>', ' ', product['body_html']).strip(), 'image': images,
+        'offers': {'@type': 'Offer', 'price': price, 'priceCurrency': 'EUR'},
+    }
+    menu = ''.join(f'<li><a href="/collections/c{i}">Collection {i}</a></li>' for i in range(40))
+    gallery = ''.join(f'<img class="product-image" src="{src}">' for src in images)
+    return (
+        f'<html><head><title>{product["title"]}</title>'
+        f'<meta property="og:title" content="{product["title"]}">'
+        f'<meta property="og:image" content="{images[0]}">'
+        f'<script type="application/ld+json">{json.dumps(ld, ensure_ascii=False)}</script></head>'
+        f'<body><nav><ul>{menu}</ul></nav><div class="product-single">'
+        f'<h1 class="product-title">{product["title"]}</h1><span class="price">{price} €</span>'
+        f'<div class="product-description">{product["body_html"]}</div>{gallery}</div>'
+        f'<footer>{"<p>Mentions légales</p>" * 30}</footer></body></html>'
+    )
+
+
+def listing_page(page, count):
+    """Page de collection: liens vers les pages produits et vers les pages suivantes"""
+    start = (page - 1) * LISTING_PAGE_SIZE
+    links = ''.join(f'<a href="/products/produit-{i + 1}">Produit {i + 1}</a>'
+                    for i in range(start, min(start + LISTING_PAGE_SIZE, count)))
+    pages = (count + LISTING_PAGE_SIZE - 1) // LISTING_PAGE_SIZE
+    pagination = ''.join(f'<a href="/collections/all?page={p}">{p}</a>'
+                         for p in range(page + 1, min(page + 6, pages + 1)))
+    return f'<html><head><title>Collection</title></head><body>{links}<nav>{pagination}</nav></body></html>'
+
+
+def load_recording(cache_dir):
+    """Index chemin+requête -> (fichier du corps, Content-Type) d'un cache HTTP enregistré"""
+    recording = {}
+    db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'))
+    try:
+        rows = db.execute("SELECT key, url, status, headers FROM entries").fetchall()
+    finally:
+        db.close()
+    for key, url, status, headers in rows:
+        if status != 200:
+            continue
+        parts = urlsplit(url)
+        target = parts.path + (f"?{parts.query}" if parts.query else '')
+        content_type = json.loads(headers).get('Content-Type', 'application/octet-stream')
+        recording[target] = (os.path.join(cache_dir, key[:2], key), content_type)
+    return recording
+
+
+class LocalOrigin:
+    """Serveur HTTP local (thread d'arrière-plan), utilisable comme gestionnaire de contexte"""
+
+    def __init__(self, mode='shopify', products=DEFAULT_PRODUCTS, port=0, latency=0.0, replay=None):
+        self.mode = mode
+        self.products = products
+        self.latency = latency
+        self.recording = load_recording(replay) if replay else {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = None
+
+    def _handler_class(self):
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # En-têtes et corps partent en deux écritures: sans TCP_NODELAY, l'ACK retardé ajoute ~40 ms
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with origin._lock:
+                    origin.requests += 1
+                if origin.latency:
+                    time.sleep(origin.latency)
+                status, content_type, body = origin.respond(self.path)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def respond(self, target):
+        """Retourne (statut, Content-Type, corps) pour un chemin+requête"""
+        if target in self.recording:
+            path, content_type = self.recording[target]
+            with open(path, 'rb') as f:
+                body = f.read()
+            if 'json' in content_type or 'html' in content_type:
+                body = ABSOLUTE_URL_RE.sub(self.url.encode('ascii') + b'/', body)
+            return 200, content_type, body
+
+        parts = urlsplit(target)
+        query = parse_qs(parts.query)
+        page = max(int(query.get('page', ['1'])[0]), 1)
+        if parts.path.startswith('/images/') or parts.path.endswith(('.jpg', '.jpeg', '.png', '.webp')):
+            return 200, 'image/jpeg', synthetic_image(parts.path)
+
+        if self.mode == 'shopify' and parts.path.endswith('/products.json'):
+            limit = min(int(query.get('limit', ['30'])[0]), SHOPIFY_MAX_LIMIT)
+            start = (page - 1) * limit
+            items = [synthetic_product(i, self.url) for i in range(start, min(start + limit, self.products))]
+            return 200, 'application/json', json.dumps({'products': items}).encode('utf-8')
+
+        if self.mode == 'html':
+            if parts.path in ('/collections/all', '/products', '/'):
+                return 200, 'text/html; charset=utf-8', listing_page(page, self.products).encode('utf-8')
+            match = re.fullmatch(r'/products/produit-(\d+)', parts.path)
+            if match and 0 < int(match.group(1)) <= self.products:
+                product = synthetic_product(int(match.group(1)) - 1, self.url)
+                return 200, 'text/html; charset=utf-8', product_page(product, self.url).encode('utf-8')
+
+        return 404, 'text/plain', b'not found'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for name in ('--port', '--products', '--replay'):
+        if name in args:
+            position = args.index(name)
+            options[name] = args[position + 1]
+            del args[position:position + 2]
+    mode = args[0] if args else 'shopify'
+    origin = LocalOrigin(mode, products=int(options.get('--products', DEFAULT_PRODUCTS)),
+                         port=int(options.get('--port', 8770)), replay=options.get('--replay'))
+    print(f"🌐 Origine locale ({mode}) sur {origin.url}, Ctrl+C pour arrêter")
+    try:
+        origin.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
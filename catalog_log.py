@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Catalogue produits en JSON Lines, en ajout seul
+Un instantané (un produit par ligne) et un journal de modifications: ajouts, remplacements
+et suppressions sont ajoutés au journal; la compaction les reporte dans l'instantané et
+régénère new_products.json. Les parcours lisent l'instantané en streaming en appliquant
+les modifications en attente, la mémoire utilisée ne dépend que du nombre de modifications.
+Si new_products.json est modifié en dehors du journal alors que des modifications sont en
+attente, le catalogue refuse de s'ouvrir plutôt que d'en perdre: 'compact' garde le journal
+(et écrase new_products.json), 'import' garde new_products.json (et abandonne le journal).
+
+Usage: python3 catalog_log.py [compact|import|stats]
+"""
+
+import json
+import os
+import sys
+
+from catalog_store import NEW_PRODUCTS_FILE, file_signature
+from product_serializer import write_products_json
+
+# Configuration
+CATALOG_LOG_DIR = ".catalog_log"
+COMPACT_EVERY = 1000      # Compaction automatique au-delà de ce nombre de modifications en attente
+
+
+class JournalConflictError(RuntimeError):
+    """new_products.json a changé alors que le journal contient des modifications en attente"""
+
+
+class CatalogLog:
+    """
+    Catalogue en JSON Lines: snapshot.jsonl ({'position', 'product'} par ligne, dans l'ordre)
+    et changes.jsonl ({'op': 'put'|'delete', 'position', 'product'}). Rejouer le journal sur
+    un instantané qui les contient déjà ne change rien: une interruption pendant la compaction
+    est sans conséquence, et une dernière ligne tronquée est ignorée.
+    Sans modification en attente, l'instantané suit new_products.json quand celui-ci change;
+    avec des modifications en attente, JournalConflictError est levée, sauf avec keep_changes
+    (commandes compact et import, qui tranchent explicitement).
+    """
+
+    def __init__(self, log_dir=CATALOG_LOG_DIR, json_path=NEW_PRODUCTS_FILE, compact_every=COMPACT_EVERY,
+                 keep_changes=False):
+        self.log_dir = log_dir
+        self.json_path = json_path
+        self.compact_every = compact_every
+        self.snapshot_path = os.path.join(log_dir, 'snapshot.jsonl')
+        self.changes_path = os.path.join(log_dir, 'changes.jsonl')
+        self.meta_path = os.path.join(log_dir, 'meta.json')
+        self.changes = {}         # position -> produit, ou None si supprimé
+        self.pending = 0          # Enregistrements dans changes.jsonl
+        self.next_position = 0
+
+        os.makedirs(log_dir, exist_ok=True)
+        meta = self._read_meta()
+        self.next_position = meta.get('next_position', 0)
+        self._load_changes()
+        if not os.path.exists(self.json_path):
+            return
+        changed = (meta.get('json_signature') != file_signature(self.json_path)
+                   or not os.path.exists(self.snapshot_path))
+        if changed:
+            if self.pending:
+                if keep_changes:
+                    # compact/import: le choix entre journal et new_products.json est explicite
+                    return
+                # Les positions du journal désignent l'ancien instantané: ni rejouables, ni jetables
+                raise JournalConflictError(
+                    f"{self.json_path} a été modifié en dehors du journal alors que {self.pending} "
+                    f"modifications sont en attente dans {self.changes_path}. Pour les garder (et "
+                    f"écraser {self.json_path}): python3 catalog_log.py compact; pour les abandonner: "
+                    f"python3 catalog_log.py import")
+            # new_products.json modifié en dehors du journal: il devient le nouvel instantané
+            self.import_json()
+
+    # Métadonnées et journal
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, **values):
+        meta = self._read_meta()
+        meta.update(values)
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _load_changes(self):
+        if not os.path.exists(self.changes_path):
+            return
+        with open(self.changes_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Dernière ligne tronquée par une interruption
+                    continue
+                self._apply(record)
+                self.pending += 1
+
+    def _apply(self, record):
+        position = record['position']
+        self.changes[position] = record.get('product') if record['op'] == 'put' else None
+        self.next_position = max(self.next_position, position + 1)
+
+    def _append(self, records):
+        """Ajoute des enregistrements au journal, écrits sur disque avant de rendre la main"""
+        if not records:
+            return
+        with open(self.changes_path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        for record in records:
+            self._apply(record)
+        self.pending += len(records)
+
+    # Lecture (passes en streaming)
+
+    def _snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                yield record['position'], record['product']
+
+    def entries(self):
+        """Parcourt les couples (position, produit) dans l'ordre, modifications appliquées"""
+        seen = set()
+        for position, product in self._snapshot():
+            if position in self.changes:
+                seen.add(position)
+                product = self.changes[position]
+                if product is None:
+                    continue
+            yield position, product
+        # Positions ajoutées après l'instantané
+        for position in sorted(p for p in self.changes if p not in seen):
+            if self.changes[position] is not None:
+                yield position, self.changes[position]
+
+    def __iter__(self):
+        for _, product in self.entries():
+            yield product
+
+    def count(self):
+        return sum(1 for _ in self.entries())
+
+    def __len__(self):
+        return self.count()
+
+    def image_ids(self):
+        """Ensemble des IDs d'images référencés par au moins un produit"""
+        return {image_id for product in self for image_id in product.get('images') or []}
+
+    # Écriture (ajouts au journal)
+
+    def add_many(self, products):
+        """Ajoute des produits en fin de catalogue"""
+        records = []
+        position = self.next_position
+        for product in products:
+            records.append({'op': 'put', 'position': position, 'product': product})
+            position += 1
+        self._append(records)
+
+    def put(self, product, position=None):
+        """Remplace le produit à une position donnée, ou l'ajoute en fin de catalogue"""
+        position = self.next_position if position is None else position
+        self._append([{'op': 'put', 'position': position, 'product': product}])
+
+    def put_many(self, entries):
+        """Remplace des produits, donnés en couples (position, produit), en un seul ajout"""
+        self._append([{'op': 'put', 'position': position, 'product': product} for position, product in entries])
+
+    def delete_positions(self, positions):
+        """Supprime des produits par position; retourne le nombre d'enregistrements ajoutés"""
+        records = [{'op': 'delete', 'position': position} for position in positions]
+        self._append(records)
+        return len(records)
+
+    def delete(self, product_ids):
+        """Supprime tous les produits portant ces ids (une passe sur le catalogue)"""
+        product_ids = set(product_ids)
+        return self.delete_positions([position for position, product in self.entries()
+                                      if product.get('id') in product_ids])
+
+    def truncate(self, max_products):
+        """Ne garde que les max_products premiers produits; retourne le nombre supprimé"""
+        excess = [position for index, (position, _) in enumerate(self.entries()) if index >= max_products]
+        return self.delete_positions(excess)
+
+    # Compaction
+
+    def import_json(self, path=None):
+        """
+        Remplace l'instantané par le contenu d'un fichier JSON (tableau de produits); les
+        modifications en attente dans le journal sont abandonnées
+        """
+        path = path or self.json_path
+        with open(path, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+        self._write_snapshot(enumerate(products))
+        self._reset_changes(len(products))
+        if path == self.json_path:
+            self._write_meta(json_signature=file_signature(path))
+        return len(products)
+
+    def _write_snapshot(self, entries):
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for position, product in entries:
+                f.write(json.dumps({'position': position, 'product': product}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _reset_changes(self, next_position):
+        self.next_position = max(self.next_position, next_position)
+        self._write_meta(next_position=self.next_position)
+        # Un crash avant cette ligne rejoue un journal déjà contenu dans l'instantané: sans effet
+        open(self.changes_path, 'w').close()
+        self.changes = {}
+        self.pending = 0
+
+    def compact(self):
+        """Reporte le journal dans l'instantané et régénère new_products.json"""
+        self._write_snapshot(self.entries())
+        self._reset_changes(self.next_position)
+        count = write_products_json(self, self.json_path)
+        self._write_meta(json_signature=file_signature(self.json_path))
+        return count
+
+    def export_json(self, path=None, force=False):
+        """
+        Compacte le journal et régénère new_products.json si force est vrai ou si plus de
+        compact_every modifications sont en attente. Retourne le nombre de produits écrits,
+        ou None si les modifications restent dans le journal.
+        """
+        if path and path != self.json_path:
+            return write_products_json(self, path)
+        if not force and self.pending < self.compact_every:
+            if self.pending:
+                print(f"📝 {self.pending} modifications journalisées dans {self.changes_path} "
+                      f"(compaction: python3 catalog_log.py compact)")
+            return None
+        return self.compact()
+
+    def close(self):
+        pass
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'stats'
+    if command == 'compact':
+        count = CatalogLog(keep_changes=True).compact()
+        print(f"💾 Journal compacté, {NEW_PRODUCTS_FILE} régénéré ({count} produits)")
+        return
+    if command == 'import':
+        catalog = CatalogLog(keep_changes=True)
+        abandoned = catalog.pending
+        count = catalog.import_json()
+        print(f"💾 Instantané remplacé par {NEW_PRODUCTS_FILE} ({count} produits, "
+              f"{abandoned} modifications abandonnées)")
+        return
+    try:
+        catalog = CatalogLog()
+    except JournalConflictError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if command == 'stats':
+        print(f"📊 {catalog.count()} produits, {catalog.pending} modifications en attente "
+              f"dans {catalog.changes_path}")
+    else:
+        print("Usage: python3 catalog_log.py [compact|import|stats]")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
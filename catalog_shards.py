@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Découpage du catalogue (new_products.json) en modules TypeScript par catégorie/sous-catégorie
+Chaque tranche devient un module src/lib/catalog/<catégorie>--<sous-catégorie>.ts; un petit
+manifeste (manifest.ts) liste les tranches et les charge à la demande via import(), et
+product-index.ts associe slug et id d'un produit à sa tranche. Une page ne charge ainsi que
+la partie du catalogue qu'elle affiche.
+Seuls les fichiers dont le contenu a changé sont remplacés (builds incrémentaux).
+
+Usage: python3 catalog_shards.py [--log]
+"""
+
+import json
+import os
+import re
+import sys
+
+from catalog_store import open_catalog
+from product_serializer import PRODUCT_FIELDS, ProductWriter
+
+# Configuration
+SHARDS_DIR = "src/lib/catalog"
+MANIFEST_MODULE = "manifest"
+INDEX_MODULE = "product-index"
+
+HEADER = "// Généré par catalog_shards.py à partir de new_products.json, ne pas modifier\n"
+
+
+def shard_key(category, subcategory=None):
+    """Nom du module d'une tranche: <catégorie> ou <catégorie>--<sous-catégorie>"""
+    parts = [category or 'autres'] + ([subcategory] if subcategory else [])
+    return '--'.join(re.sub(r'[^a-z0-9_-]+', '-', part.lower()).strip('-') for part in parts)
+
+
+def render_manifest(shards):
+    """shards: liste de (clé, catégorie, sous-catégorie, nombre de produits)"""
+    entries = ''.join(
+        f"  {{ key: {json.dumps(key)}, category: {json.dumps(category)}, "
+        f"subcategory: {json.dumps(subcategory)}, count: {count} }},\n"
+        for key, category, subcategory, count in shards)
+    loaders = ''.join(f"  {json.dumps(key)}: () => import('./{key}'),\n" for key, _, _, _ in shards)
+    total = sum(count for _, _, _, count in shards)
+    return f"""{HEADER}import type {{ Product }} from '../types';
+
+export type CatalogShard = {{
+  key: string;
+  category: string;
+  subcategory: string | null;
+  count: number;
+}};
+
+export const catalogProductCount = {total};
+
+export const catalogShards: CatalogShard[] = [
+{entries}];
+
+const shardLoaders: Record<string, () => Promise<{{ products: Product[] }}>> = {{
+{loaders}}};
+
+export async function loadShard(key: string): Promise<Product[]> {{
+  const loader = shardLoaders[key];
+  return loader ? (await loader()).products : [];
+}}
+
+async function loadShards(shards: CatalogShard[]): Promise<Product[]> {{
+  const slices = await Promise.all(shards.map((shard) => loadShard(shard.key)));
+  return slices.flat();
+}}
+
+export function loadAllProducts(): Promise<Product[]> {{
+  return loadShards(catalogShards);
+}}
+
+export function loadCategory(category: string): Promise<Product[]> {{
+  return loadShards(catalogShards.filter((shard) => shard.category === category));
+}}
+
+export function loadSubcategory(category: string, subcategory: string): Promise<Product[]> {{
+  return loadShards(catalogShards.filter(
+    (shard) => shard.category === category && shard.subcategory === subcategory
+  ));
+}}
+
+export async function loadProductBySlug(slug: string): Promise<Product | undefined> {{
+  const {{ shardBySlug }} = await import('./{INDEX_MODULE}');
+  const key = shardBySlug[slug];
+  return key ? (await loadShard(key)).find((p) => p.slug === slug) : undefined;
+}}
+
+export async function loadProductById(id: string): Promise<Product | undefined> {{
+  const {{ shardById }} = await import('./{INDEX_MODULE}');
+  const key = shardById[id];
+  return key ? (await loadShard(key)).find((p) => p.id === id) : undefined;
+}}
+"""
+
+
+def render_index(by_slug, by_id):
+    return (f"{HEADER}\n"
+            f"export const shardBySlug: Record<string, string> = "
+            f"{json.dumps(by_slug, ensure_ascii=False, indent=2)};\n\n"
+            f"export const shardById: Record<string, string> = "
+            f"{json.dumps(by_id, ensure_ascii=False, indent=2)};\n")
+
+
+def write_if_changed(path, content):
+    """Écrit path seulement si son contenu change; retourne True si le fichier a été écrit"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+def emit_shards(catalog, out_dir=SHARDS_DIR):
+    """
+    Écrit les modules par tranche, le manifeste et l'index slug/id -> tranche.
+    Retourne (nombre de tranches, fichiers écrits, fichiers supprimés).
+    """
+    slices = {}               # clé -> (catégorie, sous-catégorie, produits), ordre du catalogue
+    by_slug = {}
+    by_id = {}
+    for product in catalog:
+        category, subcategory = product.get('category') or 'autres', product.get('subcategory')
+        key = shard_key(category, subcategory)
+        slices.setdefault(key, (category, subcategory, []))[2].append(product)
+        # Premier produit d'un slug ou d'un id, comme getProductBySlug/getProductById
+        if product.get('slug'):
+            by_slug.setdefault(product['slug'], key)
+        if product.get('id'):
+            by_id.setdefault(product['id'], key)
+
+    os.makedirs(out_dir, exist_ok=True)
+    written = 0
+    for key, (_, _, products) in slices.items():
+        with ProductWriter(os.path.join(out_dir, f"{key}.ts"), 'ts', export_name='products', type_name='Product',
+                           preamble=f"{HEADER}import type {{ Product }} from '../types';\n\n",
+                           fields=PRODUCT_FIELDS, drop_none=True, skip_unchanged=True) as writer:
+            writer.write_all(products)
+        written += writer.changed
+    outputs = {f"{key}.ts" for key in slices}
+    shards = [(key, category, subcategory, len(products))
+              for key, (category, subcategory, products) in sorted(slices.items())]
+    modules = {
+        f"{MANIFEST_MODULE}.ts": render_manifest(shards),
+        f"{INDEX_MODULE}.ts": render_index(by_slug, by_id),
+    }
+    written += sum(write_if_changed(os.path.join(out_dir, name), content) for name, content in modules.items())
+    outputs.update(modules)
+    # Tranches disparues du catalogue
+    removed = 0
+    for name in os.listdir(out_dir):
+        if name.endswith('.ts') and name not in outputs:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    return len(slices), written, removed
+
+
+def main():
+    print("🧩 Découpage du catalogue en modules par catégorie...\n")
+    catalog = open_catalog(sys.argv)
+    count, written, removed = emit_shards(catalog)
+    catalog.close()
+    print(f"✅ {count} tranches dans {SHARDS_DIR}/ ({written} fichiers écrits, {removed} supprimés)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Catalogue produits indexé (SQLite) partagé par les scripts d'importation et de nettoyage
+Les produits sont lus et modifiés un par un via des index (id, slug, catégorie/sous-catégorie,
+ID d'image); new_products.json est régénéré à la demande par export_json().
+
+Usage: python3 catalog_store.py [export|import|stats]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+
+from product_serializer import write_products_json
+
+# Configuration
+CATALOG_DB = ".catalog.sqlite"
+NEW_PRODUCTS_FILE = "new_products.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    position INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    slug TEXT,
+    category TEXT,
+    subcategory TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_id ON products(id);
+CREATE INDEX IF NOT EXISTS products_slug ON products(slug);
+CREATE INDEX IF NOT EXISTS products_category ON products(category, subcategory);
+CREATE TABLE IF NOT EXISTS product_images (
+    image_id TEXT NOT NULL,
+    position INTEGER NOT NULL REFERENCES products(position) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS product_images_image ON product_images(image_id);
+CREATE INDEX IF NOT EXISTS product_images_position ON product_images(position);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def file_signature(path):
+    """Taille et date de modification d'un fichier, pour détecter une modification externe"""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class CatalogStore:
+    """
+    Catalogue produits dans une base SQLite, dans l'ordre de new_products.json.
+    Chaque produit est identifié par sa position: new_products.json peut contenir
+    plusieurs produits de même id, qui sont conservés tels quels.
+    La base est (re)construite depuis new_products.json quand celui-ci a été modifié
+    en dehors du catalogue (édition manuelle, checkout git...).
+    """
+
+    def __init__(self, db_path=CATALOG_DB, json_path=NEW_PRODUCTS_FILE):
+        self.db_path = db_path
+        self.json_path = json_path
+        self.db = sqlite3.connect(db_path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+        self._sync_from_json()
+
+    # Synchronisation avec new_products.json
+
+    def _meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _sync_from_json(self):
+        """Recharge new_products.json s'il a changé depuis le dernier import ou export"""
+        if not os.path.exists(self.json_path):
+            return
+        if self._meta('json_signature') == file_signature(self.json_path):
+            return
+        self.import_json()
+
+    def import_json(self, path=None):
+        """Remplace le contenu du catalogue par celui d'un fichier JSON (tableau de produits)"""
+        path = path or self.json_path
+        with open(path, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+        with self.db:
+            self.db.execute("DELETE FROM product_images")
+            self.db.execute("DELETE FROM products")
+            for position, product in enumerate(products):
+                self._insert(product, position)
+            if path == self.json_path:
+                self._set_meta('json_signature', file_signature(path))
+            self._set_meta('dirty', '0')
+        return len(products)
+
+    # Lecture
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        """Parcourt les produits dans l'ordre du catalogue, sans tout charger en mémoire"""
+        for _, product in self.entries():
+            yield product
+
+    def entries(self):
+        """Parcourt les couples (position, produit) dans l'ordre du catalogue"""
+        for position, data in self.db.execute("SELECT position, data FROM products ORDER BY position"):
+            yield position, json.loads(data)
+
+    def raw_entries(self):
+        """Parcourt les couples (position, produit encodé en JSON) sans les décoder"""
+        return self.db.execute("SELECT position, data FROM products ORDER BY position")
+
+    def get(self, product_id):
+        """Premier produit portant cet id"""
+        row = self.db.execute("SELECT data FROM products WHERE id = ? ORDER BY position LIMIT 1",
+                              (product_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_by_slug(self, slug):
+        row = self.db.execute("SELECT data FROM products WHERE slug = ? ORDER BY position LIMIT 1",
+                              (slug,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def by_category(self, category, subcategory=None):
+        """Produits d'une catégorie (et éventuellement d'une sous-catégorie)"""
+        if subcategory is None:
+            rows = self.db.execute("SELECT data FROM products WHERE category = ? ORDER BY position",
+                                   (category,))
+        else:
+            rows = self.db.execute(
+                "SELECT data FROM products WHERE category = ? AND subcategory = ? ORDER BY position",
+                (category, subcategory))
+        return [json.loads(data) for (data,) in rows]
+
+    def products_with_image(self, image_id):
+        """Produits qui référencent un ID d'image"""
+        rows = self.db.execute(
+            "SELECT DISTINCT p.position, p.data FROM product_images i JOIN products p ON p.position = i.position "
+            "WHERE i.image_id = ? ORDER BY p.position", (image_id,))
+        return [json.loads(data) for _, data in rows]
+
+    def image_ids(self):
+        """Ensemble des IDs d'images référencés par au moins un produit"""
+        return {image_id for (image_id,) in self.db.execute("SELECT DISTINCT image_id FROM product_images")}
+
+    # Écriture
+
+    def _insert(self, product, position):
+        self.db.execute(
+            "INSERT OR REPLACE INTO products (position, id, slug, category, subcategory, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (position, product['id'], product.get('slug'), product.get('category'),
+             product.get('subcategory'), json.dumps(product, ensure_ascii=False)))
+        self.db.execute("DELETE FROM product_images WHERE position = ?", (position,))
+        self.db.executemany("INSERT INTO product_images (image_id, position) VALUES (?, ?)",
+                            [(image_id, position) for image_id in product.get('images') or []])
+
+    def _next_position(self):
+        return self.db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM products").fetchone()[0]
+
+    def add_many(self, products):
+        """Ajoute des produits en fin de catalogue"""
+        with self.db:
+            position = self._next_position()
+            for product in products:
+                self._insert(product, position)
+                position += 1
+            self._set_meta('dirty', '1')
+
+    def put(self, product, position=None):
+        """Remplace le produit à une position donnée, ou l'ajoute en fin de catalogue"""
+        with self.db:
+            self._insert(product, self._next_position() if position is None else position)
+            self._set_meta('dirty', '1')
+
+    def put_many(self, entries):
+        """Remplace des produits, donnés en couples (position, produit), en une transaction"""
+        with self.db:
+            for position, product in entries:
+                self._insert(product, position)
+            self._set_meta('dirty', '1')
+
+    def delete_positions(self, positions):
+        """Supprime des produits par position; retourne le nombre de produits supprimés"""
+        with self.db:
+            deleted = 0
+            for position in positions:
+                deleted += self.db.execute("DELETE FROM products WHERE position = ?", (position,)).rowcount
+            if deleted:
+                self._set_meta('dirty', '1')
+        return deleted
+
+    def delete(self, product_ids):
+        """Supprime tous les produits portant ces ids; retourne le nombre de produits supprimés"""
+        with self.db:
+            deleted = 0
+            for product_id in product_ids:
+                deleted += self.db.execute("DELETE FROM products WHERE id = ?", (product_id,)).rowcount
+            if deleted:
+                self._set_meta('dirty', '1')
+        return deleted
+
+    def truncate(self, max_products):
+        """Ne garde que les max_products premiers produits; retourne le nombre supprimé"""
+        with self.db:
+            row = self.db.execute("SELECT position FROM products ORDER BY position LIMIT 1 OFFSET ?",
+                                  (max_products,)).fetchone()
+            if row is None:
+                return 0
+            deleted = self.db.execute("DELETE FROM products WHERE position >= ?", (row[0],)).rowcount
+            self._set_meta('dirty', '1')
+        return deleted
+
+    # Export
+
+    def is_dirty(self):
+        """Vrai si le catalogue a été modifié depuis le dernier export"""
+        return self._meta('dirty') == '1' or not os.path.exists(self.json_path)
+
+    def export_json(self, path=None, force=False):
+        """
+        Régénère new_products.json en streaming (même format que json.dump(..., indent=2)).
+        Sans force, l'export est sauté si le catalogue n'a pas changé. Retourne le nombre
+        de produits écrits, ou None si l'export a été sauté.
+        """
+        path = path or self.json_path
+        if path == self.json_path and not force and not self.is_dirty():
+            return None
+        count = write_products_json(iter(self), path)
+        if path == self.json_path:
+            with self.db:
+                self._set_meta('json_signature', file_signature(path))
+                self._set_meta('dirty', '0')
+        return count
+
+    def close(self):
+        self.db.close()
+
+
+def has_unexported_changes(db_path=CATALOG_DB):
+    """
+    Vrai si la base contient des modifications pas encore exportées dans new_products.json
+    (sans ouvrir le catalogue, donc sans le resynchroniser)
+    """
+    if not os.path.exists(db_path):
+        return False
+    db = sqlite3.connect(db_path)
+    try:
+        row = db.execute("SELECT value FROM meta WHERE key = 'dirty'").fetchone()
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        db.close()
+    return row is not None and row[0] == '1'
+
+
+def open_catalog(argv=()):
+    """
+    Ouvre le catalogue des scripts: le journal JSON Lines en ajout seul avec --log,
+    la base SQLite indexée sinon
+    """
+    if '--log' in argv:
+        from catalog_log import CatalogLog
+        return CatalogLog()
+    return CatalogStore()
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'stats'
+    catalog = CatalogStore()
+    if command == 'export':
+        count = catalog.export_json(force=True)
+        print(f"💾 {NEW_PRODUCTS_FILE} régénéré ({count} produits)")
+    elif command == 'import':
+        count = catalog.import_json()
+        print(f"📥 {count} produits importés depuis {NEW_PRODUCTS_FILE}")
+    elif command == 'stats':
+        print(f"📊 {catalog.count()} produits dans {CATALOG_DB}")
+        rows = catalog.db.execute(
+            "SELECT category, COUNT(*) FROM products GROUP BY category ORDER BY COUNT(*) DESC")
+        for category, count in rows:
+            print(f"  {category or '-':<20} {count:5d}")
+    else:
+        print("Usage: python3 catalog_store.py [export|import|stats]")
+        sys.exit(1)
+    catalog.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ajout ou mise à jour (upsert) des produits importés dans le catalogue
+Un index en mémoire, construit en une passe sur le catalogue, retrouve un produit existant
+par son URL source (sourceUrl) puis par son slug: relancer une importation met à jour les
+produits déjà présents au lieu de les dupliquer.
+"""
+
+# Champs mis à jour sur un produit existant; les autres (id, noms, textes...) sont conservés
+MERGED_FIELDS = ('price', 'oldPrice', 'images', 'sourceUrl')
+
+
+class UpsertIndex:
+    """
+    Index sourceUrl/slug -> produit du catalogue.
+    stage() planifie chaque produit importé (insertion ou mise à jour), apply() écrit le
+    plan dans le catalogue: les produits en double dans une même importation sont fusionnés.
+    Un index sert à une seule importation.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.products = {}       # position -> produit existant
+        self.by_source = {}      # sourceUrl -> cible
+        self.by_slug = {}        # slug -> cible
+        self.inserts = []        # Nouveaux produits, dans l'ordre d'importation
+        self.updates = []        # (cible, produit importé)
+        for position, product in catalog.entries():
+            self.products[position] = product
+            self._register(product, position)
+
+    def _register(self, product, target):
+        if product.get('sourceUrl'):
+            self.by_source.setdefault(product['sourceUrl'], target)
+        if product.get('slug'):
+            self.by_slug.setdefault(product['slug'], target)
+
+    def find(self, product):
+        """Cible d'un produit importé: position existante, ('new', i) planifié, ou None"""
+        target = None
+        if product.get('sourceUrl'):
+            target = self.by_source.get(product['sourceUrl'])
+        if target is None and product.get('slug'):
+            target = self.by_slug.get(product['slug'])
+        return target
+
+    @property
+    def insert_count(self):
+        return len(self.inserts)
+
+    def stage(self, product):
+        """Planifie l'upsert d'un produit; retourne 'insert' ou 'update'"""
+        target = self.find(product)
+        if target is None:
+            target = ('new', len(self.inserts))
+            self.inserts.append(product)
+            self._register(product, target)
+            return 'insert'
+        self.updates.append((target, product))
+        self._register(product, target)
+        return 'update'
+
+    @staticmethod
+    def merge(existing, product):
+        """Copie de existing avec les champs MERGED_FIELDS renseignés de product"""
+        merged = dict(existing)
+        for field in MERGED_FIELDS:
+            value = product.get(field)
+            if value is not None and value != [] and value != '':
+                merged[field] = value
+        return merged
+
+    def apply(self):
+        """
+        Écrit les insertions et mises à jour planifiées dans le catalogue.
+        Retourne les compteurs {'inserted', 'updated', 'unchanged', 'merged'}: chaque produit
+        du catalogue compte une fois (mis à jour ou inchangé), et les doublons d'un produit
+        déjà rencontré dans la même importation sont comptés à part (merged).
+        """
+        touched = set()
+        changed = set()
+        merged_count = 0
+        for target, product in self.updates:
+            if isinstance(target, tuple):
+                # Doublon au sein de l'importation: fusionné dans le produit à insérer
+                self.inserts[target[1]] = self.merge(self.inserts[target[1]], product)
+                merged_count += 1
+                continue
+            if target in touched:
+                merged_count += 1
+            touched.add(target)
+            merged = self.merge(self.products[target], product)
+            if merged != self.products[target]:
+                self.products[target] = merged
+                changed.add(target)
+
+        if self.inserts:
+            self.catalog.add_many(self.inserts)
+        if changed:
+            self.catalog.put_many([(position, self.products[position]) for position in sorted(changed)])
+
+        counts = {'inserted': len(self.inserts), 'updated': len(changed),
+                  'unchanged': len(touched - changed), 'merged': merged_count}
+        self.inserts = []
+        self.updates = []
+        return counts
+
+
+def print_counts(counts):
+    """Affiche le résultat d'un upsert"""
+    print(f"🔁 {counts['inserted']} produits ajoutés, {counts['updated']} mis à jour, "
+          f"{counts['unchanged']} inchangés, {counts['merged']} doublons fusionnés")
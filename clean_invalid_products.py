@@ -3,100 +3,233 @@
 
 """
 Script pour nettoyer les produits invalides du fichier new_products.json
+Avec --log, passe en streaming sur le catalogue en JSON Lines (catalog_log.py)
+Avec --workers [N], le travail est réparti entre N processus (un par cœur sans N):
+new_products.json est découpé en lots de textes JSON sans être décodé; chaque processus
+décode et vérifie son lot puis encode les produits conservés, que ce processus-ci réécrit
+dans l'ordre, en une passe et sans passer par la base SQLite. Avec --log, ou si la base
+contient des modifications pas encore exportées, seule la vérification est répartie.
+Avec --summary (implicite avec --workers), un rapport par règle remplace la liste des rejets.
+
+Usage: python3 clean_invalid_products.py [--log] [--workers [N]] [--summary]
 """
 
 import json
-import re
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+from catalog_store import NEW_PRODUCTS_FILE, has_unexported_changes, open_catalog
+from json_stream import indented_array_texts, iter_json_array
+from placeholder_images import PLACEHOLDER_IMAGE_MAP_FILE, PLACEHOLDER_IMAGES_FILE, PlaceholderImages
+from product_filters import get_filter, rule_counts
+from product_serializer import ProductWriter, ordered_product, to_literal
+
+# Configuration
+CHUNK_SIZE = 20000        # Produits par lot confié à un processus
+REPORT_EXAMPLES = 3       # Noms cités par règle dans le rapport
+
+CATALOG_FILTER = get_filter('catalog')
 
-NEW_PRODUCTS_FILE = "new_products.json"
-PLACEHOLDER_IMAGES_FILE = "src/lib/placeholder-images.json"
 
 def is_invalid_product(product):
-    """Vérifie si un produit est invalide"""
-    name = product.get('name', '') or product.get('name_fr', '')
-    
-    if not name or len(name.strip()) < 3:
-        return True
-    
-    # Exclure les éléments de navigation
-    excluded_keywords = [
-        'acceuil', 'accueil', 'boutique', 'contact', 'blog', 'à propos', 'a propos',
-        'information', 'emplacement', 'apprenez', 'notre', 'nous', 'connaître',
-        'panier', 'loading', 'done', 'ajouter', 'produit en vente', '%',
-        '📞', 'phone', 'téléphone', 'tel:', 'mailto:', 'facebook', 'instagram',
-        '33 6 29', '29 61 06'
-    ]
-    
-    name_lower = name.lower()
-    for keyword in excluded_keywords:
-        if keyword in name_lower:
-            return True
+    """Vérifie si un produit est invalide (règles 'catalog' de product_filters.py)"""
+    return CATALOG_FILTER.rejection(product) is not None
+
+def _product_name(product):
+    return product.get('name', '') or product.get('name_fr', '')
+
+def check_chunk(entries):
+    """
+    Rejets (position, nom, motif) d'une suite de (position, produit), dans l'ordre.
+    Un produit encodé en JSON est décodé ici, dans le processus qui le vérifie.
+    """
+    rejected = []
+    rejection = CATALOG_FILTER.rejection
+    for position, product in entries:
+        if isinstance(product, str):
+            product = json.loads(product)
+        reason = rejection(product)
+        if reason is not None:
+            rejected.append((position, _product_name(product), reason))
+    return rejected
+
+def clean_chunk(entries):
+    """
+    Vérifie un lot de couples (position, produit ou produit encodé en JSON) et encode les
+    produits conservés au format de new_products.json.
+    Retourne (rejets, produits conservés encodés, IDs de leurs images).
+    """
+    rejected = []
+    kept = []
+    image_ids = set()
+    rejection = CATALOG_FILTER.rejection
+    for position, product in entries:
+        if isinstance(product, str):
+            product = json.loads(product)
+        reason = rejection(product)
+        if reason is None:
+            kept.append(to_literal(ordered_product(product), 2))
+            image_ids.update(product.get('images') or [])
+        else:
+            rejected.append((position, _product_name(product), reason))
+    return rejected, kept, image_ids
+
+def _map_chunks(func, chunks, workers):
+    """
+    Applique func à chaque lot dans `workers` processus et produit les résultats dans l'ordre.
+    Les lots sont lus dans ce thread et au plus 2 lots par processus sont en attente: la
+    mémoire ne dépend pas de la taille du catalogue.
+    """
+    pending = deque()
+    with Pool(workers) as pool:
+        for chunk in chunks:
+            pending.append(pool.apply_async(func, (chunk,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+def _chunks(entries, chunk_size):
+    entries = iter(entries)
+    return iter(lambda: list(islice(entries, chunk_size)), [])
+
+def find_invalid(catalog, workers=1, chunk_size=CHUNK_SIZE):
+    """Rejets (position, nom, motif) du catalogue, dans l'ordre, vérifiés par `workers` processus"""
+    if workers <= 1:
+        return check_chunk(catalog.entries())
+    # La base SQLite fournit les produits encore encodés: le décodage est réparti lui aussi
+    entries = catalog.raw_entries() if hasattr(catalog, 'raw_entries') else catalog.entries()
+    rejected = []
+    for chunk_rejected in _map_chunks(check_chunk, _chunks(entries, chunk_size), workers):
+        rejected.extend(chunk_rejected)
+    return rejected
+
+def clean_json_file(path, workers, chunk_size=CHUNK_SIZE):
+    """
+    Nettoie un fichier JSON de produits en parallèle: découpage en streaming (décodage compris
+    si le fichier n'est pas indenté comme new_products.json), vérification et encodage dans
+    `workers` processus, réécriture des produits conservés dans l'ordre (le fichier n'est pas
+    remplacé si rien n'a changé).
+    Retourne (nombre de produits lus, rejets (position, nom, motif), IDs d'images conservés,
+    vrai si le fichier a été réécrit).
+    """
+    total = 0
+    rejected = []
+    image_ids = set()
+    with ProductWriter(path, 'json', indent=2, skip_unchanged=True) as writer:
+        with open(path, 'r', encoding='utf-8') as f:
+            items = indented_array_texts(f)
+            if items is None:
+                items = iter_json_array(f)
+            chunks = _chunks(enumerate(items), chunk_size)
+            for chunk_rejected, kept, chunk_image_ids in _map_chunks(clean_chunk, chunks, workers):
+                total += len(chunk_rejected) + len(kept)
+                rejected.extend(chunk_rejected)
+                image_ids |= chunk_image_ids
+                for literal in kept:
+                    writer.write_literal(literal)
+    return total, rejected, image_ids, writer.changed
+
+def print_report(rejected):
+    """Rapport des rejets: nombre par règle et quelques noms rejetés"""
+    examples = {}
+    for _, name, reason in rejected:
+        names = examples.setdefault(reason.split(':', 1)[0], [])
+        if len(names) < REPORT_EXAMPLES:
+            names.append(repr(name[:40]))
+    for rule, count in rule_counts(reason for _, _, reason in rejected):
+        print(f"   - {rule}: {count} (ex. {', '.join(examples[rule])})")
+
+def workers_option(argv):
+    """Nombre de processus demandé par --workers [N] (un par cœur sans N), 1 sans l'option"""
+    if '--workers' not in argv:
+        return 1
+    position = argv.index('--workers')
+    if position + 1 < len(argv) and argv[position + 1].isdigit():
+        return max(int(argv[position + 1]), 1)
+    return os.cpu_count() or 1
+
+def clean_orphan_images(valid_image_ids):
+    """Garde seulement les images référencées par les produits valides"""
+    placeholder_images = PlaceholderImages()
+    removed_images = placeholder_images.retain(valid_image_ids)
+    if removed_images > 0:
+        print(f"\n🗑️  {removed_images} images orphelines supprimées")
+    if placeholder_images.save():
+        print(f"💾 {PLACEHOLDER_IMAGES_FILE} et {PLACEHOLDER_IMAGE_MAP_FILE} mis à jour")
+
+def main_parallel(workers):
+    """Nettoyage en parallèle de new_products.json, sans passer par la base SQLite"""
+    print(f"⚙️  {workers} processus, lots de {CHUNK_SIZE} produits\n")
+    start = time.perf_counter()
+    try:
+        total, rejected, valid_image_ids, changed = clean_json_file(NEW_PRODUCTS_FILE, workers)
+    except Exception as e:
+        print(f"❌ Erreur lors de la lecture: {e}")
+        return
+    elapsed = time.perf_counter() - start
     
-    # Vérifier que le nom contient au moins quelques lettres
-    if not re.search(r'[a-zA-Z]{3,}', name):
-        return True
+    print(f"📊 {total} produits au total")
+    print(f"\n✓ {len(rejected)} produits invalides supprimés ({elapsed:.1f}s)")
+    print_report(rejected)
+    print(f"✓ {total - len(rejected)} produits valides conservés\n")
+    if changed:
+        print(f"💾 {NEW_PRODUCTS_FILE} mis à jour")
     
-    # Vérifier que le slug n'est pas vide
-    if not product.get('slug') or len(product.get('slug', '')) < 3:
-        return True
+    clean_orphan_images(valid_image_ids)
     
-    return False
+    print("\n✅ Nettoyage terminé!")
 
 def main():
     print("🧹 Nettoyage des produits invalides...\n")
+    workers = workers_option(sys.argv)
+    summary = '--summary' in sys.argv or workers > 1
+    
+    # En parallèle, new_products.json est réécrit directement, sauf si la base SQLite contient
+    # des modifications qu'il ne reflète pas encore
+    if (workers > 1 and '--log' not in sys.argv and os.path.exists(NEW_PRODUCTS_FILE)
+            and not has_unexported_changes()):
+        main_parallel(workers)
+        return
     
-    # Charger les produits
+    # Ouvrir le catalogue
     try:
-        with open(NEW_PRODUCTS_FILE, 'r', encoding='utf-8') as f:
-            products = json.load(f)
+        catalog = open_catalog(sys.argv)
     except Exception as e:
         print(f"❌ Erreur lors de la lecture: {e}")
         return
     
-    print(f"📊 {len(products)} produits au total\n")
+    print(f"📊 {catalog.count()} produits au total\n")
     
-    # Filtrer les produits valides
-    valid_products = []
-    invalid_count = 0
+    # Repérer les produits invalides (en une passe, avec la règle enfreinte)
+    rejected = find_invalid(catalog, workers)
     
-    for product in products:
-        if is_invalid_product(product):
-            invalid_count += 1
-            print(f"  ✗ Supprimé: {product.get('name', '')[:50]}")
-        else:
-            valid_products.append(product)
-    
-    print(f"\n✓ {invalid_count} produits invalides supprimés")
-    print(f"✓ {len(valid_products)} produits valides conservés\n")
+    if not summary:
+        for _, name, reason in rejected:
+            print(f"  ✗ Supprimé: {name[:50]} ({reason})")
     
-    # Sauvegarder
-    with open(NEW_PRODUCTS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(valid_products, f, ensure_ascii=False, indent=2)
+    catalog.delete_positions([position for position, _, _ in rejected])
     
-    print(f"💾 {NEW_PRODUCTS_FILE} mis à jour")
-    
-    # Nettoyer aussi les images orphelines
-    try:
-        with open(PLACEHOLDER_IMAGES_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            placeholder_images = data.get('placeholderImages', [])
-    except:
-        placeholder_images = []
+    print(f"\n✓ {len(rejected)} produits invalides supprimés")
+    if summary:
+        print_report(rejected)
+    else:
+        for rule, count in rule_counts(reason for _, _, reason in rejected):
+            print(f"   - {rule}: {count}")
+    print(f"✓ {catalog.count()} produits valides conservés\n")
     
-    # Garder seulement les images référencées par les produits valides
-    valid_image_ids = set()
-    for product in valid_products:
-        for img_id in product.get('images', []):
-            valid_image_ids.add(img_id)
-    
-    valid_images = [img for img in placeholder_images if img.get('id') in valid_image_ids]
-    removed_images = len(placeholder_images) - len(valid_images)
+    # Sauvegarder
+    if catalog.export_json() is not None:
+        print(f"💾 {NEW_PRODUCTS_FILE} mis à jour")
     
-    if removed_images > 0:
-        print(f"\n🗑️  {removed_images} images orphelines supprimées")
-        with open(PLACEHOLDER_IMAGES_FILE, 'w', encoding='utf-8') as f:
-            json.dump({'placeholderImages': valid_images}, f, ensure_ascii=False, indent=2)
-        print(f"💾 {PLACEHOLDER_IMAGES_FILE} mis à jour")
+    # Nettoyer aussi les images orphelines, référencées par aucun produit valide
+    valid_image_ids = catalog.image_ids()
+    catalog.close()
+    clean_orphan_images(valid_image_ids)
     
     print("\n✅ Nettoyage terminé!")
 
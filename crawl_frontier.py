@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Frontière de crawl pour le scraping HTML des importeurs
+File d'URLs dédoublonnée, limites de profondeur et de pages, workers concurrents,
+limitation de débit par hôte (token bucket) et budget de crawl
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urldefrag, urlparse
+
+import http_client
+import import_metrics
+
+# Configuration
+WORKERS = 4
+MAX_DEPTH = 2
+MAX_PAGES = 1000          # Nombre maximal de pages récupérées
+RATE_PER_HOST = 2.0       # Requêtes par seconde et par hôte
+BURST = 2                 # Requêtes autorisées d'affilée avant limitation
+
+
+class TokenBucket:
+    """Limiteur de débit: `rate` jetons par seconde, au plus `burst` en réserve"""
+
+    def __init__(self, rate=RATE_PER_HOST, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloque jusqu'à obtenir un jeton"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+class CrawlFrontier:
+    """
+    Crawl concurrent piloté par un handler.
+
+    handler(item, text, enqueue) reçoit l'élément {'url', 'kind', 'depth'}, le HTML de la
+    page et une fonction enqueue(url, kind) pour ajouter des liens; il retourne la liste
+    des résultats extraits de la page. run() retourne tous les résultats dans l'ordre
+    de découverte des pages, indépendamment de l'ordre d'arrivée des réponses.
+    """
+
+    def __init__(self, handler, headers=None, workers=WORKERS, max_depth=MAX_DEPTH,
+                 max_pages=MAX_PAGES, max_results=None, time_budget=None,
+                 rate_per_host=RATE_PER_HOST, burst=BURST):
+        self.handler = handler
+        self.headers = headers
+        self.workers = workers
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_results = max_results
+        self.time_budget = time_budget
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.pages_fetched = 0
+        self.errors = 0
+        self._queue = deque()
+        self._seen = set()
+        self._buckets = {}
+        self._results = []
+        self._lock = threading.Lock()
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_per_host, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def add(self, url, kind='page', depth=0, order=()):
+        """Ajoute une URL à la frontière si elle est nouvelle et dans les limites"""
+        url = urldefrag(url)[0]
+        if not url or depth > self.max_depth:
+            return False
+        with self._lock:
+            if url in self._seen:
+                return False
+            self._seen.add(url)
+            self._queue.append({'url': url, 'kind': kind, 'depth': depth, 'order': order})
+        return True
+
+    def _result_count(self):
+        with self._lock:
+            return len(self._results)
+
+    def _budget_exhausted(self, start):
+        if self.pages_fetched >= self.max_pages:
+            return True
+        if self.max_results is not None and self._result_count() >= self.max_results:
+            return True
+        if self.time_budget is not None and time.monotonic() - start >= self.time_budget:
+            return True
+        return False
+
+    def _process(self, item):
+        self._bucket(item['url']).acquire()
+        response = http_client.get(item['url'], headers=self.headers, timeout=30)
+        response.raise_for_status()
+        self._handle(item, response.text)
+
+    def process_page(self, url, text, kind='page', depth=0):
+        """Traite une page déjà récupérée comme point de départ du crawl"""
+        url = urldefrag(url)[0]
+        with self._lock:
+            self._seen.add(url)
+            order = (len(self._seen),)
+        self._handle({'url': url, 'kind': kind, 'depth': depth, 'order': order}, text)
+
+    def _handle(self, item, text):
+        children = []
+
+        def enqueue(url, kind='page'):
+            order = item['order'] + (len(children),)
+            children.append(url)
+            return self.add(url, kind, item['depth'] + 1, order)
+
+        # Le handler analyse la page: son temps est compté dans l'étape 'parse' des métriques
+        with import_metrics.timer('parse', import_metrics.host_of(item['url'])):
+            results = self.handler(item, text, enqueue) or []
+        with self._lock:
+            for index, result in enumerate(results):
+                # Les résultats d'une page passent avant ceux des pages qu'elle découvre
+                self._results.append((item['order'] + (-1, index), result))
+
+    def run(self):
+        """Exécute le crawl jusqu'à épuisement de la frontière ou du budget"""
+        start = time.monotonic()
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                while len(pending) < self.workers and not self._budget_exhausted(start):
+                    with self._lock:
+                        item = self._queue.popleft() if self._queue else None
+                    if item is None:
+                        break
+                    self.pages_fetched += 1
+                    future = executor.submit(self._process, item)
+                    future.item = item
+                    pending.add(future)
+
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self.errors += 1
+                        print(f"  ✗ Erreur crawl {future.item['url']}: {e}")
+
+        elapsed = time.monotonic() - start
+        print(f"  🕸️  {self.pages_fetched} pages crawlées en {elapsed:.1f}s "
+              f"({self.errors} erreurs, {len(self._queue)} URLs non visitées)")
+
+        results = [result for _, result in sorted(self._results, key=lambda entry: entry[0])]
+        if self.max_results is not None:
+            results = results[:self.max_results]
+        return results
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Moteur de téléchargement concurrent partagé par les scripts d'importation
+Pool de threads borné, limite de connexions par hôte, résultats dans l'ordre de soumission
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# Configuration
+MAX_WORKERS = 8
+MAX_PER_HOST = 4
+
+
+class DownloadPool:
+    """Exécute des téléchargements en parallèle et restitue les résultats dans l'ordre"""
+
+    def __init__(self, download_func, max_workers=MAX_WORKERS, max_per_host=MAX_PER_HOST):
+        self.download_func = download_func
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _host_semaphore(self, url):
+        """Retourne le sémaphore limitant les connexions simultanées vers un hôte"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._host_limits.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._host_limits[host] = semaphore
+            return semaphore
+
+    def _download(self, url, filepath):
+        with self._host_semaphore(url):
+            try:
+                return self.download_func(url, filepath)
+            except Exception as e:
+                print(f"  ✗ Erreur image {url}: {e}")
+                return False
+
+    def map(self, jobs):
+        """
+        Télécharge chaque job (dict avec 'url' et 'filepath') en parallèle.
+        Produit des tuples (job, résultat de download_func) dans l'ordre des jobs, dès que possible;
+        le résultat est faux en cas d'échec.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._download, job['url'], job['filepath']) for job in jobs]
+            for job, future in zip(jobs, futures):
+                yield job, future.result()
+
+
+def download_all(jobs, download_func, max_workers=MAX_WORKERS, max_per_host=MAX_PER_HOST):
+    """Raccourci: télécharge une liste de jobs et produit (job, résultat) dans l'ordre"""
+    pool = DownloadPool(download_func, max_workers=max_workers, max_per_host=max_per_host)
+    return pool.map(jobs)
@@ -4,10 +4,16 @@
 """
 Script pour générer 50 produits pour chaque sous-catégorie
 Total: 16 sous-catégories x 50 = 800 produits
+
+Avec --count N, génère à la place un grand catalogue synthétique reproductible
+(voir synthetic_catalog.py)
 """
 
-import json
 import random
+import sys
+
+from id_allocator import allocate_id
+from product_serializer import write_products_ts
 
 # Définitions des sous-catégories
 subcategories_config = {
@@ -190,7 +196,8 @@ def generate_product(category, subcategory, subcat_config, index):
     image_name = slug.replace('-', '_')
     
     product = {
-        'id': f'{subcategory}-{index+1:03d}',
+        # Séquence partagée avec les importations; la clé garde l'ID d'une génération à l'autre
+        'id': allocate_id(subcategory, f"{subcategory}:{index}"),
         'name': name_de,
         'name_fr': name_fr,
         'name_en': name_en,
@@ -210,6 +217,11 @@ def generate_product(category, subcategory, subcat_config, index):
     return product, image_name
 
 def main():
+    if '--count' in sys.argv:
+        from synthetic_catalog import main as generate_synthetic_catalog
+        generate_synthetic_catalog()
+        return
+    
     all_products = []
     all_image_names = []
     
@@ -221,34 +233,10 @@ def main():
                 all_products.append(product)
                 all_image_names.append(f"{image_name}.jpg")
     
-    # Écrire les produits en format TypeScript
-    with open('new_products.ts', 'w', encoding='utf-8') as f:
-        f.write("// Nouveaux produits générés automatiquement\n")
-        f.write("// Total: 800 produits (50 par sous-catégorie)\n\n")
-        f.write("export const newProducts = [\n")
-        for i, product in enumerate(all_products):
-            f.write("  {\n")
-            f.write(f"    id: '{product['id']}',\n")
-            f.write(f"    name: '{product['name']}',\n")
-            f.write(f"    name_fr: '{product['name_fr']}',\n")
-            f.write(f"    name_en: '{product['name_en']}',\n")
-            f.write(f"    slug: '{product['slug']}',\n")
-            f.write(f"    price: {product['price']},\n")
-            if product['oldPrice']:
-                f.write(f"    oldPrice: {product['oldPrice']},\n")
-            f.write(f"    description: '{product['description']}',\n")
-            f.write(f"    description_fr: '{product['description_fr']}',\n")
-            f.write(f"    description_en: '{product['description_en']}',\n")
-            f.write(f"    category: '{product['category']}',\n")
-            f.write(f"    subcategory: '{product['subcategory']}',\n")
-            f.write(f"    images: {json.dumps(product['images'])},\n")
-            f.write(f"    sizes: {json.dumps(product['sizes'])},\n")
-            f.write(f"    colors: {json.dumps(product['colors'], ensure_ascii=False)},\n")
-            f.write("  }")
-            if i < len(all_products) - 1:
-                f.write(",")
-            f.write("\n")
-        f.write("];\n")
+    # Écrire les produits en format TypeScript (chaînes échappées, écriture tamponnée)
+    write_products_ts(all_products, 'new_products.ts', preamble=(
+        "// Nouveaux produits générés automatiquement\n"
+        f"// Total: {len(all_products)} produits (50 par sous-catégorie)\n\n"))
     
     # Écrire la liste des noms d'images
     with open('produits.txt', 'w', encoding='utf-8') as f:
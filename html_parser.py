@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Couche d'analyse HTML des scripts d'importation
+Utilise lxml par défaut (html.parser si lxml n'est pas installé) et, pour les pages
+produits, ne construit que les nœuds interrogés (titre, prix, description, images, fil d'Ariane)
+"""
+
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+    PARSER = 'lxml'
+except ImportError:
+    lxml = None
+    PARSER = 'html.parser'
+
+# Nœuds conservés pour une page produit: balises toujours utiles, et tout élément dont
+# la classe correspond à une des recherches faites par les scrapers
+PRODUCT_PAGE_TAGS = {'title', 'meta', 'h1', 'img'}
+PRODUCT_PAGE_CLASS_RE = re.compile(
+    r'title|name|product|price|description|content|details|breadcrumb|main|featured|hero|gallery', re.I
+)
+
+
+def _keep_product_node(name, attrs):
+    """Vrai si une balise (et son contenu) doit être conservée pour une page produit"""
+    if name in PRODUCT_PAGE_TAGS:
+        return True
+    classes = attrs.get('class') if attrs else None
+    if isinstance(classes, (list, tuple)):
+        classes = ' '.join(classes)
+    return bool(classes) and PRODUCT_PAGE_CLASS_RE.search(classes) is not None
+
+
+try:
+    # Beautiful Soup >= 4.13: le filtre de construction est une sous-classe d'ElementFilter
+    from bs4.filter import ElementFilter
+
+    class _ProductPageFilter(ElementFilter):
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            return _keep_product_node(name, attrs)
+
+        def allow_string_creation(self, string):
+            # Texte hors des nœuds conservés
+            return False
+
+    PRODUCT_PAGE_ONLY = _ProductPageFilter()
+except ImportError:
+    # Beautiful Soup 4.12: la fonction reçoit le nom et les attributs de la balise
+    PRODUCT_PAGE_ONLY = SoupStrainer(_keep_product_node)
+
+
+def parse(html, parse_only=None):
+    """Analyse un document HTML complet avec le parseur le plus rapide disponible"""
+    return BeautifulSoup(html, PARSER, parse_only=parse_only)
+
+
+def parse_product_page(html):
+    """Analyse partielle d'une page produit: seuls les nœuds interrogés sont construits"""
+    return BeautifulSoup(html, PARSER, parse_only=PRODUCT_PAGE_ONLY)
+
+
+def page_text(html):
+    """Texte brut d'une page entière, sans construire d'arbre Beautiful Soup"""
+    if lxml is not None:
+        try:
+            return lxml.html.fromstring(html).text_content()
+        except (ValueError, lxml.etree.ParserError):
+            return ''
+    return BeautifulSoup(html, PARSER).get_text()
+
+
+def html_to_text(html):
+    """Texte d'un fragment HTML (body_html Shopify, description), espaces supprimés"""
+    if not html:
+        return ''
+    return BeautifulSoup(html, PARSER).get_text(strip=True)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache disque des réponses HTTP pour les scripts d'importation
+Revalidation ETag/Last-Modified, éviction LRU bornée en taille, mode hors-ligne (cache seul)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import import_metrics
+
+# Configuration
+CACHE_DIR = ".http_cache"
+MAX_CACHE_BYTES = 500 * 1024 * 1024
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CacheMissError(requests.exceptions.ConnectionError):
+    """URL absente du cache alors que le mode hors-ligne est actif"""
+
+
+class HttpCache:
+    """Cache de réponses indexé par URL, sûr entre threads"""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, offline=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        self._db.commit()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def lookup(self, url):
+        """Retourne l'entrée en cache (dict) pour une URL, ou None"""
+        key = self._key(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if not row or not os.path.exists(self._body_path(key)):
+            return None
+        return {'key': key, 'status': row[0], 'headers': json.loads(row[1])}
+
+    def conditional_headers(self, entry):
+        """En-têtes de revalidation pour une entrée en cache"""
+        headers = {}
+        if entry:
+            if entry['headers'].get('ETag'):
+                headers['If-None-Match'] = entry['headers']['ETag']
+            if entry['headers'].get('Last-Modified'):
+                headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def load(self, url, entry):
+        """Reconstruit une réponse requests depuis le cache et met à jour l'accès LRU"""
+        with open(self._body_path(entry['key']), 'rb') as f:
+            body = f.read()
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), entry['key']))
+            self._db.commit()
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response._content = body
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def store(self, url, response):
+        """Enregistre une réponse 200 puis applique l'éviction LRU"""
+        if response.status_code != 200:
+            return
+        key = self._key(url)
+        body = response.content
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+
+        path = self._body_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.', suffix='.part', dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, url, status, headers, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, response.status_code, json.dumps(headers), len(body), time.time())
+            )
+            self._db.commit()
+        self.evict()
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes"""
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self._db.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                if os.path.exists(self._body_path(key)):
+                    os.unlink(self._body_path(key))
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+            self._db.commit()
+
+    def get(self, session_request, url, **kwargs):
+        """
+        GET avec cache: sert le disque en mode hors-ligne, sinon envoie une requête
+        conditionnelle et sert le disque sur 304.
+        Les réponses servies depuis le disque (hors-ligne ou 304) sont comptées comme
+        cache_hits de l'étape 'fetch' des métriques, les autres comme cache_misses.
+        """
+        host = import_metrics.host_of(url)
+        entry = self.lookup(url)
+        if self.offline:
+            if entry is None:
+                self._count('misses')
+                import_metrics.add('fetch', host, cache_misses=1, failures=1)
+                raise CacheMissError(f"Absent du cache (mode hors-ligne): {url}")
+            self._count('hits')
+            import_metrics.add('fetch', host, cache_hits=1)
+            return self.load(url, entry)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.conditional_headers(entry))
+        response = session_request('GET', url, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self._count('revalidated')
+            import_metrics.add('fetch', host, cache_hits=1)
+            return self.load(url, entry)
+
+        self._count('misses')
+        import_metrics.add('fetch', host, cache_misses=1)
+        self.store(url, response)
+        return response
+
+    def print_stats(self):
+        """Affiche les compteurs du cache"""
+        print(f"\n🗄️  Cache HTTP: {self.hits} servies hors-ligne, {self.revalidated} revalidées (304), "
+              f"{self.misses} absentes du cache")
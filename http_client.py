@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Client HTTP partagé par les scripts d'importation
+Une session requests avec pool de connexions keep-alive par hôte et compteurs de réutilisation
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import import_metrics
+
+# Configuration
+POOL_CONNECTIONS = 10   # Nombre d'hôtes dont le pool est conservé
+POOL_MAXSIZE = 16       # Connexions keep-alive conservées par hôte
+DEFAULT_TIMEOUT = 30
+MAX_DOWNLOAD_BYTES = 20 * 1024 * 1024  # Taille maximale d'un fichier téléchargé
+CHUNK_SIZE = 64 * 1024
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Connection': 'keep-alive',
+}
+
+
+class DownloadTooLargeError(IOError):
+    """Réponse dépassant la taille maximale autorisée"""
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """Adaptateur requests qui signale chaque nouvelle connexion TCP ouverte"""
+
+    def __init__(self, on_connect, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_connect = self._on_connect
+
+        class _HTTPConnection(HTTPConnection):
+            def connect(self):
+                super().connect()
+                on_connect(self.host, self.port)
+
+        class _HTTPSConnection(HTTPSConnection):
+            def connect(self):
+                super().connect()
+                on_connect(self.host, self.port)
+
+        class _HTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = _HTTPConnection
+
+        class _HTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = _HTTPSConnection
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _HTTPConnectionPool,
+            'https': _HTTPSConnectionPool,
+        }
+
+
+class HttpClient:
+    """Session HTTP avec pool de connexions par hôte, sûre entre threads"""
+
+    def __init__(self, headers=None, pool_connections=POOL_CONNECTIONS,
+                 pool_maxsize=POOL_MAXSIZE, timeout=DEFAULT_TIMEOUT, cache=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        self._requests_by_host = {}
+        self._connections_by_host = {}
+        self._transfers_by_host = {}
+        self._lock = threading.Lock()
+        adapter = CountingHTTPAdapter(self._count_connection, pool_connections=pool_connections,
+                                      pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _count(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            self._requests_by_host[host] = self._requests_by_host.get(host, 0) + 1
+
+    def _count_connection(self, host, port):
+        host = host.lower() if port in (None, 80, 443) else f"{host.lower()}:{port}"
+        with self._lock:
+            self._connections_by_host[host] = self._connections_by_host.get(host, 0) + 1
+
+    def _record_transfer(self, url, size, elapsed):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            transfer = self._transfers_by_host.setdefault(host, {'files': 0, 'bytes': 0, 'seconds': 0.0})
+            transfer['files'] += 1
+            transfer['bytes'] += size
+            transfer['seconds'] += elapsed
+
+    def request(self, method, url, **kwargs):
+        """
+        Envoie une requête via le pool partagé.
+        Hors streaming, la requête est mesurée dans l'étape 'fetch' des métriques
+        (les téléchargements en streaming le sont par download_to_temp).
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        self._count(url)
+        if kwargs.get('stream'):
+            return self.session.request(method, url, **kwargs)
+        host = import_metrics.host_of(url)
+        with import_metrics.timer('fetch', host):
+            response = self.session.request(method, url, **kwargs)
+        import_metrics.add('fetch', host, bytes=len(response.content),
+                           failures=1 if response.status_code >= 400 else 0)
+        return response
+
+    def get(self, url, **kwargs):
+        """
+        GET via le pool partagé (mêmes arguments que requests.get).
+        Passe par le cache disque s'il est configuré, sauf en streaming.
+        """
+        if self.cache is not None and not kwargs.get('stream'):
+            return self.cache.get(self.request, url, **kwargs)
+        return self.request('GET', url, **kwargs)
+
+    def download_to_temp(self, url, directory, max_bytes=MAX_DOWNLOAD_BYTES, **kwargs):
+        """
+        Télécharge une URL par morceaux dans un fichier temporaire de `directory`, en
+        calculant son empreinte SHA-256. Lève DownloadTooLargeError au-delà de max_bytes.
+        Retourne (chemin temporaire, taille en octets, empreinte hexadécimale).
+        Métriques: le temps d'écriture est compté dans 'store', le reste dans 'download'.
+        """
+        os.makedirs(directory, exist_ok=True)
+        host = import_metrics.host_of(url)
+        start = time.monotonic()
+        size = 0
+        write_seconds = 0.0
+        try:
+            with self.get(url, stream=True, **kwargs) as response:
+                response.raise_for_status()
+                length = response.headers.get('Content-Length', '')
+                if length.isdigit() and int(length) > max_bytes:
+                    raise DownloadTooLargeError(f"{length} octets > limite de {max_bytes}")
+
+                fd, tmp_path = tempfile.mkstemp(prefix='.', suffix='.part', dir=directory)
+                digest = hashlib.sha256()
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            size += len(chunk)
+                            if size > max_bytes:
+                                raise DownloadTooLargeError(f"plus de {max_bytes} octets reçus")
+                            digest.update(chunk)
+                            write_start = time.perf_counter()
+                            f.write(chunk)
+                            write_seconds += time.perf_counter() - write_start
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
+                    raise
+        except BaseException:
+            import_metrics.add('download', host, calls=1, failures=1,
+                               seconds=time.monotonic() - start - write_seconds)
+            raise
+        elapsed = time.monotonic() - start
+        self._record_transfer(url, size, elapsed)
+        import_metrics.add('download', host, calls=1, bytes=size, seconds=elapsed - write_seconds)
+        import_metrics.add('store', host, calls=1, bytes=size, seconds=write_seconds)
+        return tmp_path, size, digest.hexdigest()
+
+    def download_file(self, url, filepath, max_bytes=MAX_DOWNLOAD_BYTES, **kwargs):
+        """
+        Télécharge une URL par morceaux dans un fichier temporaire, puis le renomme
+        atomiquement en filepath. Retourne la taille écrite en octets.
+        """
+        tmp_path, size, _ = self.download_to_temp(url, os.path.dirname(filepath) or '.',
+                                                  max_bytes=max_bytes, **kwargs)
+        os.replace(tmp_path, filepath)
+        return size
+
+    def transfer_stats(self):
+        """Retourne, par hôte, le nombre de fichiers, d'octets et le débit en octets/s"""
+        with self._lock:
+            transfers = {host: dict(t) for host, t in self._transfers_by_host.items()}
+        for transfer in transfers.values():
+            seconds = transfer['seconds']
+            transfer['bytes_per_sec'] = transfer['bytes'] / seconds if seconds > 0 else 0.0
+        return transfers
+
+    def connection_stats(self):
+        """Retourne, par hôte, le nombre de requêtes, de connexions ouvertes et réutilisées"""
+        stats = {}
+        with self._lock:
+            requests_by_host = dict(self._requests_by_host)
+            connections = dict(self._connections_by_host)
+        for host, count in requests_by_host.items():
+            opened = connections.get(host, 0)
+            stats[host] = {
+                'requests': count,
+                'connections': opened,
+                'reused': max(count - opened, 0),
+            }
+        return stats
+
+    def print_stats(self):
+        """Affiche les compteurs de réutilisation des connexions"""
+        stats = self.connection_stats()
+        if stats:
+            print("\n🔌 Connexions HTTP:")
+            for host, host_stats in sorted(stats.items()):
+                print(f"   - {host}: {host_stats['requests']} requêtes, "
+                      f"{host_stats['connections']} connexions, "
+                      f"{host_stats['reused']} réutilisations")
+
+        if self.cache is not None:
+            self.cache.print_stats()
+
+        transfers = self.transfer_stats()
+        if transfers:
+            print("\n📥 Débit des téléchargements:")
+            for host, transfer in sorted(transfers.items()):
+                print(f"   - {host}: {transfer['files']} fichiers, "
+                      f"{transfer['bytes'] / 1024:.0f} Ko, "
+                      f"{transfer['bytes_per_sec'] / 1024:.0f} Ko/s")
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configure(**kwargs):
+    """Remplace le client partagé (headers, pool_connections, pool_maxsize, timeout, cache)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = HttpClient(**kwargs)
+    return _client
+
+
+def get_client():
+    """Retourne le client partagé, créé à la première utilisation"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def get(url, **kwargs):
+    """GET via le client partagé"""
+    return get_client().get(url, **kwargs)
+
+
+def download_to_temp(url, directory, max_bytes=MAX_DOWNLOAD_BYTES, **kwargs):
+    """Téléchargement en streaming vers un fichier temporaire via le client partagé"""
+    return get_client().download_to_temp(url, directory, max_bytes=max_bytes, **kwargs)
+
+
+def download_file(url, filepath, max_bytes=MAX_DOWNLOAD_BYTES, **kwargs):
+    """Téléchargement en streaming et écriture atomique via le client partagé"""
+    return get_client().download_file(url, filepath, max_bytes=max_bytes, **kwargs)
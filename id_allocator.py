@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Attribution persistante des IDs produits (accessoires-homme-001, chemises-homme-014...)
+Une séquence par préfixe est conservée dans une base SQLite partagée par les scripts
+d'importation et par generate_products.py: chaque ID est attribué une seule fois, en O(1),
+même quand plusieurs importations tournent en parallèle. Un produit déjà rencontré (même
+URL source, même slug, même position <sous-catégorie>:<index> du générateur) retrouve
+l'ID qui lui a été attribué.
+
+Les séquences sont initialisées à partir des IDs existants de new_products.json,
+new_products.ts et src/lib/data.ts, relus seulement quand ces fichiers ont changé.
+
+Usage: python3 id_allocator.py [stats]
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+
+from catalog_store import NEW_PRODUCTS_FILE, file_signature
+from json_stream import iter_json_array
+from product_serializer import NEW_PRODUCTS_TS_FILE
+
+# Configuration
+ID_DB = ".product_ids.sqlite"
+SEED_FILES = (NEW_PRODUCTS_FILE, NEW_PRODUCTS_TS_FILE, "src/lib/data.ts")
+ID_WIDTH = 3              # accessoires-001
+LOCK_TIMEOUT = 30         # Secondes d'attente si une autre importation attribue des IDs
+
+ID_RE = re.compile(r'^(.+)-(\d+)$')
+# id: '...' (src/lib/data.ts) ou {"id": "..." (new_products.ts, un produit par ligne)
+DATA_TS_ID_RE = re.compile(r"^\s*\{?\s*['\"]?id['\"]?:\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sequences (
+    prefix TEXT PRIMARY KEY,
+    last INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS assigned (
+    prefix TEXT NOT NULL,
+    key TEXT NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (prefix, key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def split_id(product_id):
+    """Retourne (préfixe, numéro) d'un ID de la forme <préfixe>-<numéro>, ou None"""
+    match = ID_RE.match(product_id or '')
+    if not match:
+        return None
+    return match.group(1), int(match.group(2))
+
+
+def _ids_in_file(path):
+    """IDs produits d'un fichier de catalogue (tableau JSON ou module TypeScript)"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for product in iter_json_array(f):
+                if isinstance(product, dict) and product.get('id'):
+                    yield str(product['id'])
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            for match in DATA_TS_ID_RE.finditer(f.read()):
+                yield match.group(1)
+
+
+class IdAllocator:
+    """
+    Séquences d'IDs par préfixe dans une base SQLite.
+    Chaque attribution est une transaction BEGIN IMMEDIATE: deux processus qui attribuent
+    des IDs en même temps sont sérialisés par le verrou d'écriture de SQLite.
+    """
+
+    def __init__(self, db_path=ID_DB, seed_files=SEED_FILES, width=ID_WIDTH):
+        self.db_path = db_path
+        self.seed_files = seed_files
+        self.width = width
+        self.lock = threading.Lock()
+        # isolation_level=None: les transactions sont ouvertes explicitement (BEGIN IMMEDIATE)
+        self.db = sqlite3.connect(db_path, timeout=LOCK_TIMEOUT, isolation_level=None,
+                                  check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+        self.seed()
+
+    def _transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+
+    def seed(self):
+        """
+        Porte chaque séquence au moins au plus grand numéro déjà utilisé dans les fichiers
+        de catalogue; un fichier n'est relu que si sa signature a changé
+        """
+        with self.lock:
+            self._transaction()
+            try:
+                for path in self.seed_files:
+                    if not os.path.exists(path):
+                        continue
+                    signature = file_signature(path)
+                    row = self.db.execute("SELECT value FROM meta WHERE key = ?", (f"seed:{path}",)).fetchone()
+                    if row and row[0] == signature:
+                        continue
+                    highest = {}
+                    for product_id in _ids_in_file(path):
+                        parts = split_id(product_id)
+                        if parts:
+                            highest[parts[0]] = max(highest.get(parts[0], 0), parts[1])
+                    self.db.executemany(
+                        "INSERT INTO sequences (prefix, last) VALUES (?, ?) "
+                        "ON CONFLICT(prefix) DO UPDATE SET last = MAX(last, excluded.last)",
+                        highest.items())
+                    self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                    (f"seed:{path}", signature))
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def allocate(self, prefix, key=None):
+        """
+        Retourne un nouvel ID <préfixe>-<numéro>, jamais attribué auparavant.
+        Avec une clé (URL source, slug...), le même produit retrouve le même ID d'une
+        exécution à l'autre au lieu de consommer un nouveau numéro.
+        """
+        with self.lock:
+            self._transaction()
+            try:
+                if key:
+                    row = self.db.execute("SELECT id FROM assigned WHERE prefix = ? AND key = ?",
+                                          (prefix, key)).fetchone()
+                    if row:
+                        self.db.execute("COMMIT")
+                        return row[0]
+                row = self.db.execute("SELECT last FROM sequences WHERE prefix = ?", (prefix,)).fetchone()
+                number = (row[0] if row else 0) + 1
+                self.db.execute(
+                    "INSERT INTO sequences (prefix, last) VALUES (?, ?) "
+                    "ON CONFLICT(prefix) DO UPDATE SET last = excluded.last", (prefix, number))
+                product_id = f"{prefix}-{number:0{self.width}d}"
+                if key:
+                    self.db.execute("INSERT INTO assigned (prefix, key, id) VALUES (?, ?, ?)",
+                                    (prefix, key, product_id))
+                self.db.execute("COMMIT")
+                return product_id
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def sequences(self):
+        """Couples (préfixe, dernier numéro attribué), par préfixe"""
+        return self.db.execute("SELECT prefix, last FROM sequences ORDER BY prefix").fetchall()
+
+    def close(self):
+        self.db.close()
+
+
+# Allocateur partagé par les scripts
+_allocator = None
+_allocator_lock = threading.Lock()
+
+
+def get_allocator():
+    """Retourne l'allocateur partagé, ouvert à la première utilisation"""
+    global _allocator
+    with _allocator_lock:
+        if _allocator is None:
+            _allocator = IdAllocator()
+        return _allocator
+
+
+def allocate_id(prefix, key=None):
+    """Raccourci: nouvel ID <préfixe>-<numéro> via l'allocateur partagé"""
+    return get_allocator().allocate(prefix, key)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'stats'
+    if command != 'stats':
+        print("Usage: python3 id_allocator.py [stats]")
+        sys.exit(1)
+    allocator = get_allocator()
+    sequences = allocator.sequences()
+    print(f"📊 {len(sequences)} séquences d'IDs dans {ID_DB}")
+    for prefix, last in sequences:
+        print(f"  {prefix:<30} {last:5d}")
+    allocator.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Stockage des images produits adressé par contenu
+Chaque contenu est stocké une seule fois, sous un nom tiré de son empreinte SHA-256
+(<sha256[:16]>.<ext>): un téléchargement dont le contenu existe déjà est abandonné et
+l'entrée placeholder pointe vers le fichier existant. Aucun fichier n'est écrasé; l'index
+garde pour chaque image (nom demandé, ex. <image_id>.jpg) le fichier qu'elle utilise.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import http_client
+
+# Configuration
+PRODUCTS_DIR = "public/images/products"
+PUBLIC_DIR = "public"
+INDEX_FILE = ".image_index.json"   # Empreintes des fichiers et fichier de chaque image
+HASH_NAME_LENGTH = 16              # Caractères de l'empreinte dans le nom d'un fichier
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+
+
+def file_sha256(path):
+    """Empreinte SHA-256 d'un fichier, lue par morceaux"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(http_client.CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageStore:
+    """Index empreinte -> image d'un dossier d'images, sûr entre threads"""
+
+    def __init__(self, products_dir=PRODUCTS_DIR, index_file=INDEX_FILE):
+        self.products_dir = products_dir
+        self.index_file = index_file
+        self.files = {}          # nom de fichier -> {'size', 'mtime', 'sha256'}
+        self.by_hash = {}        # sha256 -> nom de fichier
+        self.images = {}         # nom d'image demandé -> nom du fichier qui a son contenu
+        self.duplicates = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Charge l'index en ne recalculant que les empreintes des fichiers modifiés"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        # Ancien format: directement fichier -> empreinte, sans les images
+        if 'files' in index:
+            cached, images = index['files'], index.get('images', {})
+        else:
+            cached, images = index, {}
+
+        if os.path.isdir(self.products_dir):
+            for filename in sorted(os.listdir(self.products_dir)):
+                if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                path = os.path.join(self.products_dir, filename)
+                stat = os.stat(path)
+                entry = cached.get(filename)
+                if not entry or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+                    entry = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': file_sha256(path)}
+                self.files[filename] = entry
+                self.by_hash.setdefault(entry['sha256'], filename)
+        self.images = {image: filename for image, filename in images.items() if filename in self.files}
+
+    def save(self):
+        """Écrit le cache des empreintes"""
+        with self._lock:
+            index = {'files': dict(self.files), 'images': dict(self.images)}
+        tmp_path = f"{self.index_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, sort_keys=True)
+        os.replace(tmp_path, self.index_file)
+
+    def public_url(self, filename):
+        """Chemin public (/images/products/...) d'un fichier du dossier"""
+        path = os.path.join(self.products_dir, filename)
+        return '/' + os.path.relpath(path, PUBLIC_DIR).replace(os.sep, '/')
+
+    def _blob_name(self, sha256, ext):
+        """Nom libre tiré de l'empreinte: l'empreinte complète si le préfixe est déjà pris"""
+        filename = sha256[:HASH_NAME_LENGTH] + ext
+        if filename in self.files or os.path.exists(os.path.join(self.products_dir, filename)):
+            filename = sha256 + ext
+        return filename
+
+    def download(self, url, filepath, max_bytes=http_client.MAX_DOWNLOAD_BYTES):
+        """
+        Télécharge une image en streaming. Si son contenu est déjà stocké, le fichier
+        temporaire est supprimé; sinon il est renommé dans le dossier sous un nom tiré de
+        son empreinte, avec l'extension de filepath. L'image (nom de filepath) est associée
+        à ce fichier dans l'index. Retourne le chemin public de l'image à utiliser.
+        """
+        tmp_path, size, sha256 = http_client.download_to_temp(url, self.products_dir, max_bytes=max_bytes)
+        image = os.path.basename(filepath)
+        ext = os.path.splitext(image)[1].lower() or '.jpg'
+        with self._lock:
+            existing = self.by_hash.get(sha256)
+            if existing is None:
+                filename = self._blob_name(sha256, ext)
+                path = os.path.join(self.products_dir, filename)
+                os.replace(tmp_path, path)
+                stat = os.stat(path)
+                self.files[filename] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': sha256}
+                self.by_hash[sha256] = filename
+                self.images[image] = filename
+                return self.public_url(filename)
+            self.images[image] = existing
+            self.duplicates += 1
+            self.bytes_saved += size
+        os.unlink(tmp_path)
+        return self.public_url(existing)
+
+    def print_stats(self):
+        """Affiche le nombre de doublons évités"""
+        if self.duplicates:
+            print(f"\n🧬 {self.duplicates} images en double ignorées "
+                  f"({self.bytes_saved / 1024:.0f} Ko économisés)")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Retourne le stockage partagé du dossier PRODUCTS_DIR, indexé à la première utilisation"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ImageStore()
+        return _store
@@ -6,87 +6,30 @@ Script pour importer les produits depuis un fichier JSON exporté
 Accepte un fichier JSON avec les produits de 24s.com
 """
 
-import json
-import requests
 import os
 import re
 from urllib.parse import urljoin
 import sys
 
+import html_parser
+import http_client
+import image_store
+from catalog_store import open_catalog
+from catalog_upsert import UpsertIndex, print_counts
+from download_pool import download_all
+from id_allocator import allocate_id
+from import_journal import open_journal
+from import_metrics import open_metrics
+from placeholder_images import PLACEHOLDER_IMAGE_MAP_FILE, PLACEHOLDER_IMAGES_FILE, PlaceholderImages
+from product_classifier import get_classifier
+from product_serializer import NEW_PRODUCTS_TS_FILE, write_products_ts
+from json_stream import iter_json_array
+
 # Configuration
 PRODUCTS_DIR = "public/images/products"
-NEW_PRODUCTS_FILE = "new_products.json"
-PLACEHOLDER_IMAGES_FILE = "src/lib/placeholder-images.json"
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # Taille maximale d'une image téléchargée
 MAX_TOTAL_PRODUCTS = 1100
-
-# Mapping des catégories
-CATEGORY_MAPPING = {
-    'homme': 'mens-clothing',
-    'hommes': 'mens-clothing',
-    'men': 'mens-clothing',
-    'mens': 'mens-clothing',
-    'chemise': 'mens-clothing',
-    'chemises': 'mens-clothing',
-    'pantalon': 'mens-clothing',
-    'pantalons': 'mens-clothing',
-    'veste': 'mens-clothing',
-    'vestes': 'mens-clothing',
-    'pull': 'mens-clothing',
-    'pulls': 'mens-clothing',
-    
-    'femme': 'womens-clothing',
-    'femmes': 'womens-clothing',
-    'women': 'womens-clothing',
-    'womens': 'womens-clothing',
-    'robe': 'womens-clothing',
-    'robes': 'womens-clothing',
-    'top': 'womens-clothing',
-    'tops': 'womens-clothing',
-    'jupe': 'womens-clothing',
-    'jupes': 'womens-clothing',
-    
-    'accessoire': 'accessories',
-    'accessoires': 'accessories',
-    'montre': 'accessories',
-    'montres': 'accessories',
-    'sac': 'accessories',
-    'sacs': 'accessories',
-    
-    'chaussure': 'shoes',
-    'chaussures': 'shoes',
-    'shoe': 'shoes',
-    'shoes': 'shoes',
-    
-    'sport': 'sport',
-    'hiver': 'winter-clothing',
-    'winter': 'winter-clothing',
-}
-
-SUBCATEGORY_MAPPING = {
-    'chemise': 'chemises-homme',
-    'chemises': 'chemises-homme',
-    'pantalon': 'pantalons-homme',
-    'pantalons': 'pantalons-homme',
-    'veste': 'vestes-homme',
-    'vestes': 'vestes-homme',
-    'pull': 'pulls-homme',
-    'pulls': 'pulls-homme',
-    'accessoire': 'accessoires-homme',
-    'accessoires': 'accessoires-homme',
-    
-    'robe': 'robes-femme',
-    'robes': 'robes-femme',
-    'top': 'tops-femme',
-    'tops': 'tops-femme',
-    'pantalon': 'pantalons-femme',
-    'pantalons': 'pantalons-femme',
-    'jupe': 'jupes-femme',
-    'jupes': 'jupes-femme',
-    'veste': 'vestes-femme',
-    'vestes': 'vestes-femme',
-    'accessoire': 'accessoires-femme',
-    'accessoires': 'accessoires-femme',
-}
+CLASSIFIER = get_classifier()  # Catégorie, sous-catégorie et genre (product_classifier.py)
 
 def clean_filename(name):
     """Nettoie un nom pour en faire un nom de fichier valide"""
@@ -97,98 +40,54 @@ def clean_filename(name):
     return name
 
 def download_image(url, filepath):
-    """Télécharge une image depuis une URL"""
+    """Télécharge une image depuis une URL; retourne son chemin public ou None"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
-        return True
+        return image_store.get_store().download(url, filepath, max_bytes=MAX_IMAGE_BYTES)
     except Exception as e:
         print(f"  ✗ Erreur image {url}: {e}")
-        return False
+        return None
 
-def map_category(category_name, subcategory_name=None):
-    """Mappe une catégorie vers une catégorie du nouveau site"""
-    if not category_name:
-        return 'accessories', None
-    
-    cat_lower = category_name.lower()
-    
-    for key, mapped_cat in CATEGORY_MAPPING.items():
-        if key in cat_lower:
-            category = mapped_cat
-            
-            subcategory = None
-            if subcategory_name:
-                sub_lower = subcategory_name.lower()
-                for key, mapped_sub in SUBCATEGORY_MAPPING.items():
-                    if key in sub_lower:
-                        subcategory = mapped_sub
-                        break
-            
-            return category, subcategory
-    
-    return 'accessories', None
-
-def determine_gender(category_name, description, name):
-    """Détermine le genre du produit"""
-    text = (category_name + " " + description + " " + name).lower()
-    
-    femme_keywords = ['femme', 'woman', 'women', 'ladies', 'dame', 'dames', 'féminin', 'feminine']
-    homme_keywords = ['homme', 'man', 'men', 'gentleman', 'herren', 'masculin', 'masculine']
-    
-    femme_score = sum(1 for keyword in femme_keywords if keyword in text)
-    homme_score = sum(1 for keyword in homme_keywords if keyword in text)
-    
-    if femme_score > homme_score:
-        return 'femme'
-    elif homme_score > femme_score:
-        return 'homme'
-    return 'unisex'
+def classify_product(product_data):
+    """Catégorie, sous-catégorie et genre d'un produit du fichier"""
+    name = product_data.get('name') or product_data.get('title') or product_data.get('name_fr', '')
+    category_name = product_data.get('category') or product_data.get('product_type') or product_data.get('type', '')
+    subcategory_name = product_data.get('subcategory') or product_data.get('collection', '')
+    return CLASSIFIER.classify(category_name, subcategory_name, f"{product_data.get('description', '')} {name}")
 
-def create_product_entry(product_data, index, gender):
-    """Crée une entrée produit au format du site"""
+def create_product_entry(product_data, index, classification):
+    """Crée une entrée produit au format du site (classification: résultat de classify_product)"""
     name = product_data.get('name') or product_data.get('title') or product_data.get('name_fr', '')
     if not name:
         return None, [], []
     
     slug = clean_filename(name)
     
-    # Catégorie
-    category_name = product_data.get('category') or product_data.get('product_type') or product_data.get('type', '')
-    subcategory_name = product_data.get('subcategory') or product_data.get('collection', '')
-    category, subcategory = map_category(category_name, subcategory_name)
+    # URL source (ou chemin /products/<handle> d'un export Shopify), clé de mise à jour
+    handle = product_data.get('handle')
+    source_url = product_data.get('url') or (f"/products/{handle}" if handle else None)
     
-    # Ajuster selon le genre
-    if gender == 'femme' and category == 'mens-clothing':
-        category = 'womens-clothing'
-    elif gender == 'homme' and category == 'womens-clothing':
-        category = 'mens-clothing'
+    # Catégorie (déjà ajustée selon le genre)
+    category, subcategory, gender = classification
     
-    # Générer l'ID
+    # Générer l'ID (séquence persistante par préfixe)
     if category == 'womens-clothing' and subcategory:
-        product_id = f'{subcategory}-{index+1:03d}'
+        id_prefix = subcategory
     elif category == 'mens-clothing' and subcategory:
-        product_id = f'{subcategory}-{index+1:03d}'
+        id_prefix = subcategory
     elif category == 'accessories':
         if gender == 'femme':
-            product_id = f'accessoires-femme-{index+1:03d}'
+            id_prefix = 'accessoires-femme'
             subcategory = 'accessoires-femme'
             category = 'womens-clothing'
         elif gender == 'homme':
-            product_id = f'accessoires-homme-{index+1:03d}'
+            id_prefix = 'accessoires-homme'
             subcategory = 'accessoires-homme'
             category = 'mens-clothing'
         else:
-            product_id = f'accessoires-{index+1:03d}'
+            id_prefix = 'accessoires'
     else:
-        product_id = f'{category.replace("-", "_")}-{index+1:03d}'
+        id_prefix = category.replace("-", "_")
+    product_id = allocate_id(id_prefix, source_url or slug)
     
     # Noms multilingues
     name_fr = product_data.get('name_fr') or name
@@ -198,9 +97,7 @@ def create_product_entry(product_data, index, gender):
     # Descriptions
     description = product_data.get('description') or product_data.get('body_html', '')
     if description:
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(description, 'html.parser')
-        description = soup.get_text(strip=True)
+        description = html_parser.html_to_text(description)
     
     description_fr = product_data.get('description_fr') or description or f'Un produit élégant {name}'
     description_en = product_data.get('description_en') or description or f'An elegant product {name}'
@@ -254,14 +151,19 @@ def create_product_entry(product_data, index, gender):
         'subcategory': subcategory,
         'images': image_ids,
         'sizes': product_data.get('sizes'),
-        'colors': product_data.get('colors')
+        'colors': product_data.get('colors'),
+        'sourceUrl': source_url
     }
     
     return product, image_ids, image_urls
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 import_from_json_file.py <fichier_json>")
+    # Arguments positionnels (la valeur de --metrics n'en est pas un)
+    args = [arg for position, arg in enumerate(sys.argv[1:], 1)
+            if not arg.startswith('--') and sys.argv[position - 1] != '--metrics']
+    if not args:
+        print("Usage: python3 import_from_json_file.py <fichier_json> [--resume | --fresh] [--log] [--ts] "
+              "[--metrics fichier] [--live]")
         print("\nLe fichier JSON doit contenir un tableau de produits avec:")
         print("  - name / title / name_fr")
         print("  - category / product_type")
@@ -270,7 +172,7 @@ def main():
         print("  - description")
         sys.exit(1)
     
-    json_file = sys.argv[1]
+    json_file = args[0]
     
     if not os.path.exists(json_file):
         print(f"❌ Fichier non trouvé: {json_file}")
@@ -278,124 +180,145 @@ def main():
     
     print(f"🚀 Importation depuis {json_file}\n")
     
-    # Charger le fichier JSON
+    # Métriques par étape (résumé JSON en fin d'importation, --live pour l'avancement)
+    metrics = open_metrics('import_from_json_file', sys.argv)
+    
+    # Vérifier le nombre actuel: la limite ne porte que sur les nouveaux produits
+    catalog = open_catalog(sys.argv)
+    current_count = catalog.count()
+    remaining = max(MAX_TOTAL_PRODUCTS - current_count, 0)
+    print(f"📊 Produits actuels: {current_count}")
+    print(f"📊 Produits restants: {remaining}")
+    print(f"📊 Limite maximale: {MAX_TOTAL_PRODUCTS}\n")
+    
+    if remaining == 0:
+        print("⚠️  Limite de 1100 produits atteinte: seuls les produits existants seront mis à jour")
+        print("   Utilisez limit_products_to_1100.py pour nettoyer si nécessaire.\n")
+    
+    # Lire le fichier JSON en entier, en streaming (tableau ou objet avec une clé 'products'):
+    # un produit au-delà de la limite peut encore mettre à jour un produit existant
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            products_data = json.load(f)
-        
-        # Si c'est un objet avec une clé 'products'
-        if isinstance(products_data, dict) and 'products' in products_data:
-            products_data = products_data['products']
-        
-        if not isinstance(products_data, list):
-            print("❌ Le fichier JSON doit contenir un tableau de produits")
-            sys.exit(1)
-        
-        print(f"✓ {len(products_data)} produits trouvés dans le fichier\n")
-    except Exception as e:
+        with open(json_file, 'r', encoding='utf-8') as f, metrics.timer('parse'):
+            products_data = list(iter_json_array(f, 'products'))
+    except ValueError as e:
         print(f"❌ Erreur lors de la lecture du fichier: {e}")
         sys.exit(1)
     
-    # Vérifier le nombre actuel
-    try:
-        with open(NEW_PRODUCTS_FILE, 'r', encoding='utf-8') as f:
-            existing_products = json.load(f)
-        current_count = len(existing_products)
-        remaining = MAX_TOTAL_PRODUCTS - current_count
-        print(f"📊 Produits actuels: {current_count}")
-        print(f"📊 Produits restants: {remaining}")
-        print(f"📊 Limite maximale: {MAX_TOTAL_PRODUCTS}\n")
-        
-        if remaining <= 0:
-            print("⚠️  Limite de 1100 produits atteinte!")
-            print("   Utilisez limit_products_to_1100.py pour nettoyer si nécessaire.")
-            return
-        
-        products_data = products_data[:remaining]
-        print(f"📊 Limitation à {len(products_data)} produits pour respecter la limite\n")
-    except:
-        existing_products = []
-        current_count = 0
-        remaining = MAX_TOTAL_PRODUCTS
-        products_data = products_data[:remaining]
-        print(f"📊 Produits actuels: 0")
-        print(f"📊 Produits restants: {remaining}")
-        print(f"📊 Limite maximale: {MAX_TOTAL_PRODUCTS}\n")
-        print(f"📊 Limitation à {len(products_data)} produits\n")
-    
-    # Charger les images existantes
-    try:
-        with open(PLACEHOLDER_IMAGES_FILE, 'r', encoding='utf-8') as f:
-            placeholder_data = json.load(f)
-            placeholder_images = placeholder_data.get('placeholderImages', [])
-    except:
-        placeholder_images = []
+    print(f"✓ {len(products_data)} produits lus dans le fichier "
+          f"(au plus {remaining} nouveaux produits ajoutés)\n")
+    
+    # Index des produits existants (mise à jour plutôt que doublon)
+    upsert_index = UpsertIndex(catalog)
+    over_limit = 0
+    
+    # Journal de reprise (--resume pour reprendre une importation interrompue)
+    journal = open_journal('import_from_json_file', sys.argv)
+    if journal is None:
+        return
+    
+    # Charger les images existantes (index par ID)
+    placeholder_images = PlaceholderImages()
     
     # Traiter chaque produit
     new_products = []
     new_images = []
-    existing_image_ids = {img.get('id') for img in placeholder_images}
+    scheduled_image_ids = set()
+    image_jobs = []
     
     for i, product_data in enumerate(products_data):
         name = product_data.get('name') or product_data.get('title') or product_data.get('name_fr', 'Produit')
         print(f"\n[{i+1}/{len(products_data)}] {name[:60]}")
         
-        # Déterminer le genre
         category_name = product_data.get('category') or product_data.get('product_type', '')
-        description = product_data.get('description', '')
-        gender = determine_gender(category_name, description, name)
-        print(f"  Catégorie: {category_name} | Genre: {gender}")
         
-        # Créer l'entrée produit
-        product, image_ids, image_urls = create_product_entry(product_data, i, gender)
+        # Créer l'entrée produit (catégorie, sous-catégorie et genre en une passe)
+        with metrics.timer('map'):
+            classification = classify_product(product_data)
+            product, image_ids, image_urls = create_product_entry(product_data, i, classification)
+        print(f"  Catégorie: {classification.category} | Genre: {classification.gender}")
         if not product:
             print("  ⚠ Produit ignoré (nom manquant)")
             continue
+        if i in journal.products:
+            product = journal.products[i]
+        else:
+            journal.record_product(i, product)
         
-        # Télécharger les images
+        # Un produit déjà au catalogue est mis à jour sans compter dans la limite
+        if upsert_index.find(product) is None and upsert_index.insert_count >= remaining:
+            print("  ⚠ Limite atteinte, produit ignoré")
+            over_limit += 1
+            continue
+        upsert_index.stage(product)
+        
+        # Planifier les téléchargements d'images
         for j, (image_id, image_url) in enumerate(zip(image_ids, image_urls)):
-            if image_id in existing_image_ids:
+            if image_id in placeholder_images or image_id in scheduled_image_ids:
                 continue
+            scheduled_image_ids.add(image_id)
             
             image_filename = f"{image_id}.jpg"
-            image_path = os.path.join(PRODUCTS_DIR, image_filename)
-            image_relative_path = f"/images/products/{image_filename}"
-            
-            if download_image(image_url, image_path):
-                new_images.append({
+            image_jobs.append({
+                'url': image_url,
+                'filepath': os.path.join(PRODUCTS_DIR, image_filename),
+                'index': j,
+                'entry': {
                     'id': image_id,
                     'description': product['name_fr'],
-                    'imageUrl': image_relative_path,
+                    'imageUrl': f"/images/products/{image_filename}",
                     'imageHint': category_name or 'product'
-                })
-                existing_image_ids.add(image_id)
-                print(f"  ✓ Image {j+1} téléchargée: {image_id}")
+                }
+            })
         
         new_products.append(product)
     
-    # Fusionner
-    all_products = existing_products + new_products
+    if over_limit:
+        print(f"\n⚠️  {over_limit} nouveaux produits ignorés (limite de {MAX_TOTAL_PRODUCTS} produits)")
     
-    if len(all_products) > MAX_TOTAL_PRODUCTS:
-        all_products = all_products[:MAX_TOTAL_PRODUCTS]
+    # Télécharger les images en parallèle (résultats dans l'ordre des produits)
+    print(f"\n📥 Téléchargement de {len(image_jobs)} images...")
+    for job, image_url in download_all(image_jobs, journal.wrap_download(download_image)):
+        image_id = job['entry']['id']
+        if image_url:
+            # Chemin de l'image existante si son contenu était déjà stocké
+            job['entry']['imageUrl'] = image_url
+            new_images.append(job['entry'])
+            print(f"  ✓ Image {job['index']+1} téléchargée: {image_id}")
     
-    # Sauvegarder
-    print(f"\n💾 Sauvegarde de {len(new_products)} nouveaux produits...")
-    with open(NEW_PRODUCTS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(all_products, f, ensure_ascii=False, indent=2)
-    print(f"✓ {NEW_PRODUCTS_FILE} mis à jour ({len(all_products)} produits au total)")
+    # Ajouter ou mettre à jour dans le catalogue
+    counts = upsert_index.apply()
+    print_counts(counts)
     
-    # Images
-    all_images = placeholder_images + new_images
+    if catalog.count() > MAX_TOTAL_PRODUCTS:
+        catalog.truncate(MAX_TOTAL_PRODUCTS)
+    total_count = catalog.count()
+    
+    # Sauvegarder
+    print(f"\n💾 Sauvegarde du catalogue...")
+    if catalog.export_json() is not None:
+        print(f"✓ {catalog.json_path} mis à jour ({total_count} produits au total)")
+    if '--ts' in sys.argv:
+        # Module TypeScript du catalogue, via le sérialiseur partagé
+        count = write_products_ts(catalog, NEW_PRODUCTS_TS_FILE)
+        print(f"✓ {NEW_PRODUCTS_TS_FILE} mis à jour ({count} produits)")
+    catalog.close()
+    
+    # Images (une entrée par ID)
+    placeholder_images.add_many(new_images)
     print(f"\n💾 Sauvegarde de {len(new_images)} nouvelles images...")
-    with open(PLACEHOLDER_IMAGES_FILE, 'w', encoding='utf-8') as f:
-        json.dump({'placeholderImages': all_images}, f, ensure_ascii=False, indent=2)
-    print(f"✓ {PLACEHOLDER_IMAGES_FILE} mis à jour")
+    if placeholder_images.save():
+        print(f"✓ {PLACEHOLDER_IMAGES_FILE} et {PLACEHOLDER_IMAGE_MAP_FILE} mis à jour")
+    journal.clear()
+    image_store.get_store().save()
+    
+    http_client.get_client().print_stats()
+    image_store.get_store().print_stats()
+    metrics.close()
     
     print(f"\n✅ Importation terminée!")
-    print(f"   - {len(new_products)} produits ajoutés")
+    print(f"   - {counts['inserted']} produits ajoutés, {counts['updated']} mis à jour")
     print(f"   - {len(new_images)} images téléchargées")
-    print(f"   - Total: {len(all_products)}/{MAX_TOTAL_PRODUCTS} produits")
+    print(f"   - Total: {total_count}/{MAX_TOTAL_PRODUCTS} produits")
 
 if __name__ == '__main__':
     main()
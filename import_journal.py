@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Journal de reprise des scripts d'importation
+Fichier JSON Lines en ajout seul: produits scrapés, entrées produits créées et images
+téléchargées sont écrits au fil de l'eau pour pouvoir reprendre une importation interrompue
+"""
+
+import json
+import os
+import threading
+
+from image_store import PUBLIC_DIR
+
+# Configuration
+JOURNAL_DIR = ".import_journal"
+
+
+class ImportJournal:
+    """Journal en ajout seul d'une importation, relu avec --resume"""
+
+    def __init__(self, name, resume=False, journal_dir=JOURNAL_DIR):
+        self.path = os.path.join(journal_dir, f"{name}.jsonl")
+        self.scraped = None
+        self.products = {}
+        self.images = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(journal_dir, exist_ok=True)
+        if resume:
+            self._load()
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    @staticmethod
+    def exists(name, journal_dir=JOURNAL_DIR):
+        """Indique si une importation interrompue a laissé un journal"""
+        return os.path.exists(os.path.join(journal_dir, f"{name}.jsonl"))
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Dernière ligne tronquée par l'interruption
+                    continue
+                if record['type'] == 'scraped':
+                    self.scraped = record['products']
+                elif record['type'] == 'product':
+                    self.products[record['key']] = record['product']
+                elif record['type'] == 'image':
+                    self.images[record['path']] = record['url']
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def record_scraped(self, products):
+        """Enregistre le résultat complet du scraping"""
+        self.scraped = products
+        self._append({'type': 'scraped', 'products': products})
+
+    def record_product(self, key, product):
+        """Enregistre une entrée produit créée"""
+        self.products[key] = product
+        self._append({'type': 'product', 'key': key, 'product': product})
+
+    def record_image(self, path, url):
+        """Enregistre une image téléchargée avec succès et son chemin public"""
+        with self._lock:
+            self.images[path] = url
+        self._append({'type': 'image', 'path': path, 'url': url})
+
+    def stored_image(self, path):
+        """Chemin public de l'image si elle a été téléchargée lors d'une exécution précédente"""
+        with self._lock:
+            url = self.images.get(path)
+        if url and os.path.exists(os.path.join(PUBLIC_DIR, url.lstrip('/'))):
+            return url
+        return None
+
+    def wrap_download(self, download_func):
+        """
+        Enveloppe une fonction de téléchargement: saute les images déjà journalisées
+        et journalise chaque image dès la fin de son téléchargement
+        """
+        def download(url, filepath):
+            stored_url = self.stored_image(filepath)
+            if stored_url:
+                return stored_url
+            image_url = download_func(url, filepath)
+            if image_url:
+                self.record_image(filepath, image_url)
+            return image_url
+        return download
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def clear(self):
+        """Supprime le journal une fois l'importation sauvegardée"""
+        self.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def open_journal(name, argv):
+    """
+    Ouvre le journal d'une importation selon les options de la ligne de commande:
+    --resume reprend le journal existant, --fresh l'ignore. Sans option, retourne None
+    si une importation interrompue a laissé un journal, pour ne pas l'écraser.
+    """
+    resume = '--resume' in argv
+    if not resume and '--fresh' not in argv and ImportJournal.exists(name):
+        print(f"⚠️  Une importation interrompue a laissé un journal ({JOURNAL_DIR}/{name}.jsonl)")
+        print("   Relancez avec --resume pour la reprendre, ou --fresh pour repartir de zéro.")
+        return None
+    journal = ImportJournal(name, resume=resume)
+    if resume:
+        print(f"♻️  Reprise: {len(journal.products)} produits et {len(journal.images)} images déjà traités\n")
+    return journal
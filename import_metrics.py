@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Métriques structurées des scripts d'importation, par étape et par hôte
+Étapes: fetch (pages et API), parse (JSON, HTML), map (entrées produits), download (réseau des
+images) et store (écriture disque des images). Chaque étape cumule appels, secondes, octets,
+réponses servies par le cache, réessais et échecs; les secondes sont cumulées sur tous les
+threads. En fin d'exécution, un résumé JSON indique si l'importation était limitée par le
+réseau, l'analyse ou le disque. Avec --live, une ligne d'avancement est affichée périodiquement.
+
+Usage dans un importeur: metrics = open_metrics('nom', sys.argv) ... metrics.close()
+  --metrics FICHIER   chemin du résumé JSON (défaut: .import_metrics/<nom>-<date>.json)
+  --live              ligne d'avancement toutes les LIVE_INTERVAL secondes
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+
+# Configuration
+METRICS_DIR = ".import_metrics"
+LIVE_INTERVAL = 5.0
+
+STAGES = ('fetch', 'parse', 'map', 'download', 'store')
+COUNTERS = ('calls', 'seconds', 'bytes', 'cache_hits', 'cache_misses', 'retries', 'failures')
+
+# Regroupement des étapes pour le diagnostic: réseau, analyse (CPU) ou disque
+BOUNDS = {
+    'network': ('fetch', 'download'),
+    'parse': ('parse', 'map'),
+    'disk': ('store',),
+}
+
+
+def host_of(url):
+    """Hôte (avec port éventuel) d'une URL, None si elle n'en a pas"""
+    if not url:
+        return None
+    return urlparse(url).netloc.lower() or None
+
+
+def _empty():
+    return dict.fromkeys(COUNTERS, 0)
+
+
+class ImportMetrics:
+    """Compteurs par étape et par hôte, sûrs entre threads"""
+
+    def __init__(self, name=None):
+        self.name = name
+        self.path = None
+        self.started_at = datetime.now()
+        self._start = time.monotonic()
+        self._stages = {}          # étape -> compteurs
+        self._hosts = {}           # hôte -> étape -> compteurs
+        self._lock = threading.Lock()
+        self._live_stop = None
+        self._live_thread = None
+
+    def add(self, stage, host=None, **counters):
+        """Ajoute des compteurs (calls, seconds, bytes, cache_hits, ...) à une étape et à son hôte"""
+        with self._lock:
+            buckets = [self._stages.setdefault(stage, _empty())]
+            if host:
+                buckets.append(self._hosts.setdefault(host, {}).setdefault(stage, _empty()))
+            for bucket in buckets:
+                for counter, value in counters.items():
+                    bucket[counter] += value
+
+    @contextmanager
+    def timer(self, stage, host=None, **counters):
+        """Chronomètre un appel; une exception est comptée comme échec puis propagée"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            counters['failures'] = counters.get('failures', 0) + 1
+            raise
+        finally:
+            self.add(stage, host, calls=1, seconds=time.perf_counter() - start, **counters)
+
+    def elapsed(self):
+        return time.monotonic() - self._start
+
+    def bound(self, stages=None):
+        """Groupe d'étapes (network, parse, disk) ayant cumulé le plus de temps, None sans mesure"""
+        stages = self.stages() if stages is None else stages
+        totals = {bound: sum(stages.get(stage, {}).get('seconds', 0) for stage in members)
+                  for bound, members in BOUNDS.items()}
+        bound = max(totals, key=totals.get)
+        return bound if totals[bound] > 0 else None
+
+    def stages(self):
+        with self._lock:
+            return {stage: dict(counters) for stage, counters in self._stages.items()}
+
+    def hosts(self):
+        with self._lock:
+            return {host: {stage: dict(counters) for stage, counters in stages.items()}
+                    for host, stages in self._hosts.items()}
+
+    def summary(self):
+        """Résumé sérialisable en JSON de l'exécution"""
+        stages = self.stages()
+        total = sum(counters['seconds'] for counters in stages.values())
+        for counters in stages.values():
+            counters['share'] = round(counters['seconds'] / total, 4) if total else 0.0
+        ordered = {stage: stages[stage] for stage in STAGES if stage in stages}
+        ordered.update((stage, counters) for stage, counters in sorted(stages.items()) if stage not in ordered)
+        return {
+            'script': self.name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'elapsed_seconds': round(self.elapsed(), 3),
+            'bound': self.bound(stages),
+            'stages': ordered,
+            'hosts': dict(sorted(self.hosts().items())),
+        }
+
+    def write_summary(self, path=None):
+        """Écrit le résumé JSON (atomiquement); retourne son chemin"""
+        if path is None:
+            path = self.path or os.path.join(
+                METRICS_DIR, f"{self.name or 'import'}-{self.started_at:%Y%m%d-%H%M%S}.json")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def live_line(self):
+        """Ligne d'avancement: appels, temps cumulé et volume de chaque étape"""
+        stages = self.stages()
+        parts = []
+        for stage in STAGES:
+            counters = stages.get(stage)
+            if not counters:
+                continue
+            part = f"{stage} {counters['calls']} ({counters['seconds']:.1f}s"
+            if counters['bytes']:
+                part += f", {counters['bytes'] / (1024 * 1024):.1f} Mo"
+            parts.append(part + ")")
+        failures = sum(counters['failures'] for counters in stages.values())
+        line = f"⏱️  {self.elapsed():.0f}s | " + (' | '.join(parts) or 'en attente')
+        return line + (f" | {failures} échecs" if failures else '')
+
+    def start_live(self, interval=LIVE_INTERVAL):
+        """Affiche live_line() toutes les `interval` secondes depuis un thread d'arrière-plan"""
+        if self._live_thread is not None:
+            return
+        self._live_stop = threading.Event()
+
+        def loop():
+            while not self._live_stop.wait(interval):
+                print(self.live_line(), flush=True)
+
+        self._live_thread = threading.Thread(target=loop, daemon=True)
+        self._live_thread.start()
+
+    def stop_live(self):
+        if self._live_thread is not None:
+            self._live_stop.set()
+            self._live_thread.join()
+            self._live_thread = None
+
+    def print_stats(self):
+        """Affiche le temps cumulé par étape et le diagnostic"""
+        summary = self.summary()
+        if not summary['stages']:
+            return
+        print(f"\n⏱️  Métriques par étape ({summary['elapsed_seconds']:.1f}s au total, temps cumulé sur les threads):")
+        for stage, counters in summary['stages'].items():
+            line = (f"   - {stage:<9} {counters['calls']:6d} appels  {counters['seconds']:8.2f}s "
+                    f"({counters['share']:.0%})")
+            if counters['bytes']:
+                line += f"  {counters['bytes'] / 1024:.0f} Ko"
+            if counters['cache_hits']:
+                line += f"  {counters['cache_hits']} en cache"
+            if counters['retries']:
+                line += f"  {counters['retries']} réessais"
+            if counters['failures']:
+                line += f"  {counters['failures']} échecs"
+            print(line)
+        if summary['bound']:
+            print(f"   Étape dominante: {summary['bound']}")
+
+    def close(self):
+        """Arrête la ligne d'avancement, écrit le résumé JSON et affiche les métriques"""
+        self.stop_live()
+        self.print_stats()
+        path = self.write_summary()
+        print(f"📈 Résumé des métriques: {path}")
+        return path
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Retourne les métriques partagées, créées à la première utilisation"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = ImportMetrics()
+        return _metrics
+
+
+def open_metrics(name, argv):
+    """
+    Démarre les métriques partagées d'un script d'importation: nom du résumé, chemin
+    (--metrics FICHIER) et ligne d'avancement (--live)
+    """
+    metrics = get_metrics()
+    metrics.name = name
+    if '--metrics' in argv:
+        position = argv.index('--metrics')
+        if position + 1 < len(argv):
+            metrics.path = argv[position + 1]
+    if '--live' in argv:
+        metrics.start_live()
+    return metrics
+
+
+def add(stage, host=None, **counters):
+    """Ajoute des compteurs aux métriques partagées"""
+    get_metrics().add(stage, host, **counters)
+
+
+def timer(stage, host=None, **counters):
+    """Chronomètre un appel dans les métriques partagées"""
+    return get_metrics().timer(stage, host, **counters)
@@ -6,125 +6,37 @@ Script pour importer les produits depuis 24s.com
 Récupère toutes les catégories, images, prix et descriptions
 """
 
-import json
 import requests
-from bs4 import BeautifulSoup
 import os
 import re
 from urllib.parse import urljoin, urlparse
 import time
 from pathlib import Path
+import sys
+
+import html_parser
+import http_client
+import image_store
+import import_metrics
+import structured_data
+from catalog_store import open_catalog
+from catalog_upsert import UpsertIndex, print_counts
+from http_cache import HttpCache
+from id_allocator import allocate_id
+from download_pool import download_all
+from import_journal import open_journal
+from import_metrics import open_metrics
+from placeholder_images import PLACEHOLDER_IMAGE_MAP_FILE, PLACEHOLDER_IMAGES_FILE, PlaceholderImages
+from product_classifier import get_classifier
+from product_serializer import NEW_PRODUCTS_TS_FILE, write_products_ts
+from shopify_client import fetch_all_products
 
 # Configuration
 SOURCE_SITE = "https://24s.com"
 PRODUCTS_DIR = "public/images/products"
-NEW_PRODUCTS_FILE = "new_products.json"
-PLACEHOLDER_IMAGES_FILE = "src/lib/placeholder-images.json"
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # Taille maximale d'une image téléchargée
 MAX_TOTAL_PRODUCTS = 1100
-
-# Mapping des catégories 24s vers les catégories du nouveau site
-CATEGORY_MAPPING = {
-    # Homme
-    'homme': 'mens-clothing',
-    'hommes': 'mens-clothing',
-    'men': 'mens-clothing',
-    'mens': 'mens-clothing',
-    'chemise': 'mens-clothing',
-    'chemises': 'mens-clothing',
-    'shirt': 'mens-clothing',
-    'shirts': 'mens-clothing',
-    'pantalon': 'mens-clothing',
-    'pantalons': 'mens-clothing',
-    'trousers': 'mens-clothing',
-    'veste': 'mens-clothing',
-    'vestes': 'mens-clothing',
-    'jacket': 'mens-clothing',
-    'jackets': 'mens-clothing',
-    'pull': 'mens-clothing',
-    'pulls': 'mens-clothing',
-    'sweater': 'mens-clothing',
-    'sweaters': 'mens-clothing',
-    
-    # Femme
-    'femme': 'womens-clothing',
-    'femmes': 'womens-clothing',
-    'women': 'womens-clothing',
-    'womens': 'womens-clothing',
-    'robe': 'womens-clothing',
-    'robes': 'womens-clothing',
-    'dress': 'womens-clothing',
-    'dresses': 'womens-clothing',
-    'top': 'womens-clothing',
-    'tops': 'womens-clothing',
-    'jupe': 'womens-clothing',
-    'jupes': 'womens-clothing',
-    'skirt': 'womens-clothing',
-    'skirts': 'womens-clothing',
-    
-    # Accessoires
-    'accessoire': 'accessories',
-    'accessoires': 'accessories',
-    'accessory': 'accessories',
-    'accessories': 'accessories',
-    'montre': 'accessories',
-    'montres': 'accessories',
-    'watch': 'accessories',
-    'watches': 'accessories',
-    'sac': 'accessories',
-    'sacs': 'accessories',
-    'bag': 'accessories',
-    'bags': 'accessories',
-    
-    # Chaussures
-    'chaussure': 'shoes',
-    'chaussures': 'shoes',
-    'shoe': 'shoes',
-    'shoes': 'shoes',
-    'bottine': 'shoes',
-    'bottines': 'shoes',
-    'boot': 'shoes',
-    'boots': 'shoes',
-    
-    # Sport
-    'sport': 'sport',
-    'sports': 'sport',
-    
-    # Hiver
-    'hiver': 'winter-clothing',
-    'winter': 'winter-clothing',
-    'doudoune': 'winter-clothing',
-    'parka': 'winter-clothing',
-    'manteau': 'winter-clothing',
-}
-
-# Mapping des sous-catégories
-SUBCATEGORY_MAPPING = {
-    # Homme
-    'chemise': 'chemises-homme',
-    'chemises': 'chemises-homme',
-    'pantalon': 'pantalons-homme',
-    'pantalons': 'pantalons-homme',
-    'veste': 'vestes-homme',
-    'vestes': 'vestes-homme',
-    'pull': 'pulls-homme',
-    'pulls': 'pulls-homme',
-    'accessoire': 'accessoires-homme',
-    'accessoires': 'accessoires-homme',
-    
-    # Femme
-    'robe': 'robes-femme',
-    'robes': 'robes-femme',
-    'top': 'tops-femme',
-    'tops': 'tops-femme',
-    'pantalon': 'pantalons-femme',
-    'pantalons': 'pantalons-femme',
-    'jupe': 'jupes-femme',
-    'jupes': 'jupes-femme',
-    'veste': 'vestes-femme',
-    'vestes': 'vestes-femme',
-    'accessoire': 'accessoires-femme',
-    'accessoires': 'accessoires-femme',
-}
+CLASSIFIER = get_classifier()  # Catégorie, sous-catégorie et genre (product_classifier.py)
 
 def clean_filename(name):
     """Nettoie un nom pour en faire un nom de fichier valide"""
@@ -135,72 +47,12 @@ def clean_filename(name):
     return name
 
 def download_image(url, filepath):
-    """Télécharge une image depuis une URL"""
+    """Télécharge une image depuis une URL; retourne son chemin public ou None"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
-        return True
+        return image_store.get_store().download(url, filepath, max_bytes=MAX_IMAGE_BYTES)
     except Exception as e:
         print(f"  ✗ Erreur image {url}: {e}")
-        return False
-
-def map_category(category_name, subcategory_name=None):
-    """Mappe une catégorie 24s vers une catégorie du nouveau site"""
-    if not category_name:
-        return 'accessories', None
-    
-    cat_lower = category_name.lower()
-    
-    # Chercher dans le mapping
-    for key, mapped_cat in CATEGORY_MAPPING.items():
-        if key in cat_lower:
-            category = mapped_cat
-            
-            # Déterminer la sous-catégorie
-            subcategory = None
-            if subcategory_name:
-                sub_lower = subcategory_name.lower()
-                for key, mapped_sub in SUBCATEGORY_MAPPING.items():
-                    if key in sub_lower:
-                        # Vérifier que la sous-catégorie correspond à la catégorie
-                        if (mapped_sub.startswith('accessoires') and category == 'accessories') or \
-                           (mapped_sub.startswith('chemises') and category == 'mens-clothing') or \
-                           (mapped_sub.startswith('pantalons') and category == 'mens-clothing') or \
-                           (mapped_sub.startswith('vestes') and category == 'mens-clothing') or \
-                           (mapped_sub.startswith('pulls') and category == 'mens-clothing') or \
-                           (mapped_sub.startswith('robes') and category == 'womens-clothing') or \
-                           (mapped_sub.startswith('tops') and category == 'womens-clothing') or \
-                           (mapped_sub.startswith('jupes') and category == 'womens-clothing'):
-                            subcategory = mapped_sub
-                            break
-            
-            return category, subcategory
-    
-    # Par défaut
-    return 'accessories', None
-
-def determine_gender(category_name, subcategory_name, description, name):
-    """Détermine le genre du produit"""
-    text = (category_name + " " + subcategory_name + " " + description + " " + name).lower()
-    
-    femme_keywords = ['femme', 'woman', 'women', 'ladies', 'dame', 'dames', 'féminin', 'feminine']
-    homme_keywords = ['homme', 'man', 'men', 'gentleman', 'herren', 'masculin', 'masculine']
-    
-    femme_score = sum(1 for keyword in femme_keywords if keyword in text)
-    homme_score = sum(1 for keyword in homme_keywords if keyword in text)
-    
-    if femme_score > homme_score:
-        return 'femme'
-    elif homme_score > femme_score:
-        return 'homme'
-    return 'unisex'
+        return None
 
 def scrape_products():
     """Scrape les produits depuis 24s.com"""
@@ -231,21 +83,20 @@ def scrape_products():
         for api_url in api_urls:
             try:
                 print(f"  Tentative API: {api_url}")
-                session = requests.Session()
-                session.headers.update(headers)
-                response = session.get(api_url, timeout=30, allow_redirects=True)
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'products' in data:
-                        print(f"  ✓ {len(data['products'])} produits trouvés via API\n")
-                        for product_data in data['products']:
+                api_products = fetch_all_products(api_url, headers=headers)
+                if api_products is not None:
+                    print(f"  ✓ {len(api_products)} produits trouvés via API\n")
+                    with import_metrics.timer('map', import_metrics.host_of(api_url)):
+                        for product_data in api_products:
                             product = parse_shopify_product(product_data)
                             if product:
                                 products.append(product)
-                        return products
+                    return products
             except requests.exceptions.RequestException as e:
                 print(f"  ✗ Erreur API: {type(e).__name__}")
-                time.sleep(2)  # Pause avant réessai
+                # Repli sur l'URL suivante: un échec, pas une nouvelle tentative
+                import_metrics.add('fetch', import_metrics.host_of(api_url), failures=1)
+                time.sleep(2)  # Pause avant l'URL suivante
                 continue
             except Exception as e:
                 print(f"  ✗ Erreur API: {e}")
@@ -261,11 +112,10 @@ def scrape_products():
         
         for url in urls_to_try:
             try:
-                session = requests.Session()
-                session.headers.update(headers)
-                response = session.get(url, timeout=30, allow_redirects=True)
+                response = http_client.get(url, headers=headers, timeout=30, allow_redirects=True)
                 response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
+                with import_metrics.timer('parse', import_metrics.host_of(url)):
+                    soup = html_parser.parse(response.text)
                 
                 # Chercher les liens produits
                 product_links = soup.find_all('a', href=re.compile(r'/product', re.I))
@@ -288,6 +138,7 @@ def scrape_products():
                 break
             except requests.exceptions.RequestException as e:
                 print(f"  ✗ Erreur connexion: {type(e).__name__}")
+                import_metrics.add('fetch', import_metrics.host_of(url), failures=1)
                 time.sleep(2)
                 continue
             except Exception as e:
@@ -321,8 +172,7 @@ def parse_shopify_product(product_data):
         # Description
         description = product_data.get('body_html', '')
         if description:
-            soup = BeautifulSoup(description, 'html.parser')
-            description = soup.get_text(strip=True)
+            description = html_parser.html_to_text(description)
         
         # Images
         images = product_data.get('images', [])
@@ -335,22 +185,12 @@ def parse_shopify_product(product_data):
                 if img_url:
                     image_urls.append(img_url)
         
-        # Catégorie et sous-catégorie depuis les tags ou le type
+        # Catégorie, sous-catégorie et genre depuis le type ou les tags (chaîne "a, b" ou liste)
         product_type = product_data.get('product_type', '')
-        tags = ' '.join(product_data.get('tags', []))
+        tags = product_data.get('tags', [])
+        tags = tags if isinstance(tags, str) else ' '.join(tags)
         category_name = product_type or tags
-        
-        # Déterminer le genre
-        gender = determine_gender(category_name, '', description, name)
-        
-        # Mapper la catégorie
-        category, subcategory = map_category(category_name, '')
-        
-        # Ajuster selon le genre si nécessaire
-        if gender == 'femme' and category == 'mens-clothing':
-            category = 'womens-clothing'
-        elif gender == 'homme' and category == 'womens-clothing':
-            category = 'mens-clothing'
+        category, subcategory, gender = CLASSIFIER.classify(category_name, '', f"{description} {name}")
         
         return {
             'name': name,
@@ -375,67 +215,97 @@ def scrape_product_page(url):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get(url, headers=headers, timeout=30)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Nom
-        name_elem = soup.find('h1', class_=re.compile(r'title|name|product', re.I))
-        if not name_elem:
-            name_elem = soup.find('h1')
-        name = name_elem.get_text(strip=True) if name_elem else None
-        
-        if not name or len(name) < 3:
-            return None
-        
-        # Prix
-        price = 0
-        old_price = None
-        price_elem = soup.find(['span', 'div'], class_=re.compile(r'price', re.I))
-        if price_elem:
-            price_text = price_elem.get_text(strip=True)
-            price = extract_price(price_text)
-        
-        # Description
-        description = ""
-        desc_elem = soup.find(['div', 'section'], class_=re.compile(r'description|content', re.I))
-        if desc_elem:
-            desc_paras = desc_elem.find_all('p')
-            if desc_paras:
-                description = ' '.join([p.get_text(strip=True) for p in desc_paras[:3]])
-            else:
-                description = desc_elem.get_text(strip=True)
-        
-        # Images
-        image_urls = []
-        img_elems = soup.find_all('img', class_=re.compile(r'product|main', re.I))
-        for img_elem in img_elems:
-            src = img_elem.get('src') or img_elem.get('data-src')
-            if src and 'logo' not in src.lower() and 'icon' not in src.lower():
-                image_urls.append(urljoin(SOURCE_SITE, src))
-        
-        # Catégorie
-        category = 'accessories'
-        breadcrumb = soup.find(['nav', 'ol', 'ul'], class_=re.compile(r'breadcrumb', re.I))
-        if breadcrumb:
-            links = breadcrumb.find_all('a')
-            if links:
-                category = links[-1].get_text(strip=True)
-        
+        with import_metrics.timer('parse', import_metrics.host_of(url)):
+            return parse_product_page(response.text, url)
+    except Exception as e:
+        print(f"  Erreur scraping {url}: {e}")
+        return None
+
+def parse_product_page(html, url):
+    """
+    Extrait un produit depuis le HTML d'une page produit: données structurées
+    (JSON Shopify, JSON-LD, OpenGraph) d'abord, analyse heuristique du DOM sinon
+    """
+    # Données structurées d'abord (JSON Shopify, JSON-LD, OpenGraph)
+    structured = structured_data.extract_product(html, url)
+    if structured_data.is_complete(structured):
+        structured_data.record(structured['source'])
+        # La catégorie source (ex. "Apparel > Dresses") est classée comme celle de l'API
+        category, subcategory, gender = CLASSIFIER.classify(
+            structured['category'] or '', '', f"{structured['description']} {structured['name']}")
         return {
-            'name': name,
-            'price': price,
-            'old_price': old_price,
-            'image_urls': image_urls,
-            'description': description,
+            'name': structured['name'],
+            'price': int(structured['price']),
+            'old_price': int(structured['old_price']) if structured['old_price'] else None,
+            'image_urls': structured['image_urls'],
+            'description': structured['description'],
             'category': category,
-            'subcategory': None,
-            'gender': 'unisex',
+            'subcategory': subcategory,
+            'gender': gender,
             'url': url
         }
-    except Exception as e:
-        print(f"  Erreur scraping {url}: {e}")
+    
+    soup = html_parser.parse_product_page(html)
+    
+    # Nom
+    name_elem = soup.find('h1', class_=re.compile(r'title|name|product', re.I))
+    if not name_elem:
+        name_elem = soup.find('h1')
+    name = name_elem.get_text(strip=True) if name_elem else None
+    
+    if not name or len(name) < 3:
+        structured_data.record('miss')
         return None
+    
+    # Prix
+    price = 0
+    old_price = None
+    price_elem = soup.find(['span', 'div'], class_=re.compile(r'price', re.I))
+    if price_elem:
+        price_text = price_elem.get_text(strip=True)
+        price = extract_price(price_text)
+    
+    # Description
+    description = ""
+    desc_elem = soup.find(['div', 'section'], class_=re.compile(r'description|content', re.I))
+    if desc_elem:
+        desc_paras = desc_elem.find_all('p')
+        if desc_paras:
+            description = ' '.join([p.get_text(strip=True) for p in desc_paras[:3]])
+        else:
+            description = desc_elem.get_text(strip=True)
+    
+    # Images
+    image_urls = []
+    img_elems = soup.find_all('img', class_=re.compile(r'product|main', re.I))
+    for img_elem in img_elems:
+        src = img_elem.get('src') or img_elem.get('data-src')
+        if src and 'logo' not in src.lower() and 'icon' not in src.lower():
+            image_urls.append(urljoin(SOURCE_SITE, src))
+    
+    # Catégorie (dernier lien du fil d'Ariane), classée comme celle de l'API
+    category_name = ''
+    breadcrumb = soup.find(['nav', 'ol', 'ul'], class_=re.compile(r'breadcrumb', re.I))
+    if breadcrumb:
+        links = breadcrumb.find_all('a')
+        if links:
+            category_name = links[-1].get_text(strip=True)
+    category, subcategory, gender = CLASSIFIER.classify(category_name, '', f"{description} {name}")
+    
+    structured_data.record('heuristic')
+    return {
+        'name': name,
+        'price': price,
+        'old_price': old_price,
+        'image_urls': image_urls,
+        'description': description,
+        'category': category,
+        'subcategory': subcategory,
+        'gender': gender,
+        'url': url
+    }
 
 def extract_price(price_text):
     """Extrait le prix d'un texte"""
@@ -461,24 +331,29 @@ def create_product_entry(product_data, index, gender):
     category = product_data.get('category', 'accessories')
     subcategory = product_data.get('subcategory')
     
-    # Générer l'ID
+    # URL source, clé de mise à jour lors d'une nouvelle importation
+    handle = product_data.get('handle')
+    source_url = product_data.get('url') or (f"{SOURCE_SITE}/products/{handle}" if handle else None)
+    
+    # Générer l'ID (séquence persistante par préfixe)
     if category == 'womens-clothing' and subcategory:
-        product_id = f'{subcategory}-{index+1:03d}'
+        id_prefix = subcategory
     elif category == 'mens-clothing' and subcategory:
-        product_id = f'{subcategory}-{index+1:03d}'
+        id_prefix = subcategory
     elif category == 'accessories':
         if gender == 'femme':
-            product_id = f'accessoires-femme-{index+1:03d}'
+            id_prefix = 'accessoires-femme'
             subcategory = 'accessoires-femme'
             category = 'womens-clothing'
         elif gender == 'homme':
-            product_id = f'accessoires-homme-{index+1:03d}'
+            id_prefix = 'accessoires-homme'
             subcategory = 'accessoires-homme'
             category = 'mens-clothing'
         else:
-            product_id = f'accessoires-{index+1:03d}'
+            id_prefix = 'accessoires'
     else:
-        product_id = f'{category.replace("-", "_")}-{index+1:03d}'
+        id_prefix = category.replace("-", "_")
+    product_id = allocate_id(id_prefix, source_url or slug)
     
     # Noms multilingues (basique)
     name_fr = name
@@ -518,7 +393,8 @@ def create_product_entry(product_data, index, gender):
         'subcategory': subcategory,
         'images': image_ids,
         'sizes': None,
-        'colors': None
+        'colors': None,
+        'sourceUrl': source_url
     }
     
     return product, image_ids, image_urls
@@ -526,53 +402,57 @@ def create_product_entry(product_data, index, gender):
 def main():
     print("🚀 Début de l'importation des produits depuis 24s.com\n")
     
+    # Métriques par étape (résumé JSON en fin d'importation, --live pour l'avancement)
+    metrics = open_metrics('import_products_from_24s', sys.argv)
+    
+    # Cache HTTP disque (--no-cache pour le désactiver, --cache-only pour rejouer hors-ligne)
+    if '--no-cache' not in sys.argv:
+        http_client.get_client().cache = HttpCache(offline='--cache-only' in sys.argv)
+    
     # Vérifier le nombre actuel de produits
-    try:
-        with open(NEW_PRODUCTS_FILE, 'r', encoding='utf-8') as f:
-            existing_products = json.load(f)
-        current_count = len(existing_products)
-        print(f"📊 Produits actuels: {current_count}")
-        remaining = MAX_TOTAL_PRODUCTS - current_count
-        print(f"📊 Produits restants: {remaining}")
-        print(f"📊 Limite maximale: {MAX_TOTAL_PRODUCTS}\n")
-        
-        if remaining <= 0:
-            print("⚠️  Limite de 1100 produits atteinte!")
-            print("   Utilisez limit_products_to_1100.py pour nettoyer si nécessaire.")
-            return
-    except:
-        existing_products = []
-        current_count = 0
-        remaining = MAX_TOTAL_PRODUCTS
-        print(f"📊 Produits actuels: 0")
-        print(f"📊 Produits restants: {remaining}")
-        print(f"📊 Limite maximale: {MAX_TOTAL_PRODUCTS}\n")
-    
-    # Scraper les produits
-    products_data = scrape_products()
+    catalog = open_catalog(sys.argv)
+    current_count = catalog.count()
+    print(f"📊 Produits actuels: {current_count}")
+    remaining = MAX_TOTAL_PRODUCTS - current_count
+    print(f"📊 Produits restants: {remaining}")
+    print(f"📊 Limite maximale: {MAX_TOTAL_PRODUCTS}\n")
+    
+    if remaining <= 0:
+        print("⚠️  Limite de 1100 produits atteinte: seuls les produits existants seront mis à jour.")
+        print("   Utilisez limit_products_to_1100.py pour nettoyer si nécessaire.\n")
+        remaining = 0
+    
+    # Journal de reprise (--resume pour reprendre une importation interrompue)
+    journal = open_journal('import_products_from_24s', sys.argv)
+    if journal is None:
+        return
+    
+    # Scraper les produits (ou les relire depuis le journal)
+    products_data = journal.scraped
+    if products_data is None:
+        products_data = scrape_products()
+        journal.record_scraped(products_data)
     
     if not products_data:
         print("\n❌ Aucun produit trouvé.")
+        journal.clear()
         return
     
     print(f"\n✓ {len(products_data)} produits trouvés\n")
     
-    # Limiter le nombre
-    products_data = products_data[:remaining]
-    print(f"📊 Limitation à {len(products_data)} produits pour respecter la limite\n")
+    # Index des produits existants (mise à jour plutôt que doublon)
+    upsert_index = UpsertIndex(catalog)
+    over_limit = 0
+    print(f"📊 Au plus {remaining} nouveaux produits, les produits déjà importés sont mis à jour\n")
     
-    # Charger les images existantes
-    try:
-        with open(PLACEHOLDER_IMAGES_FILE, 'r', encoding='utf-8') as f:
-            placeholder_data = json.load(f)
-            placeholder_images = placeholder_data.get('placeholderImages', [])
-    except:
-        placeholder_images = []
+    # Charger les images existantes (index par ID)
+    placeholder_images = PlaceholderImages()
     
     # Traiter chaque produit
     new_products = []
     new_images = []
-    existing_image_ids = {img.get('id') for img in placeholder_images}
+    scheduled_image_ids = set()
+    image_jobs = []
     
     for i, product_data in enumerate(products_data):
         print(f"\n[{i+1}/{len(products_data)}] {product_data.get('name', '')[:60]}")
@@ -580,56 +460,92 @@ def main():
         gender = product_data.get('gender', 'unisex')
         print(f"  Catégorie: {product_data.get('category', 'N/A')} | Genre: {gender}")
         
-        # Créer l'entrée produit
-        product, image_ids, image_urls = create_product_entry(product_data, i, gender)
+        # Créer l'entrée produit (réutiliser celle du journal en cas de reprise)
+        with metrics.timer('map'):
+            product, image_ids, image_urls = create_product_entry(product_data, i, gender)
+        if i in journal.products:
+            product = journal.products[i]
+        else:
+            journal.record_product(i, product)
+        
+        # Un produit déjà au catalogue est mis à jour sans compter dans la limite
+        if upsert_index.find(product) is None and upsert_index.insert_count >= remaining:
+            print("  ⚠ Limite atteinte, produit ignoré")
+            over_limit += 1
+            continue
+        upsert_index.stage(product)
         
-        # Télécharger les images
+        # Planifier les téléchargements d'images
         for j, (image_id, image_url) in enumerate(zip(image_ids, image_urls)):
-            if image_id in existing_image_ids:
+            if image_id in placeholder_images or image_id in scheduled_image_ids:
                 continue
+            scheduled_image_ids.add(image_id)
             
             image_filename = f"{image_id}.jpg"
-            image_path = os.path.join(PRODUCTS_DIR, image_filename)
-            image_relative_path = f"/images/products/{image_filename}"
-            
-            if download_image(image_url, image_path):
-                new_images.append({
+            image_jobs.append({
+                'url': image_url,
+                'filepath': os.path.join(PRODUCTS_DIR, image_filename),
+                'index': j,
+                'entry': {
                     'id': image_id,
                     'description': product['name_fr'],
-                    'imageUrl': image_relative_path,
+                    'imageUrl': f"/images/products/{image_filename}",
                     'imageHint': product_data.get('product_type', 'product')
-                })
-                existing_image_ids.add(image_id)
-                print(f"  ✓ Image {j+1} téléchargée: {image_id}")
+                }
+            })
         
         new_products.append(product)
     
-    # Fusionner avec les produits existants
-    all_products = existing_products + new_products
+    if over_limit:
+        print(f"\n⚠️  {over_limit} nouveaux produits ignorés (limite de {MAX_TOTAL_PRODUCTS} produits)")
+    
+    # Télécharger les images en parallèle (résultats dans l'ordre des produits)
+    print(f"\n📥 Téléchargement de {len(image_jobs)} images...")
+    for job, image_url in download_all(image_jobs, journal.wrap_download(download_image)):
+        image_id = job['entry']['id']
+        if image_url:
+            # Chemin de l'image existante si son contenu était déjà stocké
+            job['entry']['imageUrl'] = image_url
+            new_images.append(job['entry'])
+            print(f"  ✓ Image {job['index']+1} téléchargée: {image_id}")
+    
+    # Ajouter ou mettre à jour dans le catalogue
+    counts = upsert_index.apply()
+    print_counts(counts)
     
     # Vérifier la limite
-    if len(all_products) > MAX_TOTAL_PRODUCTS:
+    if catalog.count() > MAX_TOTAL_PRODUCTS:
         print(f"\n⚠️  Limite dépassée! Limitation à {MAX_TOTAL_PRODUCTS} produits")
-        all_products = all_products[:MAX_TOTAL_PRODUCTS]
+        catalog.truncate(MAX_TOTAL_PRODUCTS)
+    total_count = catalog.count()
     
     # Sauvegarder
-    print(f"\n💾 Sauvegarde de {len(new_products)} nouveaux produits...")
-    with open(NEW_PRODUCTS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(all_products, f, ensure_ascii=False, indent=2)
-    print(f"✓ {NEW_PRODUCTS_FILE} mis à jour ({len(all_products)} produits au total)")
-    
-    # Fusionner les images
-    all_images = placeholder_images + new_images
-    
+    print(f"\n💾 Sauvegarde du catalogue...")
+    if catalog.export_json() is not None:
+        print(f"✓ {catalog.json_path} mis à jour ({total_count} produits au total)")
+    if '--ts' in sys.argv:
+        # Module TypeScript du catalogue, via le sérialiseur partagé
+        count = write_products_ts(catalog, NEW_PRODUCTS_TS_FILE)
+        print(f"✓ {NEW_PRODUCTS_TS_FILE} mis à jour ({count} produits)")
+    catalog.close()
+    
+    # Fusionner les images (une entrée par ID)
+    placeholder_images.add_many(new_images)
     print(f"\n💾 Sauvegarde de {len(new_images)} nouvelles images...")
-    with open(PLACEHOLDER_IMAGES_FILE, 'w', encoding='utf-8') as f:
-        json.dump({'placeholderImages': all_images}, f, ensure_ascii=False, indent=2)
-    print(f"✓ {PLACEHOLDER_IMAGES_FILE} mis à jour")
+    if placeholder_images.save():
+        print(f"✓ {PLACEHOLDER_IMAGES_FILE} et {PLACEHOLDER_IMAGE_MAP_FILE} mis à jour")
+    journal.clear()
+    image_store.get_store().save()
+    
+    http_client.get_client().print_stats()
+    image_store.get_store().print_stats()
+    structured_data.print_stats()
+    metrics.close()
     
     print(f"\n✅ Importation terminée!")
-    print(f"   - {len(new_products)} produits ajoutés")
+    print(f"   - {counts['inserted']} produits ajoutés, {counts['updated']} mis à jour")
     print(f"   - {len(new_images)} images téléchargées")
-    print(f"   - Total: {len(all_products)}/{MAX_TOTAL_PRODUCTS} produits")
+    print(f"   - Total: {total_count}/{MAX_TOTAL_PRODUCTS} produits")
 
 if __name__ == '__main__':
     main()
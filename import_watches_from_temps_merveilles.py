@@ -7,19 +7,42 @@ Télécharge les images et les classe dans les bonnes catégories
 """
 
 import json
-import requests
-from bs4 import BeautifulSoup
 import os
 import re
 from urllib.parse import urljoin, urlparse
-import time
 from pathlib import Path
+import sys
+
+import html_parser
+import http_client
+import image_store
+import import_metrics
+import structured_data
+from catalog_store import open_catalog
+from catalog_upsert import UpsertIndex, print_counts
+from http_cache import HttpCache
+from id_allocator import allocate_id
+from download_pool import download_all
+from import_journal import open_journal
+from import_metrics import open_metrics
+from placeholder_images import PLACEHOLDER_IMAGE_MAP_FILE, PLACEHOLDER_IMAGES_FILE, PlaceholderImages
+from product_classifier import get_classifier
+from product_filters import get_filter
+from product_serializer import NEW_PRODUCTS_TS_FILE, write_products_ts
+from crawl_frontier import CrawlFrontier
+from shopify_client import fetch_all_products
 
 # Configuration
 SOURCE_SITE = "https://temps-et-merveilles.fr"  # Corrigez l'URL si nécessaire
 PRODUCTS_DIR = "public/images/products"
-NEW_PRODUCTS_FILE = "new_products.json"
-PLACEHOLDER_IMAGES_FILE = "src/lib/placeholder-images.json"
+MAX_SCRAPED_PRODUCTS = 500
+CRAWL_MAX_DEPTH = 6           # Listing -> pages suivantes -> pages produits
+CRAWL_MAX_PAGES = 1500        # Budget de pages récupérées par le scraping HTML
+CRAWL_TIME_BUDGET = 15 * 60   # Budget de temps du crawl (secondes)
+CRAWL_PAGINATION_LINKS = 5    # Liens de pagination suivis par page de listing
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # Taille maximale d'une image téléchargée
+PRODUCT_FILTER = get_filter('temps-et-merveilles')  # Éléments de navigation exclus (product_filters.py)
+CLASSIFIER = get_classifier('montres')  # Genre, avec les indices propres aux montres (product_classifier.py)
 
 def clean_filename(name):
     """Nettoie un nom pour en faire un nom de fichier valide"""
@@ -34,45 +57,14 @@ def clean_filename(name):
     return name
 
 def download_image(url, filepath):
-    """Télécharge une image depuis une URL"""
+    """Télécharge une image depuis une URL; retourne son chemin public ou None"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
-        print(f"  ✓ Image téléchargée: {filepath}")
-        return True
+        image_url = image_store.get_store().download(url, filepath, max_bytes=MAX_IMAGE_BYTES)
+        print(f"  ✓ Image téléchargée: {image_url}")
+        return image_url
     except Exception as e:
         print(f"  ✗ Erreur lors du téléchargement de {url}: {e}")
-        return False
-
-def determine_gender(description, name):
-    """Détermine le genre de la montre basé sur la description et le nom"""
-    text = (description + " " + name).lower()
-    
-    # Mots-clés pour femmes
-    femme_keywords = ['femme', 'woman', 'women', 'ladies', 'dame', 'dames', 'féminin', 'feminine', 
-                     'rose', 'pink', 'diamant', 'diamond', 'perle', 'pearl', 'délicat', 'delicate']
-    
-    # Mots-clés pour hommes
-    homme_keywords = ['homme', 'man', 'men', 'gentleman', 'herren', 'masculin', 'masculine',
-                     'sport', 'diver', 'plongée', 'aviation', 'pilot', 'militar']
-    
-    femme_score = sum(1 for keyword in femme_keywords if keyword in text)
-    homme_score = sum(1 for keyword in homme_keywords if keyword in text)
-    
-    if femme_score > homme_score:
-        return 'femme'
-    elif homme_score > femme_score:
-        return 'homme'
-    else:
-        # Par défaut, on met dans accessoires génériques
-        return 'unisex'
+        return None
 
 def scrape_products():
     """Scrape les produits depuis le site"""
@@ -94,17 +86,17 @@ def scrape_products():
         for api_url in api_urls:
             try:
                 print(f"  Tentative API: {api_url}")
-                response = requests.get(api_url, headers=headers, timeout=30)
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'products' in data:
-                        print(f"  ✓ {len(data['products'])} produits trouvés via API")
-                        for product_data in data['products']:
+                api_products = fetch_all_products(api_url, headers=headers)
+                if api_products is not None:
+                    print(f"  ✓ {len(api_products)} produits trouvés via API")
+                    with import_metrics.timer('map', import_metrics.host_of(api_url)):
+                        for product_data in api_products:
                             product = parse_shopify_product(product_data)
                             if product:
                                 products.append(product)
-                        return products
-            except:
+                    return products
+            except Exception as e:
+                print(f"  ✗ Erreur API: {e}")
                 continue
         
         # Si l'API ne fonctionne pas, essayer le scraping HTML
@@ -119,7 +111,7 @@ def scrape_products():
         for url in urls_to_try:
             try:
                 print(f"  Tentative HTML: {url}")
-                response = requests.get(url, headers=headers, timeout=30)
+                response = http_client.get(url, headers=headers, timeout=30)
                 response.raise_for_status()
                 html_content = response.text
                 print(f"  ✓ Page récupérée: {url}")
@@ -132,102 +124,17 @@ def scrape_products():
             print("❌ Impossible d'accéder au site. Vérifiez l'URL et votre connexion.")
             return products
         
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Chercher les produits - différentes structures possibles
-        product_elements = soup.find_all(['div', 'article', 'li'], class_=re.compile(r'product|item|card', re.I))
-        
-        if not product_elements:
-            # Essayer de trouver des liens produits
-            product_links = soup.find_all('a', href=re.compile(r'/product', re.I))
-            print(f"  Trouvé {len(product_links)} liens produits potentiels")
-            
-            # Chercher aussi dans les scripts JSON pour les données produits
-            scripts = soup.find_all('script', type='application/json')
-            for script in scripts:
-                try:
-                    data = json.loads(script.string)
-                    # Chercher des produits dans les données JSON
-                    if isinstance(data, dict):
-                        if 'products' in data:
-                            for prod in data['products']:
-                                product = parse_shopify_product(prod)
-                                if product:
-                                    products.append(product)
-                        # Chercher dans les collections
-                        for key in data.keys():
-                            if 'product' in key.lower() and isinstance(data[key], list):
-                                for prod in data[key]:
-                                    product = parse_shopify_product(prod)
-                                    if product:
-                                        products.append(product)
-                except:
-                    pass
-            
-            seen_urls = set()
-            for link in product_links:
-                href = link.get('href', '')
-                if not href or href in seen_urls:
-                    continue
-                # Nettoyer l'URL
-                if href.startswith('/'):
-                    href = href
-                elif not href.startswith('http'):
-                    continue
-                
-                seen_urls.add(href)
-                product_url = urljoin(SOURCE_SITE, href)
-                if '/product' in product_url.lower():
-                    product = scrape_product_page(product_url)
-                    if product and is_valid_product(product.get('name', ''), product_url):
-                        products.append(product)
-                        print(f"  ✓ Produit ajouté: {product.get('name', '')[:50]}")
-                        time.sleep(0.5)  # Pause réduite
-                    if len(products) >= 500:  # Augmenter la limite
-                        break
-            
-            # Essayer de paginer si possible
-            if len(products) < 50:
-                # Chercher des liens de pagination
-                pagination_links = soup.find_all('a', href=re.compile(r'page|p=\d+', re.I))
-                for page_link in pagination_links[:5]:  # Limiter à 5 pages
-                    try:
-                        page_url = urljoin(SOURCE_SITE, page_link.get('href', ''))
-                        print(f"  Scraping page suivante: {page_url}")
-                        page_response = requests.get(page_url, headers=headers, timeout=30)
-                        if page_response.status_code == 200:
-                            page_soup = BeautifulSoup(page_response.text, 'html.parser')
-                            page_product_links = page_soup.find_all('a', href=re.compile(r'/product', re.I))
-                            for link in page_product_links:
-                                href = link.get('href', '')
-                                if href not in seen_urls:
-                                    seen_urls.add(href)
-                                    product_url = urljoin(SOURCE_SITE, href)
-                                    if '/product' in product_url.lower():
-                                        product = scrape_product_page(product_url)
-                                        if product and is_valid_product(product.get('name', ''), product_url):
-                                            products.append(product)
-                                            time.sleep(0.5)
-                                        if len(products) >= 500:
-                                            break
-                        time.sleep(1)
-                    except:
-                        continue
-        else:
-            print(f"  Trouvé {len(product_elements)} éléments produits")
-            seen_urls = set()
-            for element in product_elements:
-                product = extract_product_from_element(element)
-                if product:
-                    # Éviter les doublons
-                    product_url = product.get('url', '')
-                    if product_url and product_url in seen_urls:
-                        continue
-                    if product_url:
-                        seen_urls.add(product_url)
-                    products.append(product)
-                    if len(products) >= 500:  # Augmenter la limite
-                        break
+        # Crawl concurrent à partir de la page récupérée (débit limité par hôte)
+        frontier = CrawlFrontier(
+            crawl_page,
+            headers=headers,
+            max_depth=CRAWL_MAX_DEPTH,
+            max_pages=CRAWL_MAX_PAGES,
+            max_results=MAX_SCRAPED_PRODUCTS,
+            time_budget=CRAWL_TIME_BUDGET,
+        )
+        frontier.process_page(url, html_content, kind='listing')
+        products.extend(frontier.run())
         
     except Exception as e:
         print(f"❌ Erreur lors du scraping: {e}")
@@ -251,8 +158,7 @@ def parse_shopify_product(product_data):
         description = product_data.get('body_html', '')
         # Nettoyer le HTML
         if description:
-            soup = BeautifulSoup(description, 'html.parser')
-            description = soup.get_text(strip=True)
+            description = html_parser.html_to_text(description)
         
         # Images (récupérer toutes les images, pas seulement la première)
         images = product_data.get('images', [])
@@ -274,7 +180,7 @@ def parse_shopify_product(product_data):
         
         # Tags pour déterminer le genre
         tags = product_data.get('tags', '')
-        gender = determine_gender(description + " " + tags, name)
+        gender = CLASSIFIER.gender(f"{description} {tags} {name}")
         
         return {
             'name': name,
@@ -291,22 +197,9 @@ def parse_shopify_product(product_data):
 
 def is_valid_product(name, url):
     """Vérifie si c'est un vrai produit (pas un élément de navigation)"""
-    if not name or len(name.strip()) < 3:
+    if PRODUCT_FILTER.name_rejection(name) is not None:
         return False
     
-    # Exclure les éléments de navigation
-    excluded_keywords = [
-        'acceuil', 'accueil', 'boutique', 'contact', 'blog', 'à propos', 'a propos',
-        'information', 'emplacement', 'apprenez', 'notre', 'nous', 'connaître',
-        'panier', 'loading', 'done', 'ajouter', 'produit en vente', '%',
-        '📞', 'phone', 'téléphone', 'tel:', 'mailto:', 'facebook', 'instagram'
-    ]
-    
-    name_lower = name.lower()
-    for keyword in excluded_keywords:
-        if keyword in name_lower:
-            return False
-    
     # Vérifier que l'URL est une vraie page produit
     if url and '/product' in url.lower():
         return True
@@ -317,8 +210,81 @@ def is_valid_product(name, url):
     
     return False
 
-def extract_product_from_element(element):
-    """Extrait les informations d'un produit depuis un élément HTML"""
+def crawl_page(item, html, enqueue):
+    """
+    Handler de la frontière de crawl: retourne les produits trouvés sur une page
+    et ajoute à la frontière les pages produits et les pages suivantes du listing
+    """
+    if item['kind'] == 'product':
+        product = parse_product_page(html, item['url'])
+        if product and is_valid_product(product.get('name', ''), item['url']):
+            print(f"  ✓ Produit ajouté: {product.get('name', '')[:50]}")
+            return [product]
+        return []
+    
+    products = []
+    soup = html_parser.parse(html)
+    
+    # Chercher les produits - différentes structures possibles
+    product_elements = soup.find_all(['div', 'article', 'li'], class_=re.compile(r'product|item|card', re.I))
+    
+    if product_elements:
+        print(f"  Trouvé {len(product_elements)} éléments produits")
+        for element in product_elements:
+            product = extract_product_from_element(element, enqueue)
+            if product:
+                products.append(product)
+    else:
+        # Essayer de trouver des liens produits
+        product_links = soup.find_all('a', href=re.compile(r'/product', re.I))
+        print(f"  Trouvé {len(product_links)} liens produits potentiels")
+        
+        # Chercher aussi dans les scripts JSON pour les données produits
+        scripts = soup.find_all('script', type='application/json')
+        for script in scripts:
+            try:
+                data = json.loads(script.string)
+                # Chercher des produits dans les données JSON
+                if isinstance(data, dict):
+                    if 'products' in data:
+                        for prod in data['products']:
+                            product = parse_shopify_product(prod)
+                            if product:
+                                products.append(product)
+                    # Chercher dans les collections
+                    for key in data.keys():
+                        if 'product' in key.lower() and isinstance(data[key], list):
+                            for prod in data[key]:
+                                product = parse_shopify_product(prod)
+                                if product:
+                                    products.append(product)
+            except:
+                pass
+        
+        for link in product_links:
+            href = link.get('href', '')
+            # Ignorer les liens relatifs non absolus (ancres, javascript:, etc.)
+            if not href or not (href.startswith('/') or href.startswith('http')):
+                continue
+            product_url = urljoin(SOURCE_SITE, href)
+            if '/product' in product_url.lower():
+                enqueue(product_url, 'product')
+    
+    # Pages suivantes du listing
+    pagination_links = soup.find_all('a', href=re.compile(r'page|p=\d+', re.I))
+    for page_link in pagination_links[:CRAWL_PAGINATION_LINKS]:
+        href = page_link.get('href', '')
+        if href:
+            enqueue(urljoin(SOURCE_SITE, href), 'listing')
+    
+    return products
+
+def extract_product_from_element(element, enqueue=None):
+    """
+    Extrait les informations d'un produit depuis un élément HTML.
+    Si l'élément pointe vers une page produit et qu'une fonction enqueue est fournie,
+    la page est confiée à la frontière de crawl et None est retourné.
+    """
     try:
         # Chercher le nom
         name_elem = element.find(['h2', 'h3', 'h4', 'a'], class_=re.compile(r'title|name|product', re.I))
@@ -340,6 +306,9 @@ def extract_product_from_element(element):
         
         # Si on a une URL produit, scraper la page complète
         if product_url:
+            if enqueue is not None:
+                enqueue(product_url, 'product')
+                return None
             return scrape_product_page(product_url)
         
         # Sinon, essayer d'extraire depuis l'élément
@@ -373,9 +342,41 @@ def scrape_product_page(url):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_client.get(url, headers=headers, timeout=30)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+    except Exception as e:
+        print(f"  Erreur scraping page {url}: {e}")
+        return None
+    return parse_product_page(response.text, url)
+
+def parse_product_page(html, url):
+    """
+    Extrait un produit depuis le HTML d'une page produit: données structurées
+    (JSON Shopify, JSON-LD, OpenGraph) d'abord, analyse heuristique du DOM sinon
+    """
+    structured = structured_data.extract_product(html, url)
+    if structured_data.is_complete(structured):
+        structured_data.record(structured['source'])
+        image_urls = [src for src in structured['image_urls']
+                      if not any(x in src.lower() for x in ['logo', 'icon', 'avatar', 'placeholder'])][:5]
+        return {
+            'name': structured['name'],
+            'price': int(structured['price']),
+            'image_url': image_urls[0] if image_urls else None,
+            'image_urls': image_urls,
+            'url': url,
+            'description': structured['description']
+        }
+    
+    product = parse_product_page_dom(html, url)
+    structured_data.record('heuristic' if product else 'miss')
+    return product
+
+def parse_product_page_dom(html, url):
+    """Extrait un produit du DOM d'une page produit à partir des classes CSS usuelles"""
+    try:
+        # Seuls les nœuds interrogés ci-dessous sont construits
+        soup = html_parser.parse_product_page(html)
         
         # Extraire le nom - chercher dans plusieurs endroits
         name = None
@@ -397,9 +398,9 @@ def scrape_product_page(url):
             price_text = price_elem.get_text(strip=True)
             price = extract_price(price_text)
         
-        # Si pas de prix trouvé, chercher dans le texte de la page
+        # Si pas de prix trouvé, chercher dans le texte de la page entière
         if price == 0:
-            price_matches = re.findall(r'(\d+[.,]?\d*)\s*€', soup.get_text())
+            price_matches = re.findall(r'(\d+[.,]?\d*)\s*€', html_parser.page_text(html))
             if price_matches:
                 try:
                     price = int(float(price_matches[0].replace(',', '.')))
@@ -483,21 +484,24 @@ def create_product_entry(watch_data, index, gender=None):
     if 'gender' in watch_data:
         gender = watch_data['gender']
     elif not gender:
-        gender = determine_gender(watch_data.get('description', ''), name)
+        gender = CLASSIFIER.gender(f"{watch_data.get('description', '')} {name}")
     
     # Déterminer la catégorie et sous-catégorie
     if gender == 'femme':
         category = 'womens-clothing'
         subcategory = 'accessoires-femme'
-        product_id = f'accessoires-femme-{index+1:03d}'
+        id_prefix = 'accessoires-femme'
     elif gender == 'homme':
         category = 'mens-clothing'
         subcategory = 'accessoires-homme'
-        product_id = f'accessoires-homme-{index+1:03d}'
+        id_prefix = 'accessoires-homme'
     else:
         category = 'accessories'
         subcategory = None
-        product_id = f'accessoires-{index+1:03d}'
+        id_prefix = 'accessoires'
+    
+    # ID persistant: la même montre (URL source ou slug) garde le même ID d'une importation à l'autre
+    product_id = allocate_id(id_prefix, watch_data.get('url') or slug)
     
     # Générer les noms multilingues (basique - à améliorer)
     name_fr = name
@@ -534,7 +538,8 @@ def create_product_entry(watch_data, index, gender=None):
         'subcategory': subcategory,
         'images': image_ids,  # Sera mis à jour après téléchargement
         'sizes': None,  # Les montres n'ont généralement pas de tailles
-        'colors': None
+        'colors': None,
+        'sourceUrl': watch_data.get('url')  # Clé de mise à jour lors d'une nouvelle importation
     }
     
     return product, image_ids, image_urls
@@ -542,55 +547,57 @@ def create_product_entry(watch_data, index, gender=None):
 def main():
     print("🚀 Début de l'importation des montres depuis temps-et-merveilles.fr\n")
     
+    # Métriques par étape (résumé JSON en fin d'importation, --live pour l'avancement)
+    metrics = open_metrics('import_watches_from_temps_merveilles', sys.argv)
+    
+    # Cache HTTP disque (--no-cache pour le désactiver, --cache-only pour rejouer hors-ligne)
+    if '--no-cache' not in sys.argv:
+        http_client.get_client().cache = HttpCache(offline='--cache-only' in sys.argv)
+    
     # Vérifier le nombre actuel
     MAX_TOTAL_PRODUCTS = 1100
-    try:
-        with open(NEW_PRODUCTS_FILE, 'r', encoding='utf-8') as f:
-            existing_products = json.load(f)
-        current_count = len(existing_products)
-        remaining = MAX_TOTAL_PRODUCTS - current_count
-        print(f"📊 Produits actuels: {current_count}")
-        print(f"📊 Produits restants: {remaining}")
-        print(f"📊 Limite maximale: {MAX_TOTAL_PRODUCTS}\n")
-        
-        if remaining <= 0:
-            print("⚠️  Limite de 1100 produits atteinte!")
-            return
-    except:
-        existing_products = []
-        current_count = 0
-        remaining = MAX_TOTAL_PRODUCTS
-    
-    # Scraper les produits
-    watches = scrape_products()
+    catalog = open_catalog(sys.argv)
+    current_count = catalog.count()
+    remaining = MAX_TOTAL_PRODUCTS - current_count
+    print(f"📊 Produits actuels: {current_count}")
+    print(f"📊 Produits restants: {remaining}")
+    print(f"📊 Limite maximale: {MAX_TOTAL_PRODUCTS}\n")
+    
+    if remaining <= 0:
+        print("⚠️  Limite de 1100 produits atteinte: seuls les produits existants seront mis à jour.\n")
+        remaining = 0
+    
+    # Journal de reprise (--resume pour reprendre une importation interrompue)
+    journal = open_journal('import_watches_from_temps_merveilles', sys.argv)
+    if journal is None:
+        return
+    
+    # Scraper les produits (ou les relire depuis le journal)
+    watches = journal.scraped
+    if watches is None:
+        watches = scrape_products()
+        journal.record_scraped(watches)
     
     if not watches:
         print("\n❌ Aucun produit trouvé. Vérifiez l'URL et la structure du site.")
+        journal.clear()
         return
     
     print(f"\n✓ {len(watches)} produits trouvés")
     
-    # Limiter le nombre selon la limite restante
-    watches = watches[:remaining]
-    print(f"📊 Limitation à {len(watches)} produits pour respecter la limite de {MAX_TOTAL_PRODUCTS}\n")
+    # Index des produits existants (mise à jour plutôt que doublon)
+    upsert_index = UpsertIndex(catalog)
+    over_limit = 0
+    print(f"📊 Au plus {remaining} nouveaux produits (limite de {MAX_TOTAL_PRODUCTS}), "
+          f"les produits déjà importés sont mis à jour\n")
     
-    # Charger les fichiers existants
-    try:
-        with open(NEW_PRODUCTS_FILE, 'r', encoding='utf-8') as f:
-            existing_products = json.load(f)
-    except:
-        existing_products = []
-    
-    try:
-        with open(PLACEHOLDER_IMAGES_FILE, 'r', encoding='utf-8') as f:
-            placeholder_data = json.load(f)
-            placeholder_images = placeholder_data.get('placeholderImages', [])
-    except:
-        placeholder_images = []
+    # Charger les images existantes (index par ID)
+    placeholder_images = PlaceholderImages()
     
     # Traiter chaque montre
     new_products = []
     new_images = []
+    image_jobs = []
     
     for i, watch in enumerate(watches):
         print(f"\n[{i+1}/{len(watches)}] Traitement: {watch.get('name', 'Montre')}")
@@ -598,17 +605,29 @@ def main():
         # Le genre peut déjà être dans watch_data si venant de Shopify
         gender = watch.get('gender')
         if not gender:
-            gender = determine_gender(watch.get('description', ''), watch.get('name', ''))
+            gender = CLASSIFIER.gender(f"{watch.get('description', '')} {watch.get('name', '')}")
         print(f"  Genre détecté: {gender}")
         
-        # Créer l'entrée produit
-        product, image_ids, image_urls = create_product_entry(watch, i, gender)
+        # Créer l'entrée produit (réutiliser celle du journal en cas de reprise)
+        with metrics.timer('map'):
+            product, image_ids, image_urls = create_product_entry(watch, i, gender)
+        if i in journal.products:
+            product = journal.products[i]
+        else:
+            journal.record_product(i, product)
+        
+        # Un produit déjà au catalogue est mis à jour sans compter dans la limite
+        if upsert_index.find(product) is None and upsert_index.insert_count >= remaining:
+            print("  ⚠ Limite atteinte, produit ignoré")
+            over_limit += 1
+            continue
+        upsert_index.stage(product)
         
         # Télécharger les images (toutes les images disponibles)
         if not image_urls and watch.get('image_url'):
             image_urls = [watch.get('image_url')]
         
-        downloaded_image_ids = []
+        # Planifier les téléchargements (toutes les images disponibles)
         if image_urls:
             for j, img_url in enumerate(image_urls[:3]):  # Max 3 images par produit
                 if j < len(image_ids):
@@ -617,49 +636,72 @@ def main():
                     img_id = f"{image_ids[0]}_{j+1}"
                 
                 image_filename = f"{img_id}.jpg"
-                image_path = os.path.join(PRODUCTS_DIR, image_filename)
-                image_relative_path = f"/images/products/{image_filename}"
-                
-                if download_image(img_url, image_path):
-                    # Ajouter à placeholder_images
-                    new_images.append({
+                image_jobs.append({
+                    'url': img_url,
+                    'filepath': os.path.join(PRODUCTS_DIR, image_filename),
+                    'index': j,
+                    'product_index': len(new_products),
+                    'entry': {
                         'id': img_id,
                         'description': product['name_fr'],
-                        'imageUrl': image_relative_path,
+                        'imageUrl': f"/images/products/{image_filename}",
                         'imageHint': 'watch'
-                    })
-                    downloaded_image_ids.append(img_id)
-                    print(f"  ✓ Image {j+1} téléchargée: {img_id}")
-                else:
-                    print(f"  ⚠ Image {j+1} non téléchargée")
-        
-        # Mettre à jour la liste d'images du produit avec seulement celles téléchargées
-        if downloaded_image_ids:
-            product['images'] = downloaded_image_ids
-        else:
-            print(f"  ⚠ Aucune image téléchargée pour ce produit")
+                    }
+                })
         
         new_products.append(product)
     
-    # Fusionner avec les produits existants
-    all_products = existing_products + new_products
-    
-    # Sauvegarder
-    print(f"\n💾 Sauvegarde de {len(new_products)} nouveaux produits...")
-    with open(NEW_PRODUCTS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(all_products, f, ensure_ascii=False, indent=2)
-    print(f"✓ {NEW_PRODUCTS_FILE} mis à jour")
-    
-    # Fusionner les images
-    all_images = placeholder_images + new_images
+    if over_limit:
+        print(f"\n⚠️  {over_limit} nouveaux produits ignorés (limite de {MAX_TOTAL_PRODUCTS} produits)")
+    
+    # Télécharger les images en parallèle (résultats dans l'ordre des produits)
+    print(f"\n📥 Téléchargement de {len(image_jobs)} images...")
+    downloaded_image_ids = {}
+    for job, image_url in download_all(image_jobs, journal.wrap_download(download_image)):
+        img_id = job['entry']['id']
+        if image_url:
+            # Ajouter à placeholder_images (chemin de l'image existante si contenu déjà stocké)
+            job['entry']['imageUrl'] = image_url
+            new_images.append(job['entry'])
+            downloaded_image_ids.setdefault(job['product_index'], []).append(img_id)
+            print(f"  ✓ Image {job['index']+1} téléchargée: {img_id}")
+        else:
+            print(f"  ⚠ Image {job['index']+1} non téléchargée: {img_id}")
     
+    # Mettre à jour la liste d'images des produits avec seulement celles téléchargées
+    for index, product in enumerate(new_products):
+        if index in downloaded_image_ids:
+            product['images'] = downloaded_image_ids[index]
+        else:
+            print(f"  ⚠ Aucune image téléchargée pour {product['name_fr'][:50]}")
+    
+    # Ajouter ou mettre à jour dans le catalogue et sauvegarder
+    print(f"\n💾 Sauvegarde du catalogue...")
+    counts = upsert_index.apply()
+    print_counts(counts)
+    if catalog.export_json() is not None:
+        print(f"✓ {catalog.json_path} mis à jour")
+    if '--ts' in sys.argv:
+        # Module TypeScript du catalogue, via le sérialiseur partagé
+        count = write_products_ts(catalog, NEW_PRODUCTS_TS_FILE)
+        print(f"✓ {NEW_PRODUCTS_TS_FILE} mis à jour ({count} produits)")
+    catalog.close()
+    
+    # Fusionner les images (une entrée par ID)
+    placeholder_images.add_many(new_images)
     print(f"\n💾 Sauvegarde de {len(new_images)} nouvelles images...")
-    with open(PLACEHOLDER_IMAGES_FILE, 'w', encoding='utf-8') as f:
-        json.dump({'placeholderImages': all_images}, f, ensure_ascii=False, indent=2)
-    print(f"✓ {PLACEHOLDER_IMAGES_FILE} mis à jour")
+    if placeholder_images.save():
+        print(f"✓ {PLACEHOLDER_IMAGES_FILE} et {PLACEHOLDER_IMAGE_MAP_FILE} mis à jour")
+    journal.clear()
+    image_store.get_store().save()
+    
+    http_client.get_client().print_stats()
+    image_store.get_store().print_stats()
+    structured_data.print_stats()
+    metrics.close()
     
     print(f"\n✅ Importation terminée!")
-    print(f"   - {len(new_products)} produits ajoutés")
+    print(f"   - {counts['inserted']} produits ajoutés, {counts['updated']} mis à jour")
     print(f"   - {len(new_images)} images téléchargées")
 
 if __name__ == '__main__':
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lecture en streaming des exports JSON de produits
+Produit les éléments d'un tableau JSON un par un, que le tableau soit au premier niveau
+du fichier ou sous une clé d'un objet ({"products": [...]}); seul l'élément en cours de
+lecture est gardé en mémoire, et la lecture s'arrête dès que l'appelant n'en demande plus.
+"""
+
+import json
+
+# Configuration
+CHUNK_SIZE = 64 * 1024
+TEXT_CHUNK_SIZE = 1024 * 1024
+
+WHITESPACE = ' \t\n\r'
+NUMBER_END = WHITESPACE + ',]}'
+
+# Tableau d'objets écrit avec indent=2 (json.dump(..., indent=2), product_serializer.ProductWriter)
+INDENTED_ARRAY_START = '[\n  {'
+INDENTED_ITEM_SEPARATOR = ',\n  {'
+
+
+class _Reader:
+    """Tampon de lecture sur un fichier texte, complété par morceaux à la demande"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Lit un morceau de plus; retourne False en fin de fichier"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Les caractères déjà consommés sont libérés
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Prochain caractère significatif (espaces sautés), '' en fin de fichier"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"JSON invalide: '{chars}' attendu, '{char}' trouvé")
+        self.pos += 1
+        return char
+
+    def value(self, decoder):
+        """Décode la prochaine valeur JSON complète, en lisant autant de morceaux que nécessaire"""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # Un nombre coupé en fin de morceau ('1234' puis '.5') se poursuit dans le suivant:
+            # il n'est complet que suivi d'un délimiteur
+            incomplete = end == len(self.buffer) or (
+                isinstance(value, (int, float)) and self.buffer[end] not in NUMBER_END)
+            if incomplete and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(f, key='products', chunk_size=CHUNK_SIZE):
+    """
+    Produit un à un les éléments du tableau JSON lu dans le fichier f: tableau de premier
+    niveau, ou tableau sous la clé `key` d'un objet de premier niveau.
+    Lève ValueError si le fichier ne contient pas un tel tableau.
+    """
+    reader = _Reader(f, chunk_size)
+    decoder = json.JSONDecoder()
+
+    start = reader.expect('[{')
+    if start == '{':
+        # Parcourir les clés de l'objet jusqu'à `key`, en sautant les autres valeurs
+        while True:
+            if reader.peek() == '}':
+                raise ValueError(f"Le fichier JSON doit contenir un tableau de produits (clé '{key}' absente)")
+            name = reader.value(decoder)
+            reader.expect(':')
+            if name == key:
+                reader.expect('[')
+                break
+            reader.value(decoder)
+            reader.expect(',}')
+            if reader.buffer[reader.pos - 1] == '}':
+                raise ValueError(f"Le fichier JSON doit contenir un tableau de produits (clé '{key}' absente)")
+
+    if reader.peek() == ']':
+        return
+    while True:
+        yield reader.value(decoder)
+        if reader.expect(',]') == ']':
+            return
+
+
+def indented_array_texts(f, chunk_size=TEXT_CHUNK_SIZE):
+    """
+    Textes JSON, non décodés, des éléments d'un tableau d'objets écrit avec indent=2, comme
+    new_products.json: dans ce format, et seulement au premier niveau, un élément commence
+    par ',\n  {' (les retours à la ligne des chaînes sont échappés). Le découpage ne décode
+    rien; chaque texte est décodé par l'appelant, par exemple dans un autre processus.
+    Retourne None si le fichier n'a pas cette forme, après l'avoir remis au début (pour
+    iter_json_array).
+    """
+    head = f.read(len(INDENTED_ARRAY_START))
+    if head.startswith('[]'):
+        return iter(())
+    if head != INDENTED_ARRAY_START:
+        f.seek(0)
+        return None
+    return _indented_texts(f, chunk_size)
+
+
+def _indented_texts(f, chunk_size):
+    tail = ''
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        parts = (tail + chunk).split(INDENTED_ITEM_SEPARATOR)
+        tail = parts.pop()
+        for part in parts:
+            yield '{' + part
+    tail = tail.rstrip(WHITESPACE)
+    if not tail.endswith(']'):
+        raise ValueError("JSON invalide: ']' attendu en fin de tableau")
+    yield '{' + tail[:-1]
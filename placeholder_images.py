@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Index des images produits (src/lib/placeholder-images.json) indexé par ID
+Les entrées sont dédoublonnées par ID (la plus récente l'emporte, à la position de la première).
+À chaque sauvegarde, un objet JSON ID -> entrée est aussi écrit pour le frontend
+(src/lib/placeholder-image-map.json): image-utils.ts y résout une image en O(1).
+
+Usage: python3 placeholder_images.py   (dédoublonne le fichier et régénère l'objet ID -> entrée)
+"""
+
+import json
+import os
+
+# Configuration
+PLACEHOLDER_IMAGES_FILE = "src/lib/placeholder-images.json"
+PLACEHOLDER_IMAGE_MAP_FILE = "src/lib/placeholder-image-map.json"
+
+
+def _write_json(data, path):
+    """Écrit un fichier JSON (indent=2) puis remplace path atomiquement"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class PlaceholderImages:
+    """
+    Entrées {'id', 'description', 'imageUrl', 'imageHint'} indexées par ID, dans l'ordre
+    du fichier. Les doublons d'un fichier existant sont fusionnés au chargement.
+    """
+
+    def __init__(self, path=PLACEHOLDER_IMAGES_FILE, map_path=PLACEHOLDER_IMAGE_MAP_FILE):
+        self.path = path
+        self.map_path = map_path
+        self.images = {}          # id -> entrée (ordre d'insertion conservé)
+        self.duplicates = 0       # Doublons fusionnés au chargement
+        self.changed = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('placeholderImages', [])
+        except (OSError, ValueError):
+            entries = []
+        for entry in entries:
+            if entry.get('id') in self.images:
+                self.duplicates += 1
+            self.images[entry.get('id')] = entry
+        if self.duplicates:
+            self.changed = True
+
+    def __contains__(self, image_id):
+        return image_id in self.images
+
+    def __len__(self):
+        return len(self.images)
+
+    def __iter__(self):
+        return iter(self.images.values())
+
+    def get(self, image_id):
+        return self.images.get(image_id)
+
+    def add(self, entry):
+        """Ajoute une entrée, ou remplace celle de même ID"""
+        if self.images.get(entry['id']) != entry:
+            self.images[entry['id']] = entry
+            self.changed = True
+
+    def add_many(self, entries):
+        for entry in entries:
+            self.add(entry)
+
+    def retain(self, image_ids):
+        """Ne garde que les entrées dont l'ID est dans image_ids; retourne le nombre supprimé"""
+        removed = [image_id for image_id in self.images if image_id not in image_ids]
+        for image_id in removed:
+            del self.images[image_id]
+        if removed:
+            self.changed = True
+        return len(removed)
+
+    def save(self, force=False):
+        """
+        Écrit le fichier dédoublonné et l'objet ID -> entrée du frontend s'ils ont changé
+        (ou si l'objet n'existe pas encore). Retourne True si les fichiers ont été écrits.
+        """
+        if not (force or self.changed or not os.path.exists(self.map_path)):
+            return False
+        _write_json({'placeholderImages': list(self.images.values())}, self.path)
+        _write_json(self.images, self.map_path)
+        self.changed = False
+        return True
+
+
+def main():
+    images = PlaceholderImages()
+    images.save(force=True)
+    print(f"💾 {len(images)} images dans {PLACEHOLDER_IMAGES_FILE} "
+          f"({images.duplicates} doublons supprimés), {PLACEHOLDER_IMAGE_MAP_FILE} régénéré")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Classement des produits importés: catégorie, sous-catégorie et genre en une passe
+Le texte est découpé une fois en mots, puis chaque mot est cherché dans des index construits au
+chargement (mot -> catégorie, mot -> sous-catégorie, mot -> genre). Les mots entiers sont
+comparés, pas des sous-chaînes: 'men' ne correspond plus à 'women', ni 'top' à 'stop'.
+Mots du texte et mots-clés sont réduits à leur radical (stem: 's'/'x' puis 'e' final retirés)
+avant comparaison: 'femmes', 'manteaux', 'féminine' ou 'diamants' correspondent aux mots-clés
+'femme', 'manteau', 'féminin' et 'diamant'.
+Précédence déterministe: pour la catégorie, le mot-clé le plus tôt dans CATEGORY_KEYWORDS
+l'emporte, quel que soit son rang dans le texte; le genre ajuste ensuite homme/femme.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Configuration
+DEFAULT_CATEGORY = 'accessories'
+
+# Catégories du site et leurs mots-clés, par ordre de précédence
+CATEGORY_KEYWORDS = (
+    ('mens-clothing', ('homme', 'hommes', 'men', 'mens', 'menswear', 'chemise', 'chemises', 'shirt',
+                       'shirts', 'pantalon', 'pantalons', 'trousers', 'veste', 'vestes', 'jacket',
+                       'jackets', 'pull', 'pulls', 'pullover', 'sweater', 'sweaters')),
+    ('womens-clothing', ('femme', 'femmes', 'women', 'womens', 'womenswear', 'robe', 'robes', 'dress',
+                         'dresses', 'top', 'tops', 'jupe', 'jupes', 'skirt', 'skirts')),
+    ('accessories', ('accessoire', 'accessoires', 'accessory', 'accessories', 'montre', 'montres',
+                     'watch', 'watches', 'sac', 'sacs', 'bag', 'bags')),
+    ('shoes', ('chaussure', 'chaussures', 'shoe', 'shoes', 'bottine', 'bottines', 'boot', 'boots')),
+    ('sport', ('sport', 'sports', 'sportswear', 'sportif', 'sportive')),
+    ('winter-clothing', ('hiver', 'winter', 'doudoune', 'parka', 'manteau')),
+)
+
+# Sous-catégories par catégorie (homme/femme), par ordre de précédence
+SUBCATEGORY_KEYWORDS = {
+    'mens-clothing': (
+        ('chemises-homme', ('chemise', 'chemises', 'shirt', 'shirts')),
+        ('pantalons-homme', ('pantalon', 'pantalons', 'trousers')),
+        ('vestes-homme', ('veste', 'vestes', 'jacket', 'jackets')),
+        ('pulls-homme', ('pull', 'pulls', 'pullover', 'sweater', 'sweaters')),
+        ('accessoires-homme', ('accessoire', 'accessoires')),
+    ),
+    'womens-clothing': (
+        ('robes-femme', ('robe', 'robes', 'dress', 'dresses')),
+        ('tops-femme', ('top', 'tops')),
+        ('pantalons-femme', ('pantalon', 'pantalons', 'trousers')),
+        ('jupes-femme', ('jupe', 'jupes', 'skirt', 'skirts')),
+        ('vestes-femme', ('veste', 'vestes', 'jacket', 'jackets')),
+        ('accessoires-femme', ('accessoire', 'accessoires')),
+    ),
+}
+
+GENDER_KEYWORDS = {
+    'femme': ('femme', 'woman', 'women', 'womens', 'womenswear', 'ladies', 'lady', 'dame', 'dames',
+              'féminin', 'feminine'),
+    'homme': ('homme', 'man', 'men', 'mens', 'menswear', 'gentleman', 'gentlemen', 'herren', 'masculin',
+              'masculine'),
+}
+
+# Indices supplémentaires propres aux montres
+WATCH_GENDER_KEYWORDS = {
+    'femme': ('rose', 'pink', 'diamant', 'diamond', 'perle', 'pearl', 'délicat', 'delicate'),
+    'homme': ('sport', 'sportswear', 'sportif', 'diver', 'plongée', 'aviation', 'pilot', 'militar', 'militaire', 'military'),
+}
+
+WORD_RE = re.compile(r"[^\W\d_]+")
+
+Classification = namedtuple('Classification', 'category subcategory gender')
+
+
+def stem(word):
+    """Radical d'un mot en minuscules: pluriel ('s', 'x') puis 'e' final retirés"""
+    if len(word) > 3 and word[-1] in 'sx':
+        word = word[:-1]
+    if len(word) > 3 and word[-1] == 'e':
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Ensemble des radicaux des mots (lettres seulement, en minuscules) d'un texte"""
+    return frozenset(map(stem, WORD_RE.findall(text.lower()))) if text else frozenset()
+
+
+def _ranked_index(groups):
+    """Index mot -> (rang, valeur) d'une suite de (valeur, mots-clés); le premier rang l'emporte"""
+    index = {}
+    for value, keywords in groups:
+        for keyword in keywords:
+            index.setdefault(stem(keyword), (len(index), value))
+    return index
+
+
+def _best(index, tokens):
+    """Valeur du mot-clé de plus haut rang parmi les mots, None si aucun"""
+    hits = [index[token] for token in tokens if token in index]
+    return min(hits)[1] if hits else None
+
+
+class ProductClassifier:
+    """Index de mots-clés partagés; classify() retourne catégorie, sous-catégorie et genre"""
+
+    def __init__(self, category_keywords=CATEGORY_KEYWORDS, subcategory_keywords=SUBCATEGORY_KEYWORDS,
+                 gender_keywords=GENDER_KEYWORDS, extra_gender_keywords=None, default_category=DEFAULT_CATEGORY):
+        self.default_category = default_category
+        self.categories = _ranked_index(category_keywords)
+        self.subcategories = {category: _ranked_index(groups) for category, groups in subcategory_keywords.items()}
+        self.genders = {}            # mot -> genres signalés par ce mot
+        for keywords in (gender_keywords, extra_gender_keywords or {}):
+            for gender, words in keywords.items():
+                for word in words:
+                    self.genders.setdefault(stem(word), set()).add(gender)
+        # Les types et collections se répètent d'un produit à l'autre
+        self._category_tokens = lru_cache(maxsize=4096)(tokenize)
+
+    def gender(self, text='', tokens=None):
+        """'femme', 'homme' ou 'unisex' selon le nombre de mots-clés distincts de chaque genre"""
+        tokens = tokenize(text) if tokens is None else tokens
+        scores = {'femme': 0, 'homme': 0}
+        for token in tokens:
+            for gender in self.genders.get(token, ()):
+                scores[gender] += 1
+        if scores['femme'] > scores['homme']:
+            return 'femme'
+        if scores['homme'] > scores['femme']:
+            return 'homme'
+        return 'unisex'
+
+    def classify(self, category_text='', subcategory_text='', text=''):
+        """
+        Classe un produit à partir de son type/catégorie source, de sa collection et d'un texte
+        libre (nom, description), qui ne sert qu'au genre.
+        Un vêtement homme/femme suit le genre détecté; la sous-catégorie est cherchée dans la
+        collection puis dans le type, parmi celles de la catégorie retenue.
+        """
+        category_tokens = self._category_tokens(category_text or '')
+        subcategory_tokens = self._category_tokens(subcategory_text or '')
+        gender = self.gender(tokens=category_tokens | subcategory_tokens | tokenize(text))
+
+        category = _best(self.categories, category_tokens) or self.default_category
+        if gender == 'femme' and category == 'mens-clothing':
+            category = 'womens-clothing'
+        elif gender == 'homme' and category == 'womens-clothing':
+            category = 'mens-clothing'
+
+        subcategory = None
+        index = self.subcategories.get(category)
+        if index:
+            subcategory = _best(index, subcategory_tokens) or _best(index, category_tokens)
+        return Classification(category, subcategory, gender)
+
+    def classify_many(self, rows):
+        """Classement en bloc d'une suite de (catégorie, collection, texte)"""
+        classify = self.classify
+        return [classify(*row) for row in rows]
+
+
+# Classements par source
+CLASSIFIERS = {
+    'default': ProductClassifier(),
+    'montres': ProductClassifier(extra_gender_keywords=WATCH_GENDER_KEYWORDS),
+}
+
+
+def get_classifier(source='default'):
+    """Classement d'une source (voir CLASSIFIERS)"""
+    return CLASSIFIERS[source]
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Filtres de validité des produits, partagés par le nettoyage du catalogue et les importeurs
+Les mots-clés exclus (éléments de navigation, liens de contact...) sont compilés en une seule
+expression régulière factorisée par préfixes (trie): un nom est examiné en une passe, quel que
+soit le nombre de mots-clés. Chaque source a son jeu de règles (FILTERS), et chaque rejet
+indique la règle qui l'a provoqué.
+"""
+
+import re
+from collections import Counter
+
+# Configuration
+# Éléments de navigation et de contact ramassés par le scraping à la place de produits
+NAVIGATION_KEYWORDS = (
+    'acceuil', 'accueil', 'boutique', 'contact', 'blog', 'à propos', 'a propos',
+    'information', 'emplacement', 'apprenez', 'notre', 'nous', 'connaître',
+    'panier', 'loading', 'done', 'ajouter', 'produit en vente', '%',
+    '📞', 'phone', 'téléphone', 'tel:', 'mailto:', 'facebook', 'instagram',
+    '33 6 29', '29 61 06',
+)
+
+
+def _trie_pattern(words):
+    """Expression régulière reconnaissant exactement les mots donnés, factorisée par préfixes"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def render(node):
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        optional = '' in node
+        if not branches:
+            return ''
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = f"(?:{'|'.join(branches)})"
+        return group + '?' if optional else group
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """Recherche de sous-chaînes parmi un ensemble de mots-clés (insensible à la casse)"""
+
+    def __init__(self, keywords):
+        self.keywords = tuple(sorted({keyword.lower() for keyword in keywords if keyword}))
+        self.pattern = re.compile(_trie_pattern(self.keywords)) if self.keywords else None
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def find(self, text):
+        """Premier mot-clé trouvé dans text, ou None"""
+        if self.pattern is None or not text:
+            return None
+        match = self.pattern.search(text.lower())
+        return match.group(0) if match else None
+
+
+class ProductFilter:
+    """
+    Règles de validité d'une source, évaluées dans l'ordre; la première règle enfreinte
+    est le motif du rejet:
+    - nom_court: nom absent ou de moins de min_name_length caractères
+    - mot_exclu: le nom contient un mot-clé exclu (motif 'mot_exclu:<mot-clé>')
+    - sans_lettres: le nom ne correspond pas à letters_pattern
+    - slug_court: slug de moins de min_slug_length caractères
+    """
+
+    def __init__(self, name, keywords=NAVIGATION_KEYWORDS, min_name_length=3,
+                 letters_pattern=r'[a-zA-Z]{3,}', min_slug_length=None):
+        self.name = name
+        self.matcher = KeywordMatcher(keywords)
+        self.min_name_length = min_name_length
+        self.letters = re.compile(letters_pattern) if letters_pattern else None
+        self.min_slug_length = min_slug_length
+
+    def name_rejection(self, name):
+        """Motif de rejet d'un nom de produit, None s'il est valide"""
+        if not name or len(name.strip()) < self.min_name_length:
+            return 'nom_court'
+        keyword = self.matcher.find(name)
+        if keyword is not None:
+            return f"mot_exclu:{keyword}"
+        if self.letters is not None and not self.letters.search(name):
+            return 'sans_lettres'
+        return None
+
+    def rejection(self, product):
+        """Motif de rejet d'un produit du catalogue, None s'il est valide"""
+        reason = self.name_rejection(product.get('name', '') or product.get('name_fr', ''))
+        if reason is None and self.min_slug_length is not None:
+            if len(product.get('slug') or '') < self.min_slug_length:
+                return 'slug_court'
+        return reason
+
+    def reasons(self, products):
+        """Évaluation en bloc: motif de rejet (ou None) de chaque produit, dans l'ordre"""
+        rejection = self.rejection
+        return [rejection(product) for product in products]
+
+    def rejections(self, entries):
+        """Produit (clé, produit, motif) pour chaque produit rejeté d'une suite de (clé, produit)"""
+        rejection = self.rejection
+        for key, product in entries:
+            reason = rejection(product)
+            if reason is not None:
+                yield key, product, reason
+
+
+def rule_counts(reasons):
+    """Nombre de rejets par règle (le détail après ':' est ignoré), du plus fréquent au moins fréquent"""
+    return Counter(reason.split(':', 1)[0] for reason in reasons if reason).most_common()
+
+
+# Jeux de règles par source
+FILTERS = {
+    # Catalogue new_products.json (clean_invalid_products.py)
+    'catalog': ProductFilter('catalog', min_slug_length=3),
+    # Scraping HTML de temps-et-merveilles.fr: l'URL et la longueur du nom sont vérifiées par l'importeur
+    'temps-et-merveilles': ProductFilter('temps-et-merveilles', letters_pattern=None),
+}
+
+
+def get_filter(source):
+    """Jeu de règles d'une source (voir FILTERS)"""
+    return FILTERS[source]
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Écriture en streaming des catalogues produits, en JSON ou en module TypeScript
+Partagée par generate_products.py, les scripts d'importation et catalog_shards.py: chaque
+produit est encodé d'un bloc (chaînes échappées par l'encodeur JSON, littéraux valides en
+TypeScript), avec un ordre des clés fixe, dans un fichier tamponné remplacé atomiquement
+en fin d'écriture.
+"""
+
+import filecmp
+import json
+import os
+
+# Configuration
+NEW_PRODUCTS_TS_FILE = "new_products.ts"
+BUFFER_SIZE = 1024 * 1024
+
+# Champs du type Product (src/lib/types.ts), dans l'ordre d'écriture; les autres clés suivent par ordre alphabétique
+PRODUCT_FIELDS = (
+    'id', 'name', 'name_fr', 'name_en', 'slug', 'price', 'oldPrice',
+    'description', 'description_fr', 'description_en', 'category', 'subcategory',
+    'images', 'sizes', 'colors',
+)
+
+# Séparateurs de ligne acceptés par JSON mais pas par les anciens moteurs JavaScript
+_LINE_SEPARATORS = {'\u2028': '\\u2028', '\u2029': '\\u2029'}
+
+
+_key_orders = {}           # (clés du produit, champs retenus) -> clés dans l'ordre d'écriture
+
+
+def _ordered_keys(keys, fields):
+    cache_key = (keys, fields)
+    order = _key_orders.get(cache_key)
+    if order is None:
+        order = [key for key in PRODUCT_FIELDS if key in keys]
+        order += sorted(key for key in keys if key not in PRODUCT_FIELDS)
+        if fields is not None:
+            order = [key for key in order if key in fields]
+        _key_orders[cache_key] = order
+    return order
+
+
+def ordered_product(product, fields=None, drop_none=False):
+    """
+    Copie du produit avec les clés dans l'ordre de PRODUCT_FIELDS, puis les autres clés triées.
+    fields limite les clés écrites (ex. aux champs du type Product); drop_none retire les valeurs nulles.
+    """
+    keys = _ordered_keys(tuple(product), fields)
+    if drop_none:
+        return {key: product[key] for key in keys if product[key] is not None}
+    return {key: product[key] for key in keys}
+
+
+# Encodeurs réutilisés (json.dumps en recrée un à chaque appel avec des options)
+_compact_encoder = json.JSONEncoder(ensure_ascii=False, separators=(', ', ': '))
+_indented_encoders = {}
+
+
+def to_literal(value, indent=None):
+    """Encode une valeur en JSON, utilisable telle quelle comme littéral TypeScript"""
+    if indent is None:
+        text = _compact_encoder.encode(value)
+    else:
+        encoder = _indented_encoders.get(indent)
+        if encoder is None:
+            encoder = _indented_encoders[indent] = json.JSONEncoder(ensure_ascii=False, indent=indent)
+        text = encoder.encode(value)
+    if '\u2028' in text or '\u2029' in text:
+        for char, escaped in _LINE_SEPARATORS.items():
+            text = text.replace(char, escaped)
+    return text
+
+
+class ProductWriter:
+    """
+    Écrit un tableau de produits en streaming, dans un fichier temporaire qui remplace path
+    à la sortie du bloc with (supprimé en cas d'erreur).
+
+    - format 'json': tableau JSON; avec indent=2, même mise en forme que json.dump(..., indent=2)
+    - format 'ts': module `export const <export_name>[: <type_name>[]] = [...]`
+
+    Avec indent=None, un produit par ligne (encodeur C de json, le plus rapide).
+    Avec skip_unchanged, un fichier identique à l'existant n'est pas remplacé (changed est faux).
+    """
+
+    def __init__(self, path, format='json', indent=2, export_name='newProducts', type_name=None,
+                 preamble='', fields=None, drop_none=False, skip_unchanged=False, buffer_size=BUFFER_SIZE):
+        self.path = path
+        self.format = format
+        self.indent = indent
+        self.export_name = export_name
+        self.type_name = type_name
+        self.preamble = preamble
+        self.fields = fields
+        self.drop_none = drop_none
+        self.skip_unchanged = skip_unchanged
+        self.buffer_size = buffer_size
+        self.tmp_path = f"{path}.tmp"
+        self.count = 0
+        self.changed = True
+        self.f = None
+
+    def __enter__(self):
+        self.f = open(self.tmp_path, 'w', encoding='utf-8', buffering=self.buffer_size)
+        if self.format == 'ts':
+            annotation = f": {self.type_name}[]" if self.type_name else ""
+            self.f.write(f"{self.preamble}export const {self.export_name}{annotation} = ")
+        return self
+
+    def write(self, product):
+        self.write_literal(to_literal(ordered_product(product, self.fields, self.drop_none), self.indent))
+
+    def write_literal(self, text):
+        """
+        Ajoute un produit déjà encodé par to_literal(ordered_product(...), indent), par exemple
+        dans un autre processus
+        """
+        self.f.write(',\n  ' if self.count else '[\n  ')
+        self.f.write(text.replace('\n', '\n  ') if self.indent is not None else text)
+        self.count += 1
+
+    def write_all(self, products):
+        for product in products:
+            self.write(product)
+        return self.count
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.f.close()
+            os.remove(self.tmp_path)
+            return False
+        self.f.write('\n]' if self.count else '[]')
+        if self.format == 'ts':
+            self.f.write(';\n')
+        self.f.close()
+        if self.skip_unchanged and os.path.exists(self.path) and filecmp.cmp(self.tmp_path, self.path, shallow=False):
+            os.remove(self.tmp_path)
+            self.changed = False
+        else:
+            os.replace(self.tmp_path, self.path)
+        return False
+
+
+def write_products_json(products, path, indent=2):
+    """
+    Écrit un tableau JSON de produits en streaming (indent=2: même format que
+    json.dump(products, f, ensure_ascii=False, indent=2)). Retourne le nombre de produits écrits.
+    """
+    with ProductWriter(path, 'json', indent=indent) as writer:
+        return writer.write_all(products)
+
+
+def write_products_ts(products, path=NEW_PRODUCTS_TS_FILE, export_name='newProducts', preamble=None,
+                      indent=None):
+    """Écrit un module TypeScript exportant le tableau de produits; retourne le nombre écrit"""
+    if preamble is None:
+        preamble = "// Catalogue produits généré automatiquement, ne pas modifier\n\n"
+    with ProductWriter(path, 'ts', indent=indent, export_name=export_name, preamble=preamble,
+                       drop_none=True) as writer:
+        return writer.write_all(products)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lecture paginée de l'API publique Shopify /products.json
+Parcourt toutes les pages (limit/page) avec une fenêtre de requêtes concurrentes
+Une page en échec (erreur réseau, réponse non 200) est redemandée avec un délai croissant;
+seule une page vide marque la fin du catalogue.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+import import_metrics
+
+# Configuration
+PAGE_LIMIT = 250   # Maximum accepté par Shopify
+PAGE_WINDOW = 4    # Pages demandées en parallèle
+MAX_PAGES = 400
+PAGE_RETRIES = 3   # Nouvelles tentatives pour une page en échec
+RETRY_DELAY = 1.0  # Délai avant la première nouvelle tentative (doublé à chaque essai)
+
+
+class PageFetchError(IOError):
+    """Page toujours en échec après PAGE_RETRIES nouvelles tentatives"""
+
+
+def _page_url(products_url, page, limit):
+    separator = '&' if '?' in products_url else '?'
+    return f"{products_url}{separator}limit={limit}&page={page}"
+
+
+def fetch_page(products_url, page, limit=PAGE_LIMIT, headers=None):
+    """
+    Récupère une page de produits.
+    Retourne la liste des produits, ou None si l'URL ne répond pas comme une API Shopify.
+    """
+    url = _page_url(products_url, page, limit)
+    response = http_client.get(url, headers=headers, timeout=30, allow_redirects=True)
+    if response.status_code != 200:
+        return None
+    with import_metrics.timer('parse', import_metrics.host_of(url)):
+        data = response.json()
+    if not isinstance(data, dict) or 'products' not in data:
+        return None
+    return data['products']
+
+
+def fetch_page_with_retry(products_url, page, limit=PAGE_LIMIT, headers=None,
+                          retries=PAGE_RETRIES, delay=RETRY_DELAY):
+    """
+    Récupère une page au-delà de la première: une erreur ou une réponse invalide est
+    redemandée jusqu'à `retries` fois, après delay, 2*delay, ... secondes.
+    Lève PageFetchError si la page reste en échec.
+    """
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(delay * 2 ** (attempt - 1))
+            import_metrics.add('fetch', import_metrics.host_of(products_url), retries=1)
+        try:
+            page_products = fetch_page(products_url, page, limit, headers)
+        except Exception as e:
+            error = type(e).__name__
+        else:
+            if page_products is not None:
+                return page_products
+            error = "réponse invalide"
+        print(f"  ✗ Erreur page {page} (essai {attempt + 1}/{retries + 1}): {error}")
+    raise PageFetchError(f"page {page} de {products_url} en échec après {retries + 1} essais ({error})")
+
+
+def fetch_all_products(products_url, headers=None, limit=PAGE_LIMIT, window=PAGE_WINDOW, max_pages=MAX_PAGES):
+    """
+    Récupère tous les produits d'un endpoint products.json, page par page.
+    La première page valide l'endpoint (None s'il ne répond pas); les suivantes sont
+    demandées par fenêtres de `window` pages et la lecture s'arrête à la première page vide.
+    Un avertissement signale un catalogue tronqué si max_pages est atteint avant cette page.
+    Lève PageFetchError si une page reste en échec: le catalogue serait incomplet.
+    """
+    start = time.monotonic()
+    first_page = fetch_page(products_url, 1, limit, headers)
+    if first_page is None:
+        return None
+
+    products = list(first_page)
+    pages_fetched = 1
+    next_page = 2
+    done = not first_page
+
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        while not done and next_page <= max_pages:
+            page_numbers = range(next_page, min(next_page + window, max_pages + 1))
+            futures = [executor.submit(fetch_page_with_retry, products_url, page, limit, headers)
+                       for page in page_numbers]
+            for future in futures:
+                page_products = future.result()
+                pages_fetched += 1
+                if not page_products:
+                    done = True
+                    break
+                products.extend(page_products)
+            next_page += window
+
+    if not done:
+        print(f"  ⚠️  Limite de {max_pages} pages atteinte sans page vide: catalogue peut-être incomplet")
+
+    elapsed = time.monotonic() - start
+    rate = pages_fetched / elapsed if elapsed > 0 else 0.0
+    print(f"  📄 {pages_fetched} pages lues en {elapsed:.1f}s ({rate:.1f} pages/s)")
+    return products
@@ -1,6 +1,16 @@
-import placeholderImagesData from './placeholder-images.json';
+import placeholderImageMapData from './placeholder-image-map.json';
 
-const { placeholderImages } = placeholderImagesData;
+type PlaceholderImage = {
+  id: string;
+  description: string;
+  imageUrl: string;
+  imageHint: string;
+};
+
+// Index ID -> image, généré par placeholder_images.py à partir de placeholder-images.json
+const placeholderImageMap = new Map<string, PlaceholderImage>(
+  Object.entries(placeholderImageMapData as Record<string, PlaceholderImage>)
+);
 
 /**
  * Génère le chemin d'image pour un produit
@@ -11,8 +21,8 @@ export function getProductImageUrl(imageId: string): string {
     return '/images/logo.png';
   }
 
-  // Chercher dans placeholder-images.json d'abord (pour les images existantes)
-  const placeholderImage = placeholderImages.find(p => p.id === imageId);
+  // Chercher dans l'index des images d'abord (pour les images existantes)
+  const placeholderImage = placeholderImageMap.get(imageId);
   if (placeholderImage) {
     return placeholderImage.imageUrl;
   }
@@ -48,8 +58,8 @@ export function findProductImage(imageId: string) {
     };
   }
 
-  // Chercher dans placeholder-images.json
-  const placeholderImage = placeholderImages.find(p => p.id === imageId);
+  // Chercher dans l'index des images
+  const placeholderImage = placeholderImageMap.get(imageId);
   if (placeholderImage) {
     return placeholderImage;
   }
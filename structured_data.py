@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Extraction des données produits structurées d'une page HTML
+Lit, sans construire d'arbre DOM, le JSON produit Shopify embarqué, le JSON-LD schema.org
+et les balises OpenGraph; les scrapers ne repassent par l'analyse heuristique du DOM
+que si ces sources ne suffisent pas. Les taux de réussite par source sont comptabilisés.
+"""
+
+import html
+import json
+import re
+import threading
+from urllib.parse import urljoin
+
+# Sources dans l'ordre de priorité
+SOURCES = ('shopify_json', 'json_ld', 'opengraph')
+
+SCRIPT_RE = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.I | re.S)
+META_RE = re.compile(r'<meta\b([^>]*)>', re.I)
+ATTR_RE = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _attributes(attr_text):
+    """Attributs d'une balise sous forme de dict (noms en minuscules, entités décodées)"""
+    attrs = {}
+    for match in ATTR_RE.finditer(attr_text):
+        value = next(v for v in match.groups()[1:] if v is not None)
+        attrs[match.group(1).lower()] = html.unescape(value)
+    return attrs
+
+
+def _strip_tags(text):
+    """Texte brut d'un fragment HTML, espaces normalisés"""
+    return ' '.join(html.unescape(TAG_RE.sub(' ', text or '')).split())
+
+
+def _to_price(value, cents=False):
+    """Convertit un prix (nombre ou texte) en float; None si illisible"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value / 100 if cents else float(value)
+    text = re.sub(r'[\s\u00a0\u202f]', '', str(value))
+    if ',' in text and '.' in text:
+        text = text.replace(',', '') if text.rfind('.') > text.rfind(',') else text.replace('.', '').replace(',', '.')
+    else:
+        text = text.replace(',', '.')
+    match = re.search(r'\d+(?:\.\d+)?', text)
+    return float(match.group(0)) if match else None
+
+
+def json_scripts(page, script_type):
+    """Produit le contenu décodé des balises <script type=script_type> de la page"""
+    for match in SCRIPT_RE.finditer(page):
+        if _attributes(match.group(1)).get('type', '').lower() != script_type:
+            continue
+        try:
+            yield json.loads(match.group(2).strip())
+        except ValueError:
+            continue
+
+
+def _from_shopify_json(page, base_url):
+    """Produit Shopify embarqué (objet `product | json` du thème, prix en centimes)"""
+    for data in json_scripts(page, 'application/json'):
+        if isinstance(data, dict) and isinstance(data.get('product'), dict):
+            data = data['product']
+        if not isinstance(data, dict) or not data.get('title') or not isinstance(data.get('variants'), list):
+            continue
+        variant = data['variants'][0] if data['variants'] else {}
+        price = variant.get('price', data.get('price'))
+        old_price = variant.get('compare_at_price', data.get('compare_at_price'))
+        images = []
+        for image in data.get('images') or []:
+            src = image.get('src') if isinstance(image, dict) else image
+            if src:
+                images.append(urljoin(base_url or '', 'https:' + src if src.startswith('//') else src))
+        return {
+            'name': data['title'],
+            # Le JSON du thème donne des entiers en centimes, l'API products.json des chaînes en euros
+            'price': _to_price(price, cents=isinstance(price, int)),
+            'old_price': _to_price(old_price, cents=isinstance(old_price, int)),
+            'description': _strip_tags(data.get('description') or data.get('body_html')),
+            'image_urls': images,
+            'brand': data.get('vendor'),
+            'category': data.get('type') or data.get('product_type'),
+            'handle': data.get('handle'),
+        }
+    return None
+
+
+def _json_ld_products(data):
+    """Parcourt un document JSON-LD (liste, @graph) et produit les nœuds de type Product"""
+    if isinstance(data, list):
+        for node in data:
+            yield from _json_ld_products(node)
+    elif isinstance(data, dict):
+        node_type = data.get('@type')
+        types = node_type if isinstance(node_type, list) else [node_type]
+        if 'Product' in types or 'ProductGroup' in types:
+            yield data
+        if '@graph' in data:
+            yield from _json_ld_products(data['@graph'])
+
+
+def _from_json_ld(page, base_url):
+    """Produit schema.org décrit en JSON-LD"""
+    for data in json_scripts(page, 'application/ld+json'):
+        for node in _json_ld_products(data):
+            if not node.get('name'):
+                continue
+            offers = node.get('offers') or {}
+            if isinstance(offers, list):
+                offers = offers[0] if offers else {}
+            price = offers.get('price', offers.get('lowPrice'))
+            if price is None and isinstance(offers.get('priceSpecification'), dict):
+                price = offers['priceSpecification'].get('price')
+
+            images = node.get('image') or []
+            if not isinstance(images, list):
+                images = [images]
+            image_urls = []
+            for image in images:
+                src = (image.get('url') or image.get('contentUrl')) if isinstance(image, dict) else image
+                if src:
+                    image_urls.append(urljoin(base_url or '', src))
+
+            brand = node.get('brand')
+            if isinstance(brand, dict):
+                brand = brand.get('name')
+            return {
+                'name': _strip_tags(node['name']),
+                'price': _to_price(price),
+                'old_price': None,
+                'description': _strip_tags(node.get('description')),
+                'image_urls': image_urls,
+                'brand': brand,
+                'category': node.get('category') if isinstance(node.get('category'), str) else None,
+                'handle': None,
+            }
+    return None
+
+
+def _from_opengraph(page, base_url):
+    """Balises OpenGraph (og:*) et prix produit (product:price:amount)"""
+    properties = {}
+    images = []
+    for match in META_RE.finditer(page):
+        attrs = _attributes(match.group(1))
+        key = (attrs.get('property') or attrs.get('name') or '').lower()
+        if not key.startswith(('og:', 'product:')) or 'content' not in attrs:
+            continue
+        if key in ('og:image', 'og:image:secure_url'):
+            src = urljoin(base_url or '', attrs['content'])
+            if src not in images:
+                images.append(src)
+        else:
+            properties.setdefault(key, attrs['content'])
+
+    if not properties.get('og:title'):
+        return None
+    og_type = properties.get('og:type', '').lower()
+    price = properties.get('product:price:amount') or properties.get('og:price:amount')
+    if og_type and 'product' not in og_type and price is None:
+        # Page d'article, de collection...: pas une fiche produit
+        return None
+    return {
+        'name': properties['og:title'],
+        'price': _to_price(price),
+        'old_price': None,
+        'description': properties.get('og:description', ''),
+        'image_urls': images,
+        'brand': properties.get('product:brand'),
+        'category': None,
+        'handle': None,
+    }
+
+
+EXTRACTORS = {
+    'shopify_json': _from_shopify_json,
+    'json_ld': _from_json_ld,
+    'opengraph': _from_opengraph,
+}
+
+
+def extract_product(page, base_url=None):
+    """
+    Extrait un produit des données structurées d'une page.
+    Les sources sont lues par ordre de priorité; les champs manquants de la première
+    source trouvée sont complétés par les suivantes. Retourne None si aucune source
+    ne donne de nom, sinon un dict avec 'source' (source principale) et les champs
+    name, price, old_price, description, image_urls, brand, category, handle.
+    """
+    product = None
+    for source in SOURCES:
+        found = EXTRACTORS[source](page, base_url)
+        if not found:
+            continue
+        if product is None:
+            product = dict(found, source=source)
+            continue
+        for key, value in found.items():
+            if value and not product.get(key):
+                product[key] = value
+    return product
+
+
+def is_complete(product):
+    """Vrai si le produit extrait suffit sans passer par l'analyse heuristique du DOM"""
+    return bool(product and product.get('name') and product.get('price'))
+
+
+class ExtractionStats:
+    """Compteurs de pages produits par source d'extraction, sûrs entre threads"""
+
+    def __init__(self):
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, source):
+        """Comptabilise une page: une des SOURCES, 'heuristic' ou 'miss'"""
+        with self._lock:
+            self.counts[source] = self.counts.get(source, 0) + 1
+
+    def print_stats(self):
+        """Affiche les taux de réussite par source"""
+        with self._lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        if not total:
+            return
+        print(f"\n🧩 Extraction des pages produits ({total} pages)")
+        for source in SOURCES + ('heuristic', 'miss'):
+            if counts.get(source):
+                print(f"  {source:<13} {counts[source]:5d}  ({counts[source] / total:.0%})")
+
+
+_stats = ExtractionStats()
+
+
+def record(source):
+    """Comptabilise une page produit dans les statistiques partagées"""
+    _stats.record(source)
+
+
+def print_stats():
+    """Affiche les statistiques partagées d'extraction"""
+    _stats.print_stats()
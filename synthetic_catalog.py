@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Génération de grands catalogues synthétiques (jeux de données de test de charge)
+Produit N produits à partir de subcategories_config (generate_products.py): sous-catégorie,
+variante, prix, promotion et couleurs sont tirés par lots avec NumPy (ou le module random si
+NumPy n'est pas installé), avec une graine fixe. Chaque lot a sa propre graine dérivée de la
+graine globale: le résultat ne dépend pas du nombre de processus. Les produits sont écrits en
+streaming (JSON, ou module TypeScript si le fichier de sortie se termine par .ts).
+
+Les IDs (fx-<sous-catégorie>-<numéro>) et les slugs sont uniques et déterministes, sans passer
+par id_allocator.py: ces jeux de données ne doivent pas être fusionnés dans le catalogue.
+
+Usage: python3 synthetic_catalog.py <nombre> [--seed N] [--workers N] [--out fichier] [--indent]
+  (aussi: python3 generate_products.py --count <nombre> [...])
+"""
+
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from generate_products import (colors_list, generate_description, generate_product_name,
+                               generate_slug, subcategories_config)
+from product_serializer import ProductWriter, ordered_product, to_literal
+
+# Configuration
+DEFAULT_OUTPUT = "synthetic_products.json"
+DEFAULT_SEED = 42
+BATCH_SIZE = 10000
+ID_PREFIX = "fx-"
+PROMO_RATE = 0.3               # Part des produits en promotion
+PROMO_MARKUP = (1.2, 1.5)      # oldPrice = prix x [1.2, 1.5[
+MAX_COLORS = 3
+
+# Sous-catégories à plat: (catégorie, sous-catégorie, configuration)
+SUBCATEGORIES = [(category, subcategory, config)
+                 for category, subcategories in subcategories_config.items()
+                 for subcategory, config in subcategories.items()]
+
+
+def _sample_numpy(seed, batch_index, size):
+    """Tirages d'un lot avec NumPy; retourne des listes Python colonne par colonne"""
+    rng = np.random.default_rng([seed, batch_index])
+    sub = rng.integers(0, len(SUBCATEGORIES), size)
+    variant_counts = np.array([len(config['variants']) for _, _, config in SUBCATEGORIES])
+    low = np.array([config['base_price_range'][0] for _, _, config in SUBCATEGORIES])
+    high = np.array([config['base_price_range'][1] for _, _, config in SUBCATEGORIES])
+    variant = rng.integers(0, variant_counts[sub])
+    price = rng.integers(low[sub], high[sub] + 1)
+    promo = rng.random(size) < PROMO_RATE
+    old_price = (price * rng.uniform(*PROMO_MARKUP, size)).astype(np.int64)
+    color_count = rng.integers(1, MAX_COLORS + 1, size)
+    # Tirage sans remise: les MAX_COLORS premières couleurs d'une permutation aléatoire par ligne
+    colors = np.argsort(rng.random((size, len(colors_list))), axis=1)[:, :MAX_COLORS]
+    return (sub.tolist(), variant.tolist(), price.tolist(), promo.tolist(), old_price.tolist(),
+            color_count.tolist(), colors.tolist())
+
+
+def _sample_stdlib(seed, batch_index, size):
+    """Mêmes tirages avec le module random (plus lent, suite différente de NumPy)"""
+    rng = random.Random(f"{seed}:{batch_index}")
+    columns = ([], [], [], [], [], [], [])
+    for _ in range(size):
+        sub = rng.randrange(len(SUBCATEGORIES))
+        config = SUBCATEGORIES[sub][2]
+        price = rng.randint(*config['base_price_range'])
+        values = (sub, rng.randrange(len(config['variants'])), price, rng.random() < PROMO_RATE,
+                  int(price * rng.uniform(*PROMO_MARKUP)), rng.randint(1, MAX_COLORS),
+                  rng.sample(range(len(colors_list)), MAX_COLORS))
+        for column, value in zip(columns, values):
+            column.append(value)
+    return columns
+
+
+def generate_batch(seed, batch_index, start, size):
+    """Produits start .. start+size-1 du catalogue synthétique"""
+    sample = _sample_numpy if np is not None else _sample_stdlib
+    products = []
+    for offset, (sub, variant_index, price, promo, old_price, color_count, colors) in enumerate(
+            zip(*sample(seed, batch_index, size))):
+        number = start + offset + 1
+        category, subcategory, config = SUBCATEGORIES[sub]
+        variant = config['variants'][variant_index]
+        name_de, name_fr, name_en = generate_product_name(variant, config, number - 1)
+        slug = f"{generate_slug(name_de)}-{number}"
+        desc_de, desc_fr, desc_en = generate_description(name_de, name_fr, name_en, variant, config)
+        products.append({
+            'id': f"{ID_PREFIX}{subcategory}-{number:07d}",
+            'name': name_de,
+            'name_fr': name_fr,
+            'name_en': name_en,
+            'slug': slug,
+            'price': price,
+            'oldPrice': old_price if promo else None,
+            'description': desc_de,
+            'description_fr': desc_fr,
+            'description_en': desc_en,
+            'category': category,
+            'subcategory': subcategory,
+            'images': [slug.replace('-', '_')],
+            'sizes': config['sizes'],
+            'colors': [colors_list[index] for index in colors[:color_count]],
+        })
+    return products
+
+
+def _encode_batch(task):
+    """Travail d'un processus: génère et encode un lot (les chaînes coûtent moins à transférer)"""
+    seed, batch_index, start, size, indent, drop_none = task
+    return [to_literal(ordered_product(product, drop_none=drop_none), indent)
+            for product in generate_batch(seed, batch_index, start, size)]
+
+
+def write_synthetic_catalog(count, path=DEFAULT_OUTPUT, seed=DEFAULT_SEED, workers=1, indent=None,
+                            batch_size=BATCH_SIZE):
+    """Génère count produits dans path; retourne le nombre de produits écrits"""
+    is_ts = path.endswith('.ts')
+    tasks = [(seed, batch_index, start, min(batch_size, count - start), indent, is_ts)
+             for batch_index, start in enumerate(range(0, count, batch_size))]
+    writer = ProductWriter(path, 'ts' if is_ts else 'json', indent=indent, export_name='syntheticProducts',
+                           preamble=f"// Catalogue synthétique généré par synthetic_catalog.py (graine {seed})\n\n",
+                           drop_none=is_ts)
+    with writer:
+        if workers > 1:
+            with Pool(workers) as pool:
+                for literals in pool.imap(_encode_batch, tasks):
+                    for text in literals:
+                        writer.write_literal(text)
+        else:
+            for task in tasks:
+                for text in _encode_batch(task):
+                    writer.write_literal(text)
+    return writer.count
+
+
+def _option(args, name, default, cast=int):
+    if name not in args:
+        return default
+    position = args.index(name)
+    value = cast(args[position + 1])
+    del args[position:position + 2]
+    return value
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    count = _option(args, '--count', None)
+    seed = _option(args, '--seed', DEFAULT_SEED)
+    workers = _option(args, '--workers', 1)
+    path = _option(args, '--out', DEFAULT_OUTPUT, str)
+    indent = 2 if '--indent' in args else None
+    args = [arg for arg in args if not arg.startswith('--')]
+    if count is None and args:
+        count = int(args[0])
+    if not count or count < 0:
+        print("Usage: python3 synthetic_catalog.py <nombre> [--seed N] [--workers N] [--out fichier] [--indent]")
+        sys.exit(1)
+
+    backend = "NumPy" if np is not None else "random (NumPy non installé)"
+    print(f"🎲 Génération de {count} produits synthétiques (graine {seed}, {backend}, {workers} processus)...")
+    start = time.time()
+    written = write_synthetic_catalog(count, path, seed, workers, indent)
+    elapsed = time.time() - start
+    print(f"✅ {written} produits écrits dans {path} en {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} produits/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""Configuration pytest des tests des scripts Python du catalogue (modules à la racine du dépôt)"""
+
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Dossier de travail temporaire: les scripts y lisent et écrivent new_products.json"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
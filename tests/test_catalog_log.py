@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import pytest
+
+import catalog_log
+from catalog_log import CatalogLog, JournalConflictError
+from conftest import read_json, write_json
+
+PRODUCTS = [{'id': 'a-001', 'name': 'Chemise'}, {'id': 'a-002', 'name': 'Montre'}]
+
+
+def run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['catalog_log.py', *args])
+    catalog_log.main()
+
+
+def test_compact_without_log_dir_keeps_new_products(workdir, monkeypatch):
+    write_json('new_products.json', PRODUCTS)
+    run_main(monkeypatch, 'compact')
+    assert read_json('new_products.json') == PRODUCTS
+
+
+def test_compact_with_empty_journal_keeps_hand_edits(workdir, monkeypatch):
+    write_json('new_products.json', PRODUCTS)
+    CatalogLog()
+    edited = PRODUCTS + [{'id': 'a-003', 'name': 'Sac'}]
+    write_json('new_products.json', edited)
+    run_main(monkeypatch, 'compact')
+    assert read_json('new_products.json') == edited
+
+
+def test_compact_keeps_pending_changes_over_external_edit(workdir, monkeypatch):
+    write_json('new_products.json', PRODUCTS)
+    CatalogLog().add_many([{'id': 'a-003', 'name': 'Sac'}])
+    write_json('new_products.json', [{'id': 'x-001', 'name': 'Autre'}])
+    with pytest.raises(JournalConflictError):
+        CatalogLog()
+    run_main(monkeypatch, 'compact')
+    assert [p['id'] for p in read_json('new_products.json')] == ['a-001', 'a-002', 'a-003']
+
+
+def test_import_drops_pending_changes(workdir, monkeypatch):
+    write_json('new_products.json', PRODUCTS)
+    CatalogLog().add_many([{'id': 'a-003', 'name': 'Sac'}])
+    external = [{'id': 'x-001', 'name': 'Autre'}]
+    write_json('new_products.json', external)
+    run_main(monkeypatch, 'import')
+    assert list(CatalogLog()) == external
+
+
+def test_missing_snapshot_is_rebuilt(workdir):
+    write_json('new_products.json', PRODUCTS)
+    CatalogLog()
+    os.remove(os.path.join('.catalog_log', 'snapshot.jsonl'))
+    assert list(CatalogLog()) == PRODUCTS
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from catalog_store import CatalogStore
+from catalog_upsert import UpsertIndex
+from conftest import write_json
+
+EXISTING = [
+    {'id': 'a-001', 'name': 'Chemise', 'slug': 'chemise', 'price': 50,
+     'sourceUrl': 'https://shop.example/chemise', 'images': ['chemise_1']},
+    {'id': 'a-002', 'name': 'Montre', 'slug': 'montre', 'price': 120, 'images': ['montre_1']},
+    {'id': 'a-003', 'name': 'Sac', 'slug': 'sac', 'price': 80},
+]
+
+
+def open_store():
+    write_json('new_products.json', EXISTING)
+    return CatalogStore()
+
+
+def test_apply_counts_inserted_updated_unchanged_merged(workdir):
+    catalog = open_store()
+    index = UpsertIndex(catalog)
+    staged = [
+        index.stage({'id': 'x-1', 'slug': 'autre-nom', 'sourceUrl': 'https://shop.example/chemise', 'price': 55}),
+        index.stage({'id': 'x-2', 'slug': 'montre', 'price': 120}),
+        index.stage({'id': 'x-3', 'slug': 'ceinture', 'price': 30}),
+        index.stage({'id': 'x-4', 'slug': 'ceinture', 'price': 35, 'images': ['ceinture_1']}),
+        index.stage({'id': 'x-5', 'slug': 'chemise', 'price': 60}),
+    ]
+    assert staged == ['update', 'update', 'insert', 'update', 'update']
+    assert index.apply() == {'inserted': 1, 'updated': 1, 'unchanged': 1, 'merged': 2}
+
+    products = list(catalog)
+    assert [p['id'] for p in products] == ['a-001', 'a-002', 'a-003', 'x-3']
+    # Champs fusionnés seulement: l'id et le nom du produit existant sont conservés
+    assert products[0]['price'] == 60 and products[0]['name'] == 'Chemise'
+    assert products[3]['price'] == 35 and products[3]['images'] == ['ceinture_1']
+    catalog.close()
+
+
+def test_empty_values_do_not_overwrite_existing_fields(workdir):
+    catalog = open_store()
+    index = UpsertIndex(catalog)
+    index.stage({'slug': 'montre', 'price': None, 'images': [], 'sourceUrl': ''})
+    assert index.apply() == {'inserted': 0, 'updated': 0, 'unchanged': 1, 'merged': 0}
+    assert catalog.get('a-002')['images'] == ['montre_1']
+    catalog.close()
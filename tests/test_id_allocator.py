@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+from id_allocator import IdAllocator, split_id
+from conftest import write_json
+
+
+def test_keyed_ids_are_stable_across_reruns(workdir):
+    allocator = IdAllocator(seed_files=())
+    first = [allocator.allocate('chemises-homme', f"chemises-homme:{i}") for i in range(3)]
+    allocator.close()
+
+    allocator = IdAllocator(seed_files=())
+    again = [allocator.allocate('chemises-homme', f"chemises-homme:{i}") for i in reversed(range(3))]
+    assert first == ['chemises-homme-001', 'chemises-homme-002', 'chemises-homme-003']
+    assert again == first[::-1]
+    assert allocator.allocate('chemises-homme') == 'chemises-homme-004'
+    allocator.close()
+
+
+def test_sequences_continue_after_seeded_ids(workdir):
+    write_json('new_products.json', [{'id': 'sacs-femme-007'}, {'id': 'montres-012'}, {'id': 'sans-numero'}])
+    with open('new_products.ts', 'w', encoding='utf-8') as f:
+        f.write('export const newProducts = [\n  {"id": "montres-020", "name": "x"}\n];\n')
+    allocator = IdAllocator(seed_files=('new_products.json', 'new_products.ts'))
+    assert allocator.allocate('sacs-femme') == 'sacs-femme-008'
+    assert allocator.allocate('montres') == 'montres-021'
+    allocator.close()
+
+
+def test_split_id():
+    assert split_id('accessoires-homme-014') == ('accessoires-homme', 14)
+    assert split_id('sans-numero') is None
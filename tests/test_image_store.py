@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import tempfile
+
+import pytest
+
+import http_client
+from image_store import ImageStore
+
+CONTENTS = {
+    'https://cdn.example/a.jpg': b'image-a',
+    'https://cdn.example/b.jpg': b'image-b',
+    'https://cdn.example/a-copy.jpg': b'image-a',
+}
+
+
+@pytest.fixture
+def store(workdir, monkeypatch):
+    def download_to_temp(url, directory, max_bytes=None):
+        data = CONTENTS[url]
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.', suffix='.part', dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return tmp_path, len(data), hashlib.sha256(data).hexdigest()
+
+    monkeypatch.setattr(http_client, 'download_to_temp', download_to_temp)
+    return ImageStore(products_dir=os.path.join('public', 'images', 'products'))
+
+
+def read_public(url):
+    with open(os.path.join('public', url.lstrip('/')), 'rb') as f:
+        return f.read()
+
+
+def test_blob_is_named_after_its_hash(store):
+    url = store.download('https://cdn.example/a.jpg', 'public/images/products/p1.jpg')
+    assert url == f"/images/products/{hashlib.sha256(b'image-a').hexdigest()[:16]}.jpg"
+    assert store.images == {'p1.jpg': os.path.basename(url)}
+
+
+def test_same_content_shares_one_blob(store):
+    first = store.download('https://cdn.example/a.jpg', 'public/images/products/p1.jpg')
+    second = store.download('https://cdn.example/a-copy.jpg', 'public/images/products/p2.jpg')
+    assert first == second
+    assert store.duplicates == 1
+    assert store.images['p1.jpg'] == store.images['p2.jpg']
+
+
+def test_new_content_never_overwrites_a_shared_blob(store):
+    shared = store.download('https://cdn.example/a.jpg', 'public/images/products/p1.jpg')
+    store.download('https://cdn.example/a-copy.jpg', 'public/images/products/p2.jpg')
+    replaced = store.download('https://cdn.example/b.jpg', 'public/images/products/p1.jpg')
+    assert replaced != shared
+    assert read_public(shared) == b'image-a'
+    assert read_public(replaced) == b'image-b'
+    assert store.images['p2.jpg'] == os.path.basename(shared)
+
+
+def test_index_keeps_image_mapping(store):
+    url = store.download('https://cdn.example/b.jpg', 'public/images/products/p1.jpg')
+    store.save()
+    reloaded = ImageStore(products_dir=store.products_dir)
+    assert reloaded.images == {'p1.jpg': os.path.basename(url)}
+    assert reloaded.by_hash[hashlib.sha256(b'image-b').hexdigest()] == os.path.basename(url)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import import_from_json_file
+from conftest import read_json, write_json
+
+
+def run_import(monkeypatch, path):
+    os.makedirs(os.path.join('src', 'lib'), exist_ok=True)
+    monkeypatch.setattr(sys, 'argv', ['import_from_json_file.py', path, '--fresh'])
+    import_from_json_file.main()
+
+
+def catalog(count):
+    return [{'id': f'chemises-homme-{i:03d}', 'name': f'Chemise {i}', 'slug': f'chemise-{i}',
+             'price': 50, 'category': 'mens-clothing', 'subcategory': 'chemises-homme',
+             'sourceUrl': f'https://shop.example/chemise-{i}', 'images': []}
+            for i in range(1, count + 1)]
+
+
+def test_full_catalog_still_updates_existing_products(workdir, monkeypatch):
+    monkeypatch.setattr(import_from_json_file, 'MAX_TOTAL_PRODUCTS', 3)
+    write_json('new_products.json', catalog(3))
+    write_json('import.json', [
+        {'name': 'Nouvelle chemise', 'url': 'https://shop.example/nouvelle', 'price': 60},
+        {'name': 'Chemise 2', 'url': 'https://shop.example/chemise-2', 'price': 99},
+    ])
+    run_import(monkeypatch, 'import.json')
+    products = read_json('new_products.json')
+    assert len(products) == 3
+    assert products[1]['price'] == 99
+    assert all(p['sourceUrl'] != 'https://shop.example/nouvelle' for p in products)
+
+
+def test_limit_counts_inserted_products_not_rows_read(workdir, monkeypatch):
+    monkeypatch.setattr(import_from_json_file, 'MAX_TOTAL_PRODUCTS', 4)
+    write_json('new_products.json', catalog(3))
+    write_json('import.json', [
+        {'name': 'Chemise 1', 'url': 'https://shop.example/chemise-1', 'price': 70},
+        {'name': 'Chemise 2', 'url': 'https://shop.example/chemise-2', 'price': 80},
+        {'name': 'Nouvelle chemise', 'url': 'https://shop.example/nouvelle', 'price': 60},
+        {'name': 'Autre chemise', 'url': 'https://shop.example/autre', 'price': 65},
+    ])
+    run_import(monkeypatch, 'import.json')
+    products = read_json('new_products.json')
+    assert [p['price'] for p in products] == [70, 80, 50, 60]
+    assert products[3]['sourceUrl'] == 'https://shop.example/nouvelle'
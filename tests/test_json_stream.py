@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+
+import pytest
+
+from json_stream import indented_array_texts, iter_json_array
+
+ITEMS = [
+    {'id': 'a-001', 'name': 'Chemise "Oxford" [bleue], {coton}', 'price': 1234.5, 'sizes': ['S', 'M']},
+    {'id': 'a-002', 'name': 'Montre\\à quartz\n\tété  ', 'price': -7e-3, 'oldPrice': None},
+    {'id': 'a-003', 'nested': {'tags': [[], {}, [1, [2, [3]]]], 'ok': True}, 'stock': 1000000},
+    123456789,
+    'fin',
+]
+
+CHUNK_SIZES = range(1, 12)
+
+
+def read(text, key='products', chunk_size=1):
+    return list(iter_json_array(io.StringIO(text), key, chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', [
+    json.dumps(ITEMS),
+    json.dumps(ITEMS, indent=2, ensure_ascii=False),
+    json.dumps({'meta': {'products': 'pas ici', 'total': [5]}, 'products': ITEMS}),
+])
+def test_items_survive_any_chunk_size(text, chunk_size):
+    assert read(text, chunk_size=chunk_size) == ITEMS
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_number_split_across_chunk_boundary(chunk_size):
+    numbers = [1, 22, 333, 4444.25, -55555, 6e10, 7]
+    assert read(json.dumps(numbers), chunk_size=chunk_size) == numbers
+    assert read('[ 12345 ,\n 678 ]', chunk_size=chunk_size) == [12345, 678]
+
+
+def test_empty_array_and_missing_key():
+    assert read('[]') == []
+    assert read('{"products": []}') == []
+    with pytest.raises(ValueError):
+        read('{"items": [1]}')
+    with pytest.raises(ValueError):
+        read('"pas un tableau"')
+
+
+def test_stops_reading_when_caller_stops():
+    items = iter_json_array(io.StringIO('[1, 2, pas du json'), chunk_size=1)
+    assert [next(items), next(items)] == [1, 2]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1024])
+def test_indented_array_texts_split_without_decoding(chunk_size):
+    objects = [item for item in ITEMS if isinstance(item, dict)]
+    f = io.StringIO(json.dumps(objects, indent=2, ensure_ascii=False))
+    texts = list(indented_array_texts(f, chunk_size))
+    assert [json.loads(text) for text in texts] == objects
+
+
+def test_indented_array_texts_falls_back_on_other_layouts():
+    f = io.StringIO(json.dumps(ITEMS))
+    assert indented_array_texts(f) is None
+    assert list(iter_json_array(f)) == ITEMS
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import limit_products_to_1100
+from catalog_store import CatalogStore
+from conftest import read_json, write_json
+
+
+class TrackedCatalog(CatalogStore):
+    closed = 0
+
+    def close(self):
+        TrackedCatalog.closed += 1
+        super().close()
+
+
+def run_limit(monkeypatch, max_products):
+    TrackedCatalog.closed = 0
+    os.makedirs(os.path.join('src', 'lib'), exist_ok=True)
+    monkeypatch.setattr(sys, 'argv', ['limit_products_to_1100.py'])
+    monkeypatch.setattr(limit_products_to_1100, 'MAX_PRODUCTS', max_products)
+    monkeypatch.setattr(limit_products_to_1100, 'open_catalog', lambda argv: TrackedCatalog())
+    limit_products_to_1100.main()
+
+
+def products(count):
+    return [{'id': f'a-{i:03d}', 'name': f'Produit {i}', 'images': []} for i in range(count)]
+
+
+def test_catalog_closed_when_under_limit(workdir, monkeypatch):
+    write_json('new_products.json', products(2))
+    run_limit(monkeypatch, 3)
+    assert TrackedCatalog.closed == 1
+
+
+def test_catalog_truncated_and_closed(workdir, monkeypatch):
+    write_json('new_products.json', products(5))
+    run_limit(monkeypatch, 3)
+    assert TrackedCatalog.closed == 1
+    assert [p['id'] for p in read_json('new_products.json')] == ['a-000', 'a-001', 'a-002']
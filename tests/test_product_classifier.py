@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+from product_classifier import get_classifier, stem, tokenize
+
+
+def test_stem_and_tokenize_handle_inflected_forms():
+    assert stem('chemises') == stem('chemise') == 'chemis'
+    assert stem('sac') == 'sac'
+    assert tokenize('Chemises HOMME, coton') == frozenset({'chemis', 'homm', 'coton'})
+    assert tokenize('') == frozenset()
+
+
+def test_classify_category_subcategory_and_gender():
+    classify = get_classifier().classify
+    assert classify('Chemises', 'Collection Oxford', 'Chemise pour homme') == ('mens-clothing', 'chemises-homme', 'homme')
+    # Un vêtement homme suit le genre détecté
+    assert classify('Vestes', '', 'Veste pour femme') == ('womens-clothing', 'vestes-femme', 'femme')
+    assert classify('Montres', '', '') == ('accessories', None, 'unisex')
+    assert classify('', '', '') == ('accessories', None, 'unisex')
+
+
+def test_watch_classifier_uses_extra_gender_keywords():
+    assert get_classifier('montres').gender('Montre diamant rose') == 'femme'
+    assert get_classifier().gender('Montre diamant rose') == 'unisex'
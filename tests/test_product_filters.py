@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+from product_filters import get_filter, rule_counts
+
+
+def test_catalog_rules_in_order():
+    rejection = get_filter('catalog').rejection
+    assert rejection({'name': 'Chemise Oxford', 'slug': 'chemise-oxford'}) is None
+    assert rejection({'name': 'ab', 'slug': 'ab'}) == 'nom_court'
+    assert rejection({'name': 'Contactez-nous', 'slug': 'contact'}) == 'mot_exclu:contact'
+    assert rejection({'name': '1234 56', 'slug': '1234-56'}) == 'sans_lettres'
+    assert rejection({'name': 'Chemise', 'slug': 'ch'}) == 'slug_court'
+    assert rejection({'name_fr': 'Veste en laine', 'slug': 'veste'}) is None
+
+
+def test_rule_counts_ignore_details():
+    reasons = ['mot_exclu:contact', None, 'nom_court', 'mot_exclu:blog', 'mot_exclu:panier']
+    assert rule_counts(reasons) == [('mot_exclu', 3), ('nom_court', 1)]
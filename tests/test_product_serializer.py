@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from product_serializer import ProductWriter, ordered_product, to_literal, write_products_json, write_products_ts
+
+PRODUCTS = [
+    {'colors': [{'name': 'Bleu', 'hex': '#00f'}], 'id': 'a-001', 'price': 49.9, 'name': 'Chemise « été »',
+     'zzz': 1, 'description': 'Ligne 1\nLigne 2 "citée" \\ fin', 'oldPrice': None},
+    {'id': 'a-002', 'name': 'Montre\u2028', 'images': [], 'sizes': ['S']},
+]
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_json_output_is_byte_identical_to_json_dump(workdir):
+    expected = [ordered_product(p) for p in PRODUCTS]
+    with open('expected.json', 'w', encoding='utf-8') as f:
+        json.dump(expected, f, ensure_ascii=False, indent=2)
+    assert write_products_json(PRODUCTS, 'out.json') == 2
+    # Seule différence voulue: U+2028 est échappé (littéral TypeScript valide)
+    assert read_bytes('out.json') == read_bytes('expected.json').replace('\u2028'.encode('utf-8'), b'\\u2028')
+
+
+def test_empty_array_matches_json_dump(workdir):
+    write_products_json([], 'out.json')
+    assert read_bytes('out.json') == b'[]'
+
+
+def test_write_literal_matches_write(workdir):
+    with ProductWriter('direct.json') as writer:
+        writer.write_all(PRODUCTS)
+    with ProductWriter('literal.json') as writer:
+        for product in PRODUCTS:
+            writer.write_literal(to_literal(ordered_product(product), 2))
+    assert read_bytes('direct.json') == read_bytes('literal.json')
+
+
+def test_unchanged_file_is_not_replaced(workdir):
+    write_products_json(PRODUCTS, 'out.json')
+    with ProductWriter('out.json', skip_unchanged=True) as writer:
+        writer.write_all(PRODUCTS)
+    assert not writer.changed
+    with ProductWriter('out.json', skip_unchanged=True) as writer:
+        writer.write_all(PRODUCTS[:1])
+    assert writer.changed
+
+
+def test_ts_module_drops_null_fields_and_keeps_key_order(workdir):
+    write_products_ts(PRODUCTS, 'out.ts', preamble='')
+    text = read_bytes('out.ts').decode('utf-8')
+    assert text.startswith('export const newProducts = [\n  {"id": "a-001", "name": "Chemise « été »", "price": 49.9, ')
+    assert 'oldPrice' not in text
+    assert '\\u2028' in text and '\u2028' not in text
+    assert text.endswith('\n];\n')
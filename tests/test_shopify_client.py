@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import shopify_client
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    """Endpoint factice de 3 pages pleines (2 produits par page), puis des pages vides"""
+    def fetch_page(url, page, limit, headers=None):
+        return [{'id': page * 10 + i} for i in range(2)] if page <= 3 else []
+
+    monkeypatch.setattr(shopify_client, 'fetch_page', fetch_page)
+    monkeypatch.setattr(shopify_client, 'fetch_page_with_retry', fetch_page)
+
+
+def test_reads_until_empty_page_without_warning(pages, capsys):
+    products = shopify_client.fetch_all_products('https://shop.example/products.json', window=2)
+    assert len(products) == 6
+    assert 'Limite' not in capsys.readouterr().out
+
+
+def test_warns_when_max_pages_stops_pagination(pages, capsys):
+    products = shopify_client.fetch_all_products('https://shop.example/products.json', window=2, max_pages=2)
+    assert len(products) == 4
+    assert 'Limite de 2 pages atteinte' in capsys.readouterr().out
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import supabase_sync
+from supabase_sync import catalog_rows, diff_rows, product_to_row, row_hash
+
+
+def product(product_id, slug, price=50):
+    return {'id': product_id, 'name': product_id, 'slug': slug, 'price': price}
+
+
+def remote(*products):
+    rows = [product_to_row(p) for p in products]
+    return {row['id']: (row_hash(row), row['slug']) for row in rows}
+
+
+def ids(rows):
+    return [row['id'] for row in rows]
+
+
+def test_diff_rows_splits_inserts_updates_unchanged_deletes():
+    local, _ = catalog_rows([product('a', 'sac'), product('b', 'montre', 90), product('c', 'chemise')])
+    inserts, updates, unchanged, deletes, conflicts = diff_rows(
+        local, remote(product('a', 'sac'), product('b', 'montre'), product('d', 'ceinture')))
+    assert (ids(inserts), ids(updates), unchanged, deletes, conflicts) == (['c'], ['b'], 1, ['d'], [])
+
+
+def test_diff_rows_reports_slug_held_by_another_remote_id():
+    local, _ = catalog_rows([product('a', 'sac'), product('c', 'montre')])
+    inserts, updates, _, _, conflicts = diff_rows(local, remote(product('a', 'sac'), product('b', 'montre')))
+    assert ids(inserts) == []
+    assert conflicts == [('c', 'slug déjà utilisé en base par b')]
+
+
+def test_diff_rows_allows_slug_freed_by_prune_or_rename():
+    local, _ = catalog_rows([product('a', 'sac-cuir'), product('c', 'sac'), product('d', 'montre')])
+    server = remote(product('a', 'sac'), product('b', 'montre'))
+    inserts, updates, _, deletes, conflicts = diff_rows(local, server, prune=True)
+    assert (ids(inserts), ids(updates), deletes, conflicts) == (['c', 'd'], ['a'], ['b'], [])
+
+
+def test_diff_rows_conflicts_cascade_to_rows_waiting_for_a_skipped_rename():
+    # a ne peut pas prendre 'montre' (gardé par b): son slug 'sac' n'est donc pas libéré pour c
+    local, _ = catalog_rows([product('a', 'montre'), product('c', 'sac')])
+    _, updates, _, _, conflicts = diff_rows(local, remote(product('a', 'sac'), product('b', 'montre')))
+    assert updates == []
+    assert [product_id for product_id, _ in conflicts] == ['a', 'c']
+
+
+@pytest.fixture
+def conn():
+    """Connexion à une base Postgres de test, annulée en fin de test (tables temporaires)"""
+    psycopg = pytest.importorskip('psycopg')
+    dsn = supabase_sync.get_dsn()
+    if dsn is None:
+        pytest.skip("pas de base Postgres (SUPABASE_DB_URL ou DATABASE_URL)")
+    connection = psycopg.connect(dsn)
+    with connection.cursor() as cur:
+        # Table temporaire du même nom: elle masque la vraie table products
+        cur.execute("""
+            CREATE TEMP TABLE products (
+              id TEXT PRIMARY KEY, name TEXT NOT NULL, name_fr TEXT NOT NULL, name_en TEXT NOT NULL,
+              slug TEXT UNIQUE NOT NULL, price DECIMAL(10, 2) NOT NULL, old_price DECIMAL(10, 2),
+              description TEXT NOT NULL, description_fr TEXT NOT NULL, description_en TEXT NOT NULL,
+              category TEXT NOT NULL, images TEXT[] DEFAULT '{}', sizes TEXT[], colors JSONB)""")
+    try:
+        yield connection
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+def sync(conn, products, prune=False):
+    local, _ = catalog_rows(products)
+    inserts, updates, _, deletes, conflicts = diff_rows(local, supabase_sync.fetch_remote_rows(conn), prune)
+    supabase_sync.apply_diff(conn, inserts + updates, deletes if prune else [])
+    return conflicts
+
+
+def test_apply_diff_skips_remote_slug_conflict(conn):
+    sync(conn, [product('b', 'montre')])
+    conflicts = sync(conn, [product('c', 'montre'), product('d', 'sac')])
+    assert [product_id for product_id, _ in conflicts] == ['c']
+    assert sorted(supabase_sync.fetch_remote_rows(conn)) == ['b', 'd']
+
+
+def test_apply_diff_moves_slugs_between_rows(conn):
+    sync(conn, [product('a', 'sac'), product('b', 'montre')])
+    assert sync(conn, [product('a', 'montre'), product('b', 'sac'), product('c', 'ceinture')]) == []
+    slugs = {product_id: slug for product_id, (_, slug) in supabase_sync.fetch_remote_rows(conn).items()}
+    assert slugs == {'a': 'montre', 'b': 'sac', 'c': 'ceinture'}